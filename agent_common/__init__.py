@@ -0,0 +1,5 @@
+"""
+エージェント共通モジュール
+
+shibuya_ramen_agent と ai_news_agent の両方から利用する共通処理
+"""
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+ファイルのアトミックな書き込み
+
+同じディレクトリの一時ファイルに書き込んで fsync してから os.replace で
+置き換えるため、書き込み途中で中断しても元のファイルが壊れない
+"""
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+
+@contextmanager
+def atomic_writer(path: Path) -> Iterator[BinaryIO]:
+    """
+    path を置き換える一時ファイルをバイナリモードで開く
+
+    ブロックが正常に終わると fsync して path に置き換え、例外で抜けると
+    一時ファイルを削除する（path は変更しない）
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def write_atomic(path: Path, content: str | bytes, skip_unchanged: bool = True) -> bool:
+    """
+    path に content をアトミックに書き込み、書き込んだかどうかを返す
+
+    skip_unchanged が True なら内容が同じ既存ファイルは書き換えない（更新日時を保つ）
+    """
+    path = Path(path)
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    if skip_unchanged and path.exists() and path.stat().st_size == len(data) and path.read_bytes() == data:
+        return False
+
+    with atomic_writer(path) as f:
+        f.write(data)
+    return True
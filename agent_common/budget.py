@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+複数エージェントで共有するセッションの実行枠と予算
+
+同時に実行するセッション数の上限と、全セッション合計のターン数・コスト（USD）の
+上限を管理する。ターン数はセッション開始時に max_turns 分を確保し、終了時に
+ResultMessage の num_turns との差を返却するため、合計が上限を超えない
+（残りがない間は実行中のセッションの返却を待つ）。
+コストは終了後にしか分からないため、各セッションの max_budget_usd を残りの予算に
+制限したうえで、使い切った時点で新しいセッションを開始しない
+"""
+
+import asyncio
+import contextlib
+from typing import AsyncIterator
+
+
+class BudgetExhausted(Exception):
+    """
+    予算を使い切ったためセッションを開始できない
+    """
+
+
+class SessionBudget:
+    """
+    セッションの同時実行数とターン数・コストの上限（None は無制限）
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        max_turns: int | None = None,
+        max_cost_usd: float | None = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_turns = max_turns
+        self.max_cost_usd = max_cost_usd
+        self.turns_used = 0
+        self.turns_reserved = 0
+        self.cost_usd = 0.0
+        self.sessions = 0
+        self._semaphore: asyncio.Semaphore | None = None
+        self._returned: asyncio.Condition | None = None
+
+    @property
+    def remaining_turns(self) -> int | None:
+        if self.max_turns is None:
+            return None
+        return max(0, self.max_turns - self.turns_used - self.turns_reserved)
+
+    @property
+    def remaining_cost_usd(self) -> float | None:
+        if self.max_cost_usd is None:
+            return None
+        return max(0.0, self.max_cost_usd - self.cost_usd)
+
+    @contextlib.asynccontextmanager
+    async def session(self, label: str, max_turns: int | None) -> AsyncIterator[dict]:
+        """
+        実行枠を確保してセッションに使えるターン数・コストの上限を返す
+
+        返す dict の "turns" / "cost_usd" にセッションの実績を入れると、
+        終了時に予算に反映する
+        """
+        if self._returned is None:
+            # イベントループ内で作成する
+            self._returned = asyncio.Condition()
+            if self.max_concurrency:
+                self._semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+
+        async with self._semaphore or contextlib.nullcontext():
+            async with self._returned:
+                # 残りがなくても実行中のセッションが確保した分は返却される可能性があるので待つ
+                await self._returned.wait_for(lambda: self.remaining_turns != 0 or not self.turns_reserved)
+            turns = max_turns
+            if self.remaining_turns is not None:
+                turns = self.remaining_turns if turns is None else min(turns, self.remaining_turns)
+            if turns == 0 or self.remaining_cost_usd == 0:
+                raise BudgetExhausted(f"[{label}] 予算を使い切ったためセッションを開始しません")
+
+            reserved = turns if self.max_turns is not None else 0
+            self.turns_reserved += reserved
+            self.sessions += 1
+            usage = {"max_turns": turns, "max_cost_usd": self.remaining_cost_usd, "turns": None, "cost_usd": 0.0}
+            try:
+                yield usage
+            finally:
+                self.turns_reserved -= reserved
+                # 実績が分からない場合は確保した分を使ったものとみなす
+                self.turns_used += usage["turns"] if usage["turns"] is not None else (turns or 0)
+                self.cost_usd += usage["cost_usd"] or 0.0
+                async with self._returned:
+                    self._returned.notify_all()
+
+    def summary(self) -> str:
+        turns = f"{self.turns_used}" + (f" / {self.max_turns}" if self.max_turns is not None else "")
+        cost = f"${self.cost_usd:.4f}" + (f" / ${self.max_cost_usd:.2f}" if self.max_cost_usd is not None else "")
+        return f"セッション {self.sessions} 回、ターン {turns}、コスト {cost}"
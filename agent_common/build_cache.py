@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Web ページ生成のビルドキャッシュ
+
+入力（データファイルと生成処理のソースファイル）と生成オプションのハッシュを
+キーとして、前回の生成結果（出力ファイルのサイズと更新日時）を記録する。
+キーが同じで出力ファイルも前回のままなら生成を省略できる。
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+from agent_common.atomic_write import write_atomic
+from agent_common.data_file import content_hash
+
+
+def fingerprint(
+    inputs: list[Path],
+    options: dict[str, Any] | None = None,
+    manifests: dict[Path, Path] | None = None,
+) -> str:
+    """
+    入力ファイルの内容と生成オプションのハッシュ
+
+    manifests（データファイルとマニフェストのパス）にあるデータファイルは、
+    マニフェストが最新ならファイルを読まずにマニフェストのハッシュを使う
+    """
+    manifests = manifests or {}
+    digest = hashlib.sha256()
+    for path in inputs:
+        digest.update(Path(path).name.encode("utf-8") + b"\0")
+        digest.update(content_hash(path, manifests.get(Path(path))).encode("ascii"))
+        digest.update(b"\0")
+    digest.update(json.dumps(options or {}, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def snapshot(directory: Path) -> dict[str, list[int]]:
+    """
+    ディレクトリ直下のファイルごとの [サイズ, 更新日時(ns)]
+    """
+    if not directory.exists():
+        return {}
+    result = {}
+    for path in sorted(directory.iterdir()):
+        if path.is_file():
+            stat = path.stat()
+            result[path.name] = [stat.st_size, stat.st_mtime_ns]
+    return result
+
+
+def changed_files(before: dict[str, list[int]], after: dict[str, list[int]]) -> tuple[list[str], list[str]]:
+    """
+    2 つのスナップショットの差分を (追加・更新されたファイル, 削除されたファイル) で返す
+    """
+    updated = [name for name, stat in after.items() if before.get(name) != stat]
+    removed = [name for name in before if name not in after]
+    return updated, removed
+
+
+class BuildCache:
+    """
+    出力ディレクトリごとの前回の生成キーと出力ファイルの記録
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.entries: dict[str, dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self.entries = {}
+
+    def is_fresh(self, output_dir: Path, key: str) -> bool:
+        """
+        前回と同じキーで生成済みで、出力ファイルが変更・削除されていないか
+        """
+        entry = self.entries.get(str(output_dir))
+        if entry is None or entry.get("key") != key:
+            return False
+        current = snapshot(output_dir)
+        return all(current.get(name) == stat for name, stat in entry["outputs"].items())
+
+    def update(self, output_dir: Path, key: str) -> None:
+        """
+        生成後の出力ディレクトリの状態を記録してファイルに保存
+        """
+        self.entries[str(output_dir)] = {"key": key, "outputs": snapshot(output_dir)}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.path, json.dumps(self.entries, ensure_ascii=False, indent=2))
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+収集途中のチェックポイント
+
+検証済みのレコードと完了した処理単位（エリア・カテゴリ）を JSON Lines 形式で
+1 件ずつ追記し、書き込みごとに fsync する。途中でプロセスが終了しても、
+それまでに書き込んだ行は残る（書き込み途中の最終行は読み込み時に無視する）。
+
+記録の 1 行は以下のいずれかの形式:
+    {"type": "start", "t": "2026-01-20 12:00:00", "resumed": false}
+    {"type": "record", "record": {...}}
+    {"type": "done", "unit": "渋谷"}
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+
+class Checkpoint:
+    """
+    1 回の収集のチェックポイントファイル
+
+    resume が True なら既存のチェックポイントを読み込んで追記し、
+    False なら新しく書き始める
+    """
+
+    def __init__(self, path: str | Path, resume: bool = False):
+        self.path = Path(path)
+        self.resume = resume
+        self.records_written = 0
+        self._file = None
+
+    def load(self) -> tuple[list[dict[str, Any]], list[str]]:
+        """
+        チェックポイントのレコードと完了した処理単位を読み込む（ファイルがなければ空）
+        """
+        records: list[dict[str, Any]] = []
+        done: list[str] = []
+        if not self.path.exists():
+            return records, done
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 書き込み途中で中断した行
+                    continue
+                if entry.get("type") == "record" and isinstance(entry.get("record"), dict):
+                    records.append(entry["record"])
+                elif entry.get("type") == "done" and entry.get("unit") not in done:
+                    done.append(entry["unit"])
+        return records, done
+
+    def open(self) -> tuple[list[dict[str, Any]], list[str]]:
+        """
+        書き込みを開始し、再開する場合は前回までのレコードと完了した処理単位を返す
+        """
+        records, done = self.load() if self.resume else ([], [])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        torn = self.resume and self.path.exists() and not self.path.read_bytes().endswith(b"\n")
+        self._file = open(self.path, "a" if self.resume else "w", encoding="utf-8")
+        if torn and self.path.stat().st_size:
+            # 書き込み途中の行に続けて書かないよう改行する
+            self._file.write("\n")
+        self._write({"type": "start", "t": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "resumed": self.resume})
+        return records, done
+
+    def record(self, record: dict[str, Any]) -> None:
+        self._write({"type": "record", "record": record})
+        self.records_written += 1
+
+    def done(self, unit: str) -> None:
+        self._write({"type": "done", "unit": unit})
+
+    def _write(self, entry: dict[str, Any]) -> None:
+        if self._file is None:
+            return
+        self._file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+
+    def discard(self) -> None:
+        """
+        データを保存し終えたチェックポイントを削除
+        """
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+検索ページに埋め込むレコードの列指向エンコード
+
+レコードの配列をそのまま JSON にすると、各レコードでキー名や
+エリア・ソースなどの同じ値が繰り返される。列指向エンコードでは
+フィールドごとに 1 つの配列を持ち、値の種類が少ないフィールドは
+辞書（値の一覧）と番号の配列で表す:
+
+    {"format": "columnar", "length": 2,
+     "columns": {"name": ["A", "B"], "area": [0, 0]},
+     "dictionaries": {"area": ["渋谷"]}}
+
+フィールドがないレコードの値は null。ブラウザ側（COLUMNAR_JS）は
+行ごとの値をアクセスされたときに列から取り出す。
+"""
+
+from typing import Any, Iterable
+
+_SCALAR_TYPES = (str, int, float, bool)
+
+
+def encode_columnar(records: list[dict[str, Any]], dictionary_fields: Iterable[str] = ()) -> dict[str, Any]:
+    """
+    レコードの配列を列指向の形式に変換
+
+    dictionary_fields のフィールドは辞書エンコードする（値がスカラーでない場合を除く）
+    """
+    fields: dict[str, None] = {}
+    for record in records:
+        fields.update(dict.fromkeys(record))
+
+    columns = {field: [record.get(field) for record in records] for field in fields}
+    dictionaries = {}
+    for field in dictionary_fields:
+        values = columns.get(field)
+        if values is None or not all(value is None or isinstance(value, _SCALAR_TYPES) for value in values):
+            continue
+        # True と 1 を区別するため型も含めて番号を振る
+        codes: dict[tuple[type, Any], int] = {}
+        columns[field] = [
+            None if value is None else codes.setdefault((type(value), value), len(codes))
+            for value in values
+        ]
+        dictionaries[field] = [value for _, value in codes]
+
+    return {
+        "format": "columnar",
+        "length": len(records),
+        "columns": columns,
+        "dictionaries": dictionaries,
+    }
+
+
+def decode_columnar(payload: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    列指向の形式をレコードの配列に戻す（値が null のフィールドは省略）
+    """
+    records: list[dict[str, Any]] = [{} for _ in range(payload["length"])]
+    for field, column in payload["columns"].items():
+        dictionary = payload["dictionaries"].get(field)
+        for record, value in zip(records, column):
+            if value is not None:
+                record[field] = dictionary[value] if dictionary is not None else value
+    return records
+
+
+def encode_records(
+    records: list[dict[str, Any]],
+    columnar: bool = True,
+    dictionary_fields: Iterable[str] = (),
+) -> list[dict[str, Any]] | dict[str, Any]:
+    """
+    ページに埋め込むレコードを返す（columnar が False なら行指向のまま）
+    """
+    if not columnar:
+        return records
+    return encode_columnar(records, dictionary_fields)
+
+
+# 生成する HTML の <script> 内に埋め込むデコード処理
+COLUMNAR_JS = r'''
+        // 列指向データのデコード
+        // 行ごとのオブジェクトは番号だけを持ち、フィールドの値はアクセスされたときに
+        // 列（辞書エンコードされたフィールドは辞書）から取り出す。配列はそのまま返す
+        function decodeRecords(payload) {
+            if (Array.isArray(payload)) return payload;
+
+            function Row(i) {
+                this.__row = i;
+            }
+            for (const [field, column] of Object.entries(payload.columns)) {
+                const dictionary = payload.dictionaries[field];
+                Object.defineProperty(Row.prototype, field, {
+                    enumerable: true,
+                    get: dictionary
+                        ? function () {
+                            const code = column[this.__row];
+                            return code === null ? undefined : dictionary[code];
+                        }
+                        : function () {
+                            const value = column[this.__row];
+                            return value === null ? undefined : value;
+                        },
+                });
+            }
+
+            const records = new Array(payload.length);
+            for (let i = 0; i < payload.length; i++) {
+                records[i] = new Row(i);
+            }
+            return records;
+        }
+'''
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+収集データの JSON ファイルの保存
+
+レコードを 1 件ずつ同じディレクトリの一時ファイルに書き込み、fsync してから
+置き換える（atomic_writer）。書き込み途中で中断しても元のファイルは壊れず、
+データ全体の JSON 文字列もメモリに作らない。
+
+出力は indent=2 の整形（pretty）か、空白を省いた compact を選べる。
+整形した出力は json.dump(data, f, ensure_ascii=False, indent=2) と同じバイト列になる。
+
+保存するたびにマニフェスト（ramen_shops.manifest.json など）に
+レコード数・バイト数・SHA-256・更新日時とレコード以外のトップレベルの値を書き出す。
+ファイルのサイズと更新日時がマニフェストと一致していれば、ファイル全体を
+読まずに内容のハッシュや件数を得られる。マニフェストは公開するデータではないため、
+docs/ ではなく記録ログなどと同じエージェントのディレクトリに置く
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator
+
+from agent_common.atomic_write import atomic_writer, write_atomic
+
+MANIFEST_SUFFIX = ".manifest.json"
+
+# レコードごとに作り直さないよう、エンコーダーは使い回す
+_PRETTY = json.JSONEncoder(ensure_ascii=False, indent=2)
+_COMPACT = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def manifest_path(directory: str | Path, path: str | Path) -> Path:
+    """
+    データファイル（ramen_shops.json など）のマニフェストのパス（directory/ramen_shops.manifest.json）
+
+    コレクターと、コレクターを読み込まずにマニフェストを読む generate_web.py が同じパスを使う
+    """
+    return Path(directory) / f"{Path(path).stem}{MANIFEST_SUFFIX}"
+
+
+def _dumps(value: Any, pretty: bool) -> str:
+    return (_PRETTY if pretty else _COMPACT).encode(value)
+
+
+def json_chunks(data: dict[str, Any], records_key: str, pretty: bool = True) -> Iterator[str]:
+    """
+    data の JSON をトップレベルの値・レコードごとの断片に分けて返す
+    """
+    if not data:
+        yield "{}"
+        return
+    # JSON の文字列中の改行はエスケープされるため、行頭に字下げを足すだけで入れ子にできる
+    indent, record_indent = ("\n  ", "\n    ") if pretty else ("", "")
+    separator = ": " if pretty else ":"
+    yield "{"
+    for i, (name, value) in enumerate(data.items()):
+        yield ("," if i else "") + indent + json.dumps(name, ensure_ascii=False) + separator
+        if name != records_key or not isinstance(value, list) or not value:
+            yield _dumps(value, pretty).replace("\n", indent)
+            continue
+        yield "["
+        for j, record in enumerate(value):
+            yield ("," if j else "") + record_indent + _dumps(record, pretty).replace("\n", record_indent)
+        yield indent + "]"
+    yield "\n}" if pretty else "}"
+
+
+def save_json(
+    path: Path,
+    data: dict[str, Any],
+    records_key: str,
+    pretty: bool = True,
+    manifest_file: Path | None = None,
+) -> dict[str, Any]:
+    """
+    data を path にアトミックに保存し、マニフェストを返す（manifest_file を指定すると書き出す）
+    """
+    path = Path(path)
+    digest = hashlib.sha256()
+    size = 0
+    with atomic_writer(path) as f:
+        for chunk in json_chunks(data, records_key, pretty):
+            encoded = chunk.encode("utf-8")
+            f.write(encoded)
+            digest.update(encoded)
+            size += len(encoded)
+
+    records = data.get(records_key)
+    manifest = {
+        "file": path.name,
+        "format": "pretty" if pretty else "compact",
+        "count": len(records) if isinstance(records, list) else 0,
+        "bytes": size,
+        "sha256": digest.hexdigest(),
+        "mtime_ns": path.stat().st_mtime_ns,
+        "saved_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "meta": {name: value for name, value in data.items() if name != records_key},
+    }
+    if manifest_file is not None:
+        write_atomic(manifest_file, json.dumps(manifest, ensure_ascii=False, indent=2), skip_unchanged=False)
+    return manifest
+
+
+def read_manifest(path: Path, manifest_file: Path) -> dict[str, Any] | None:
+    """
+    path のマニフェスト（別のファイルのもの、またはファイルのサイズ・更新日時と一致しない場合は None）
+    """
+    path = Path(path)
+    if not path.exists() or not Path(manifest_file).exists():
+        return None
+    try:
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if manifest.get("file") != path.name:
+        return None
+    stat = path.stat()
+    # マニフェストの後にファイルが書き換えられていれば古い
+    if manifest.get("bytes") != stat.st_size or manifest.get("mtime_ns") != stat.st_mtime_ns:
+        return None
+    return manifest
+
+
+def content_hash(path: Path, manifest_file: Path | None = None) -> str:
+    """
+    ファイルの内容の SHA-256（manifest_file のマニフェストが最新ならファイルを読まない）
+    """
+    manifest = read_manifest(path, manifest_file) if manifest_file is not None else None
+    if manifest is not None:
+        return manifest["sha256"]
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
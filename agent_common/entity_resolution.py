@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+収集レコードの名寄せ（同一エンティティの重複の統合）
+
+複数の情報源から集めたレコードは、同じ店舗でも全角・半角、ひらがな・カタカナ、
+支店名の有無、住所の書き方（1-2-3 / 1丁目2番3号 / 一丁目2-3）が異なる。
+名前と住所を正規化し、同一と判定したレコードをフィールドごとにまとめる。
+
+- 正規化: NFKC・小文字化・ひらがなをカタカナに寄せ、空白と記号を除く
+- 住所: 都道府県・区市を除き、町名と丁目・番地・号の数字列に分解する
+- ブロッキング: 町名と先頭 2 つの数字（丁目と番地、丁目のない町は番地と号）が
+  同じレコードだけを比較する。さらに数字列が一致するか一方が他方の先頭部分で
+  ある組に限るため、比較の回数はほぼレコード数に比例する
+- 判定: 正規化した名前が一致・包含（3 文字以上）・類似度が threshold 以上
+- 住所のないレコードは、正規化した名前が同じ町（または全体）で 1 つのグループ
+  だけに一致する場合に統合する
+- 統合: 新しいレコード（recency の大きい順）を優先してフィールドごとに空でない値を取り、
+  リストのフィールドは和集合にする。統合したレコードには情報源の一覧（sources）と
+  フィールドごとの情報源（provenance）を付ける
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Any, Callable
+
+# ひらがな（ぁ〜ゖ）をカタカナに寄せる
+_KANA_FOLD = {code: code + 0x60 for code in range(0x3041, 0x3097)}
+# 名前の比較で無視する文字（空白・記号）
+_NAME_NOISE = re.compile(r"[\s\W_]+")
+_KANJI_DIGITS = {"〇": 0, "一": 1, "二": 2, "三": 3, "四": 4, "五": 5, "六": 6, "七": 7, "八": 8, "九": 9}
+_KANJI_NUMBER = re.compile(r"[〇一二三四五六七八九十]+(?=丁目|番|号)")
+_POSTAL_CODE = re.compile(r"〒?\s*\d{3}-\d{4}")
+_PREFECTURE_CITY = re.compile(r"^(?:東京都|北海道|(?:京都|大阪)府|\D{2,3}県)?(?:\D+?[市区郡](?!\d))?")
+# 号は住所の終わり（後ろの数字は階数など）なので区切りとして扱わない
+_NUMBER_DASH = re.compile(r"(?<=\d)\s*(?:丁目|番地|番|の|[‐‑‒–—―−ー-])\s*(?=\d)")
+_ADDRESS = re.compile(r"^(?P<town>\D+?)\s*(?P<numbers>\d+(?:-\d+)*)(?:丁目|番地|番|号)?(?P<rest>.*)$")
+
+DEFAULT_THRESHOLD = 0.8
+
+
+def fold_kana(text: str) -> str:
+    return text.translate(_KANA_FOLD)
+
+
+def normalize_text(text: str) -> str:
+    """
+    比較用に正規化（NFKC・小文字化・ひらがなをカタカナに・空白と記号を除く）
+    """
+    return _NAME_NOISE.sub("", fold_kana(unicodedata.normalize("NFKC", text).lower()))
+
+
+def _kanji_to_int(text: str) -> int:
+    """
+    漢数字（九十九まで）を整数に変換
+    """
+    if "十" not in text:
+        return int("".join(str(_KANJI_DIGITS[char]) for char in text))
+    tens, _, ones = text.partition("十")
+    return (_KANJI_DIGITS.get(tens, 1) if tens else 1) * 10 + (_KANJI_DIGITS[ones] if ones else 0)
+
+
+@dataclass(frozen=True)
+class Address:
+    """
+    分解した住所（町名、丁目・番地・号の数字、建物名など残りの部分）
+    """
+
+    town: str
+    numbers: tuple[int, ...]
+    rest: str = ""
+
+    @property
+    def block(self) -> str | None:
+        """
+        ブロッキングのキー（数字が 2 つ未満なら None）
+        """
+        if len(self.numbers) < 2:
+            return None
+        return f"{self.town}{self.numbers[0]}-{self.numbers[1]}"
+
+
+def parse_address(address: Any) -> Address | None:
+    """
+    住所を町名と数字列に分解する（町名と数字が読み取れない場合は None）
+
+    「東京都渋谷区道玄坂1-14-9 ソシアル道玄坂 1F」「道玄坂一丁目14番9号」は
+    どちらも Address("道玄坂", (1, 14, 9), ...) になる
+    """
+    if not isinstance(address, str):
+        return None
+    text = unicodedata.normalize("NFKC", address).strip()
+    text = _POSTAL_CODE.sub("", text).strip()
+    text = _KANJI_NUMBER.sub(lambda match: str(_kanji_to_int(match.group())), text)
+    text = _NUMBER_DASH.sub("-", text)
+    text = _PREFECTURE_CITY.sub("", text, count=1)
+    match = _ADDRESS.match(text)
+    if match is None:
+        return None
+    town = _NAME_NOISE.sub("", match["town"])
+    if not town:
+        return None
+    numbers = tuple(int(number) for number in match["numbers"].split("-"))
+    return Address(town, numbers, match["rest"].strip(" -"))
+
+
+def name_matcher(a: str, threshold: float = DEFAULT_THRESHOLD) -> Callable[[str], bool]:
+    """
+    正規化済みの名前 b が a と同一とみなせるかを返す関数（一致・3 文字以上の包含・類似度）
+
+    a の索引（SequenceMatcher の seq2）を 1 回だけ作り、比較する b ごとに使い回す
+    """
+    matcher = SequenceMatcher(None, autojunk=False)
+    matcher.set_seq2(a)
+
+    def matches(b: str) -> bool:
+        if a == b:
+            return True
+        if not a or not b:
+            return False
+        if min(len(a), len(b)) >= 3 and (a in b or b in a):
+            return True
+        matcher.set_seq1(b)
+        # 上限の安い見積もりから順に判定する
+        return matcher.real_quick_ratio() >= threshold and matcher.quick_ratio() >= threshold and matcher.ratio() >= threshold
+
+    return matches
+
+
+def similar_names(a: str, b: str, threshold: float = DEFAULT_THRESHOLD) -> bool:
+    """
+    正規化済みの名前が同一とみなせるか
+    """
+    return name_matcher(a, threshold)(b)
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int) -> None:
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            # 先に現れたレコードを代表にする
+            self.parent[max(a, b)] = min(a, b)
+
+
+@dataclass
+class ResolutionStats:
+    """
+    名寄せの集計（比較した組の数など）
+    """
+
+    records: int = 0
+    resolved: int = 0
+    blocks: int = 0
+    comparisons: int = 0
+    matched_by_name: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"{self.records} 件 → {self.resolved} 件（ブロック {self.blocks}、"
+            f"比較 {self.comparisons} 組、住所なしの名前一致 {self.matched_by_name} 件）"
+        )
+
+
+def find_duplicates(
+    records: list[dict[str, Any]],
+    name: Callable[[dict[str, Any]], str],
+    address: Callable[[dict[str, Any]], Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    stats: ResolutionStats | None = None,
+) -> list[list[int]]:
+    """
+    同一とみなせるレコード番号のグループ（元の順序、1 件だけのグループも含む）
+
+    name はレコードから比較用の名前（正規化前でよい）を、address は住所を返す関数
+    """
+    stats = stats if stats is not None else ResolutionStats()
+    names = [normalize_text(name(record) or "") for record in records]
+    addresses = [parse_address(address(record)) for record in records]
+    groups = _UnionFind(len(records))
+
+    blocks: dict[str, dict[tuple[int, ...], list[int]]] = {}
+    unplaced = []
+    for i, parsed in enumerate(addresses):
+        if parsed is None or parsed.block is None:
+            unplaced.append(i)
+        else:
+            # 号より後ろの数字（部屋番号など）は比較に使わない
+            blocks.setdefault(parsed.block, {}).setdefault(parsed.numbers[:3], []).append(i)
+    stats.blocks = len(blocks)
+
+    def compare(members: list[int], others: list[int] | None = None, matchers: dict | None = None) -> None:
+        # 同じ名前は 1 回だけ比較する（matchers はブロック内で名前ごとの比較関数を使い回す）
+        first = {}
+        for i in members + (others or []):
+            if names[i] in first:
+                groups.union(first[names[i]], i)
+            else:
+                first[names[i]] = i
+        left = list(dict.fromkeys(names[i] for i in members))
+        right = left if others is None else list(dict.fromkeys(names[i] for i in others))
+        for x, a in enumerate(left):
+            candidates = [b for b in (right[x + 1:] if others is None else right) if b != a]
+            if not candidates:
+                continue
+            matches = matchers.get(a) if matchers is not None else None
+            if matches is None:
+                matches = name_matcher(a, threshold)
+                if matchers is not None:
+                    matchers[a] = matches
+            for b in candidates:
+                stats.comparisons += 1
+                if matches(b):
+                    groups.union(first[a], first[b])
+
+    for subgroups in blocks.values():
+        # 番地までの住所（例: 1-14）は、その下のすべての住所（1-14-9 など）と比較する
+        coarse = [i for numbers, members in subgroups.items() if len(numbers) == 2 for i in members]
+        matchers: dict[str, Callable[[str], bool]] = {}
+        for numbers, members in subgroups.items():
+            compare(members, matchers=matchers)
+            if coarse and len(numbers) > 2:
+                compare(members, coarse, matchers)
+
+    # 住所で比較できないレコードは、同じ町で名前が一致するグループが 1 つだけなら統合する
+    by_name: dict[str, set[int]] = {}
+    for i in range(len(records)):
+        if addresses[i] is not None:
+            by_name.setdefault(names[i], set()).add(i)
+    for i in unplaced:
+        if not names[i]:
+            continue
+        candidates = [
+            j for j in by_name.get(names[i], ())
+            if j != i and (addresses[i] is None or addresses[j] is None or addresses[i].town == addresses[j].town)
+        ]
+        roots = {groups.find(j) for j in candidates}
+        if len(roots) == 1:
+            groups.union(i, roots.pop())
+            stats.matched_by_name += 1
+        elif addresses[i] is None:
+            by_name.setdefault(names[i], set()).add(i)
+
+    clusters: dict[int, list[int]] = {}
+    for i in range(len(records)):
+        clusters.setdefault(groups.find(i), []).append(i)
+    return list(clusters.values())
+
+
+def merge_records(
+    records: list[dict[str, Any]],
+    source: Callable[[dict[str, Any]], str],
+    recency: Callable[[dict[str, Any]], Any],
+    list_fields: tuple[str, ...] = (),
+) -> dict[str, Any]:
+    """
+    同一エンティティのレコードをフィールドごとにまとめる
+
+    recency の大きい（新しい）レコードの空でない値を優先し、list_fields は和集合にする。
+    sources に統合したレコードの情報源を、provenance にフィールドごとの値の情報源を記録する
+    （統合済みのレコードを再び統合する場合は、以前の情報源を引き継ぐ）
+    """
+    ranked = sorted(records, key=recency, reverse=True)
+    merged: dict[str, Any] = {}
+    provenance: dict[str, str] = {}
+    sources: list[str] = []
+
+    def origin(record: dict[str, Any], field: str) -> str:
+        return (record.get("provenance") or {}).get(field) or source(record)
+
+    for record in ranked:
+        for label in record.get("sources") or [source(record)]:
+            if label not in sources:
+                sources.append(label)
+        for field, value in record.items():
+            if field in ("sources", "provenance") or value in (None, "", []):
+                continue
+            if field in list_fields and isinstance(value, list):
+                current = merged.setdefault(field, [])
+                current.extend(item for item in value if item not in current)
+                provenance.setdefault(field, origin(record, field))
+            elif field not in merged:
+                merged[field] = value
+                provenance[field] = origin(record, field)
+
+    # 値のないフィールドも、先頭のレコードと同じく残す
+    for record in ranked:
+        for field, value in record.items():
+            if field not in ("sources", "provenance"):
+                merged.setdefault(field, value)
+
+    merged["sources"] = sources
+    merged["provenance"] = provenance
+    return merged
+
+
+def resolve_records(
+    records: list[dict[str, Any]],
+    name: Callable[[dict[str, Any]], str],
+    address: Callable[[dict[str, Any]], Any],
+    source: Callable[[dict[str, Any]], str],
+    recency: Callable[[dict[str, Any]], Any],
+    list_fields: tuple[str, ...] = (),
+    threshold: float = DEFAULT_THRESHOLD,
+) -> tuple[list[dict[str, Any]], ResolutionStats]:
+    """
+    重複をまとめたレコード（各グループの最初のレコードの位置に置く）と集計を返す
+
+    重複のないレコードはそのまま返す
+    """
+    stats = ResolutionStats(records=len(records))
+    resolved = []
+    for cluster in find_duplicates(records, name, address, threshold, stats):
+        if len(cluster) == 1:
+            resolved.append(records[cluster[0]])
+        else:
+            resolved.append(merge_records([records[i] for i in cluster], source, recency, list_fields))
+    stats.resolved = len(resolved)
+    return resolved, stats
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+エージェント出力からの JSON ストリーミング抽出
+
+エージェントのテキストブロックを到着順に受け取り、``` で囲まれた JSON や
+波括弧の対応が取れた JSON オブジェクトを 1 パスで検出する。
+トランスクリプト全体は保持せず、未完了の候補テキストとパース済みの
+ペイロードだけを保持するため、入力長に対して線形時間で動作する。
+"""
+
+import json
+import re
+from typing import Any
+
+
+# 候補の内部で構造的に意味を持つトークン（エスケープ、コードフェンス、波括弧、引用符、改行）
+_TOKEN_PATTERN = re.compile(r'\\[\s\S]?|```|[{}"\n]')
+_NON_SPACE = re.compile(r'\S')
+
+_DECODER = json.JSONDecoder()
+
+
+class JsonStreamExtractor:
+    """
+    テキストを逐次受け取り、完結した JSON オブジェクトを抽出する
+
+    required_key を指定すると、そのキーを持つ dict だけをペイロードとして残す
+    """
+
+    def __init__(self, required_key: str | None = None):
+        self.required_key = required_key
+        self.payloads: list[dict[str, Any]] = []
+        self.errors: list[str] = []
+        self._parts: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._pending_escape = False
+        # 候補内の { の直後の文字が前回のチャンクの末尾までに現れていない
+        self._pending_open = False
+        self._carry = ""
+
+    def feed(self, text: str) -> list[dict[str, Any]]:
+        """
+        テキストを追加し、今回新たに完結したペイロードを返す
+        """
+        found: list[dict[str, Any]] = []
+
+        # チャンク境界で分断されたコードフェンスを検出できるよう、末尾のバッククォートは次回に回す
+        text = self._carry + text
+        held = (len(text) - len(text.rstrip('`'))) % 3
+        self._carry = text[len(text) - held:] if held else ""
+        if held:
+            text = text[:-held]
+
+        # デコードのエラーがこの位置以降ならテキストが途中で切れている
+        end_of_text = len(text.rstrip())
+        pos = 0
+        if self._depth and self._pending_open:
+            pos = self._check_open(text, 0, 0, found)
+        if self._depth:
+            if self._pending_escape and text:
+                # 前回のチャンク末尾のバックスラッシュが今回の先頭文字をエスケープしている
+                pos = 1
+                self._pending_escape = False
+            pos = self._scan(text, pos, 0, found)
+
+        while True:
+            start = text.find('{', pos)
+            if start < 0:
+                break
+
+            # 完結した正しい JSON は C 実装のデコーダで一気に読む
+            try:
+                payload, end = _DECODER.raw_decode(text, start)
+            except json.JSONDecodeError as e:
+                if not _truncated(e, end_of_text):
+                    # チャンク内で不正とわかる候補（文章中の { など）は読み飛ばす
+                    pos = start + 1
+                    continue
+                # チャンクをまたぐ候補は 1 文字ずつの状態機械で境界を探す
+                self._depth = 1
+                pos = self._check_open(text, start + 1, start, found)
+                if self._depth:
+                    pos = self._scan(text, pos, start, found)
+                continue
+
+            self._accept(payload, found)
+            pos = end
+
+        return found
+
+    def last(self) -> dict[str, Any] | None:
+        """
+        最後に見つかったペイロード（最終結果のはず）を返す
+        """
+        return self.payloads[-1] if self.payloads else None
+
+    def _scan(self, text: str, pos: int, start: int, found: list[dict[str, Any]]) -> int:
+        """
+        候補の内部を走査し、候補が閉じるか破棄された位置を返す
+        """
+        for match in _TOKEN_PATTERN.finditer(text, pos):
+            token = match.group()
+
+            if token == '\n':
+                # JSON の文字列は改行を含まないので、文字列中の改行は候補が不正である印
+                if self._in_string:
+                    self._abandon(text[start:match.start()], found)
+                    return match.end()
+                continue
+
+            if token == '```':
+                # 文字列外のコードフェンスは候補の区切り。閉じていない候補は破棄する
+                if not self._in_string:
+                    self._abandon(text[start:match.start()], found)
+                    return match.end()
+                continue
+
+            if token[0] == '\\':
+                if len(token) == 1 and self._in_string:
+                    self._pending_escape = True
+                continue
+
+            if token == '"':
+                self._in_string = not self._in_string
+                continue
+
+            if self._in_string:
+                continue
+
+            if token == '{':
+                self._depth += 1
+                resume = self._check_open(text, match.end(), start, found)
+                if not self._depth:
+                    return resume
+                if self._pending_open:
+                    break
+            else:
+                self._depth -= 1
+                if not self._depth:
+                    self._parts.append(text[start:match.end()])
+                    self._finish(found)
+                    return match.end()
+
+        self._parts.append(text[start:])
+        return len(text)
+
+    def _check_open(self, text: str, pos: int, start: int, found: list[dict[str, Any]]) -> int:
+        """
+        候補内の { の直後（pos 以降の最初の空白以外の文字）が " か } であることを確かめる
+
+        それ以外なら候補は JSON ではない（文章中の { など）ため破棄し、その文字の位置を返す
+        （その位置から新しい候補を探す）。チャンクの末尾までに文字がなければ次回に確かめる
+        """
+        match = _NON_SPACE.search(text, pos)
+        if match is None:
+            self._pending_open = True
+            return pos
+        self._pending_open = False
+        if match.group() not in '"}':
+            self._abandon(text[start:match.start()], found)
+        return match.start()
+
+    def _abandon(self, tail: str, found: list[dict[str, Any]]) -> None:
+        """
+        閉じないまま破棄する候補（tail は今回のチャンク内の部分）から、中の完結した JSON を拾う
+        """
+        self._parts.append(tail)
+        candidate = "".join(self._parts)
+        self._reset()
+        self._salvage(candidate, found)
+
+    def _salvage(self, candidate: str, found: list[dict[str, Any]]) -> None:
+        """
+        不正な候補の先頭の { を除いた残りから、完結した JSON を探す
+        （文章中の対応しない { の後ろに出力された JSON を取りこぼさない）
+        """
+        inner = JsonStreamExtractor(self.required_key)
+        for payload in inner.feed(candidate[1:]):
+            self._accept(payload, found)
+
+    def _finish(self, found: list[dict[str, Any]]) -> None:
+        candidate = "".join(self._parts)
+        self._reset()
+
+        try:
+            payload = json.loads(candidate)
+        except json.JSONDecodeError as e:
+            if self.required_key is None or f'"{self.required_key}"' in candidate:
+                self.errors.append(str(e))
+            self._salvage(candidate, found)
+            return
+
+        self._accept(payload, found)
+
+    def _accept(self, payload: Any, found: list[dict[str, Any]]) -> None:
+        if not isinstance(payload, dict):
+            return
+        if self.required_key is not None and self.required_key not in payload:
+            return
+        self.payloads.append(payload)
+        found.append(payload)
+
+    def _reset(self) -> None:
+        self._parts = []
+        self._depth = 0
+        self._in_string = False
+        self._pending_escape = False
+        self._pending_open = False
+
+
+def _truncated(error: json.JSONDecodeError, end_of_text: int) -> bool:
+    """
+    デコードのエラーがテキストの途中で切れているためか（続きのチャンクで完結しうるか）
+    """
+    # 閉じていない文字列のエラーは文字列の先頭の位置を指す（改行を含めば別のエラーになる）
+    return error.pos >= end_of_text or error.msg.startswith("Unterminated string")
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+エージェントのモジュールの読み込み
+
+generate_web.py・ramen_db.py などはエージェントごとに別のディレクトリにあり、
+同じ名前のモジュールもあるため、ファイルパスを指定して
+ディレクトリ名を付けた別名のモジュールとして読み込む
+"""
+
+import importlib.util
+from pathlib import Path
+from types import ModuleType
+
+
+def load_module(path: Path) -> ModuleType:
+    """
+    path のモジュールを「ディレクトリ名_ファイル名」のモジュールとして読み込む
+    """
+    path = Path(path)
+    spec = importlib.util.spec_from_file_location(f"{path.parent.name}_{path.stem}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+静的ファイルの事前圧縮
+
+出力ディレクトリの HTML・JSON などについて、静的サーバーがそのまま返せる
+圧縮済みファイル（index.html.gz、index.html.br）を書き出す。
+brotli は brotli モジュールがインストールされている場合のみ作成する。
+
+圧縮はスレッドプールで並列に行い（zlib・brotli は GIL を解放する）、
+元ファイルより新しい圧縮済みファイルがあれば圧縮し直さない。
+"""
+
+import gzip
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from agent_common.atomic_write import write_atomic
+
+try:
+    import brotli
+except ImportError:  # brotli がなければ gzip のみ作成する
+    brotli = None
+
+COMPRESSIBLE_SUFFIXES = {".html", ".json", ".js", ".css", ".svg", ".txt", ".xml"}
+COMPRESSED_SUFFIXES = {".gz": "gzip", ".br": "brotli"}
+
+
+@dataclass
+class CompressionResult:
+    """
+    1 ファイル・1 形式の圧縮結果
+    """
+
+    source: Path
+    encoding: str
+    original_size: int
+    compressed_size: int
+    skipped: bool
+
+    @property
+    def ratio(self) -> float:
+        return self.compressed_size / self.original_size if self.original_size else 1.0
+
+
+def available_encodings() -> list[str]:
+    return ["gzip", "brotli"] if brotli is not None else ["gzip"]
+
+
+def compressed_path(source: Path, encoding: str) -> Path:
+    suffix = ".gz" if encoding == "gzip" else ".br"
+    return source.with_name(source.name + suffix)
+
+
+def compress_file(source: Path, encoding: str) -> CompressionResult:
+    """
+    source を圧縮して隣に書き出す（圧縮済みファイルが元ファイルより新しければ省略）
+    """
+    target = compressed_path(source, encoding)
+    original_size = source.stat().st_size
+    if target.exists() and target.stat().st_mtime_ns >= source.stat().st_mtime_ns:
+        return CompressionResult(source, encoding, original_size, target.stat().st_size, skipped=True)
+
+    data = source.read_bytes()
+    if encoding == "gzip":
+        # mtime を固定して同じ入力から同じ出力になるようにする
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    else:
+        compressed = brotli.compress(data, quality=11)
+    write_atomic(target, compressed, skip_unchanged=False)
+    return CompressionResult(source, encoding, original_size, len(compressed), skipped=False)
+
+
+def site_artifacts(directory: Path) -> list[Path]:
+    """
+    ディレクトリ直下の圧縮対象ファイル
+    """
+    return sorted(
+        path for path in directory.iterdir()
+        if path.is_file() and path.suffix in COMPRESSIBLE_SUFFIXES
+    )
+
+
+def remove_orphans(directory: Path) -> list[Path]:
+    """
+    元ファイルがなくなった圧縮済みファイルを削除
+
+    このモジュールが書き出す <圧縮対象ファイル名>.gz / .br だけを対象にし、
+    それ以外の .gz / .br（配布用のアーカイブなど）は残す
+    """
+    removed = []
+    for path in sorted(directory.iterdir()):
+        source = path.with_suffix("")
+        if (
+            path.is_file()
+            and path.suffix in COMPRESSED_SUFFIXES
+            and source.suffix in COMPRESSIBLE_SUFFIXES
+            and not source.exists()
+        ):
+            path.unlink()
+            removed.append(path)
+    return removed
+
+
+def precompress_directory(directory: Path, max_workers: int | None = None) -> list[CompressionResult]:
+    """
+    ディレクトリ直下の圧縮対象ファイルを利用可能なすべての形式で圧縮
+    """
+    remove_orphans(directory)
+    jobs = [(path, encoding) for path in site_artifacts(directory) for encoding in available_encodings()]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda job: compress_file(*job), jobs))
+
+
+def format_results(results: list[CompressionResult]) -> list[str]:
+    """
+    ファイルごとに圧縮率をまとめた表示用の行
+    """
+    lines = []
+    by_source: dict[Path, list[CompressionResult]] = {}
+    for result in results:
+        by_source.setdefault(result.source, []).append(result)
+    for source, source_results in by_source.items():
+        parts = [
+            f"{result.encoding} {result.compressed_size / 1024:.1f}KB ({result.ratio:.0%})"
+            + ("・最新" if result.skipped else "")
+            for result in source_results
+        ]
+        lines.append(f"{source.name}: {source_results[0].original_size / 1024:.1f}KB → {', '.join(parts)}")
+    if brotli is None:
+        lines.append("brotli モジュールがないため .br は作成していません（pip install brotli）")
+    return lines
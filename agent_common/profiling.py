@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+処理段階ごとのプロファイル
+
+データ収集・保存・Web 生成などの段階ごとに cProfile の結果を .pstats ファイルに書き出し、
+経過時間・CPU 時間・tracemalloc によるメモリ使用量のピークを集計する。
+.pstats は python -m pstats や snakeviz などで開ける。
+
+tracemalloc はメモリ確保のたびに記録するため、計測中は処理が数倍遅くなる。
+段階ごとの比較やデータ量を増やしたときの傾向を見るために使う
+"""
+
+import cProfile
+import contextlib
+import pstats
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+TOP_FUNCTIONS = 3
+
+
+@dataclass
+class StageProfile:
+    """
+    1 段階の計測結果
+    """
+
+    name: str
+    label: str
+    wall: float
+    cpu: float
+    peak_memory: int
+    path: Path
+    top: list[str]
+
+
+class StageProfiler:
+    """
+    段階ごとに cProfile と tracemalloc で計測する（output_dir が None なら何もしない）
+    """
+
+    def __init__(self, output_dir: str | Path | None):
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.stages: list[StageProfile] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.output_dir is not None
+
+    @contextlib.contextmanager
+    def stage(self, name: str, label: str) -> Iterator[None]:
+        """
+        with ブロック内の処理を計測して output_dir/name.pstats に書き出す
+
+        非同期関数の await を囲んだ場合は、その間にイベントループで実行された処理すべてが対象になる
+        """
+        if not self.enabled:
+            yield
+            return
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        profile = cProfile.Profile()
+        wall, cpu = time.perf_counter(), time.process_time()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            peak = tracemalloc.get_traced_memory()[1]
+            if started_tracing:
+                tracemalloc.stop()
+
+            path = self.output_dir / f"{name}.pstats"
+            profile.dump_stats(path)
+            self.stages.append(StageProfile(name, label, wall, cpu, peak, path, top_functions(profile)))
+
+    def summary(self) -> list[str]:
+        """
+        段階ごとの経過時間・CPU 時間・メモリのピークと、時間のかかった関数を表示用の行で返す
+        """
+        if not self.stages:
+            return []
+        lines = [f"{'段階':<16} {'経過':>9} {'CPU':>9} {'メモリ':>10}  .pstats"]
+        for stage in self.stages:
+            lines.append(
+                f"{stage.label:<16} {stage.wall * 1000:>7.1f}ms {stage.cpu * 1000:>7.1f}ms "
+                f"{stage.peak_memory / 1024 / 1024:>8.1f}MB  {stage.path}"
+            )
+        total_wall = sum(stage.wall for stage in self.stages)
+        total_cpu = sum(stage.cpu for stage in self.stages)
+        lines.append(f"{'合計':<16} {total_wall * 1000:>7.1f}ms {total_cpu * 1000:>7.1f}ms")
+        for stage in self.stages:
+            for function in stage.top:
+                lines.append(f"{stage.label}: {function}")
+        return lines
+
+
+def top_functions(profile: cProfile.Profile, limit: int = TOP_FUNCTIONS) -> list[str]:
+    """
+    関数自身の処理時間（tottime）が長い関数
+    """
+    stats = pstats.Stats(profile)
+    entries = sorted(stats.stats.items(), key=lambda item: -item[1][2])[:limit]
+    return [
+        f"{Path(filename).name}:{line}({function}) {tottime * 1000:.1f}ms / {calls} 回"
+        for (filename, line, function), (_, calls, tottime, _, _) in entries
+    ]
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+検索 API のページ側の呼び出し
+
+agent_common.query_server の API を呼び出す JavaScript。ページの生成時に
+サーバーのモジュール（asyncio の HTTP サーバー）を読み込まないよう、別のモジュールにしている
+"""
+
+# 生成する HTML の <script> 内に埋め込む API の呼び出し
+QUERY_CLIENT_JS = r'''
+        // 検索 API の呼び出し
+        // search(params) は条件が変わるたびに先頭のページを、more() は次のページを取得し、
+        // onResults(これまでに取得したレコード, 件数, ファセット) を呼ぶ（古いリクエストは中断する）
+        function createQueryClient(endpoint, pageSize, onResults, onError) {
+            let controller = null;
+            let timer = null;
+            let params = {};
+            let records = [];
+            let total = 0;
+
+            function load(offset) {
+                if (controller) controller.abort();
+                controller = new AbortController();
+                const query = new URLSearchParams({ ...params, offset, limit: pageSize });
+                // ETag による再検証はブラウザの HTTP キャッシュが行う
+                fetch(`${endpoint}?${query}`, { signal: controller.signal })
+                    .then(response => {
+                        if (!response.ok) throw new Error(`${endpoint}: ${response.status}`);
+                        return response.json();
+                    })
+                    .then(result => {
+                        records = offset ? records.concat(result.records) : result.records;
+                        total = result.total;
+                        onResults(records, total, result.facets);
+                    })
+                    .catch(error => {
+                        if (error.name !== 'AbortError') onError(error);
+                    });
+            }
+
+            return {
+                search(newParams) {
+                    params = Object.fromEntries(Object.entries(newParams).filter(([, value]) => value));
+                    // 入力中の連続した変更は 1 回のリクエストにまとめる
+                    clearTimeout(timer);
+                    timer = setTimeout(() => load(0), 150);
+                },
+                more() {
+                    if (records.length < total) load(records.length);
+                },
+                hasMore() {
+                    return records.length < total;
+                },
+            };
+        }
+'''
@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+収集データの検索 API サーバー（標準ライブラリのみ）
+
+JSON または SQLite から読み込んだレコードからメモリ上のインデックスを作り、
+asyncio の HTTP サーバーで検索・ファセット・並べ替え・ページ分割の結果を返す。
+
+    GET /api                                      データセットの一覧
+    GET /api/<name>?q=醤油&area=渋谷&sort=rating&offset=0&limit=20
+
+検索は Web ページの検索（search_index）と同じく、正規化した検索語全体の部分一致。
+正規化したテキストは読み込み時に作っておき、検索は部分一致の走査だけにする
+（10 万件で数十 ms。ポスティングリストは作成に時間がかかるわりに速くならない）。
+ファセットの件数は、そのファセット以外の条件で絞り込んだレコードで数える。
+
+応答にはデータのバージョンと正規化した条件から作る ETag を付け、If-None-Match が
+一致すれば検索せずに 304 を返す。最近の応答は LRU キャッシュに保持する。
+データファイル（または記録ログなどの watch のファイル）が更新されると、次のリクエストで
+インデックスを作り直す。
+
+生成するページは query_client.QUERY_CLIENT_JS の createQueryClient でこの API を呼び出す
+"""
+
+import asyncio
+import hashlib
+import heapq
+import json
+import math
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlsplit
+
+from agent_common.search_index import normalize_text, record_text
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 200
+KEEP_ALIVE_SECONDS = 15
+
+# 並べ替えのキー（レコードから値を取る関数, 降順）のリスト。先頭のキーを優先する
+SortKeys = list[tuple[Callable[[dict[str, Any]], Any], bool]]
+
+STATUS_TEXT = {
+    200: "OK",
+    204: "No Content",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+
+@dataclass
+class Dataset:
+    """
+    API で配信するデータ
+
+    name は URL のパス（/api/<name>）とデータ中のレコード一覧のキーを兼ねる。
+    load は source（更新の検知に使うファイル）からデータ全体を読み込む関数。
+    sorts は並べ替えの名前とキーで、先頭が既定の並べ替え。
+    watch は source のほかに更新を検知するファイル（記録ログなど、なくてもよい）
+    """
+
+    name: str
+    source: Path
+    load: Callable[[], dict[str, Any]]
+    search_fields: list[str]
+    facet_fields: list[str]
+    sorts: dict[str, SortKeys]
+    watch: list[Path] = field(default_factory=list)
+
+    def stamp(self) -> tuple:
+        """
+        source と watch の (更新日時, サイズ)（ないファイルは None）
+        """
+        stamps = []
+        for path in (self.source, *self.watch):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                stamps.append(None)
+            else:
+                stamps.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(stamps)
+
+
+def facet_values(value: Any) -> list[str]:
+    """
+    ファセットに数える値（リストは要素ごと、空の値は数えない）
+    """
+    values = value if isinstance(value, list) else [value]
+    return [str(item) for item in values if item not in (None, "")]
+
+
+def sort_value(value: Any, numeric: bool) -> Any:
+    """
+    並べ替えの値を比較できる型にそろえる
+
+    ページの比較関数（数値の引き算・文字列の localeCompare）と同じく、数値のキーでは
+    文字列を数値に（数値にできない値は 0）、文字列のキーでは数値などを文字列にする
+    """
+    if numeric:
+        if isinstance(value, (int, float)) and not math.isnan(value):
+            return value
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return 0
+        return 0 if math.isnan(number) else number
+    if value is None:
+        return ""
+    return value if isinstance(value, str) else str(value)
+
+
+def sort_order(records: list[dict[str, Any]], keys: SortKeys) -> list[int]:
+    """
+    keys の順に並べたレコード番号（同じ値は元の順序のまま）
+
+    キーが空のレコードに返す値（「or 0」「or ''」）が数値なら数値、それ以外は文字列として比較する
+    """
+    order = list(range(len(records)))
+    # 安定ソートを優先度の低いキーから順に重ねる
+    for key, descending in reversed(keys):
+        numeric = isinstance(key({}), (int, float))
+        order.sort(key=lambda i: sort_value(key(records[i]), numeric), reverse=descending)
+    return order
+
+
+class QueryIndex:
+    """
+    1 つのデータセットのメモリ上のインデックス
+    """
+
+    def __init__(self, data: dict[str, Any], dataset: Dataset, version: str):
+        self.data = data
+        self.records: list[dict[str, Any]] = data.get(dataset.name) or []
+        self.version = version
+        self.facet_fields = list(dataset.facet_fields)
+        self.sort_names = list(dataset.sorts)
+
+        self.haystacks = [normalize_text(record_text(record, dataset.search_fields)) for record in self.records]
+
+        self.facet_postings: dict[str, dict[str, list[int]]] = {field: {} for field in self.facet_fields}
+        for record_id, record in enumerate(self.records):
+            for field in self.facet_fields:
+                for value in facet_values(record.get(field)):
+                    self.facet_postings[field].setdefault(value, []).append(record_id)
+
+        self.orders = {name: sort_order(self.records, keys) for name, keys in dataset.sorts.items()}
+        self.ranks = {}
+        for name, order in self.orders.items():
+            rank = [0] * len(order)
+            for position, record_id in enumerate(order):
+                rank[record_id] = position
+            self.ranks[name] = rank
+
+    def search(self, query: str) -> list[int]:
+        """
+        検索語全体を部分一致で含むレコード番号（昇順）
+        """
+        q = normalize_text(query)
+        if not q:
+            return list(range(len(self.records)))
+        return [record_id for record_id, text in enumerate(self.haystacks) if q in text]
+
+    def query(
+        self,
+        q: str = "",
+        filters: dict[str, str] | None = None,
+        sort: str | None = None,
+        offset: int = 0,
+        limit: int = DEFAULT_LIMIT,
+    ) -> dict[str, Any]:
+        """
+        検索語と filters（ファセットの値）で絞り込み、sort 順の offset から limit 件と
+        件数・ファセットの件数を返す
+        """
+        filters = filters or {}
+        sort = sort or self.sort_names[0]
+        matched = self.search(q)
+        allowed = {field: set(self.facet_postings[field].get(value, ())) for field, value in filters.items()}
+
+        def narrow(ids: list[int], skip: str | None = None) -> list[int]:
+            for field, members in allowed.items():
+                if field != skip:
+                    ids = [record_id for record_id in ids if record_id in members]
+            return ids
+
+        ids = narrow(matched)
+        facets = {}
+        for field in self.facet_fields:
+            base = narrow(matched, skip=field) if field in allowed else ids
+            if len(base) == len(self.records):
+                counts = {value: len(postings) for value, postings in self.facet_postings[field].items()}
+            else:
+                counts = Counter(
+                    value for record_id in base for value in facet_values(self.records[record_id].get(field))
+                )
+            facets[field] = dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+        end = offset + limit
+        if len(ids) == len(self.records):
+            page = self.orders[sort][offset:end]
+        elif end * 4 < len(ids):
+            # 先頭のページだけなら全件を並べ替えずに上位を取り出す
+            page = heapq.nsmallest(end, ids, key=self.ranks[sort].__getitem__)[offset:]
+        else:
+            page = sorted(ids, key=self.ranks[sort].__getitem__)[offset:end]
+
+        return {
+            "total": len(ids),
+            "offset": offset,
+            "limit": limit,
+            "sort": sort,
+            "records": [self.records[record_id] for record_id in page],
+            "facets": facets,
+        }
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "count": len(self.records),
+            "version": self.version,
+            "facets": self.facet_fields,
+            "sorts": self.sort_names,
+            "collected_at": self.data.get("collected_at"),
+        }
+
+
+class QueryCache:
+    """
+    最近の応答の LRU キャッシュ
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, bytes] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> bytes | None:
+        body = self.entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key: str, body: bytes) -> None:
+        if self.max_entries <= 0:
+            return
+        self.entries[key] = body
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def summary(self) -> str:
+        return f"ヒット {self.hits} / ミス {self.misses}（{len(self.entries)}/{self.max_entries} 件）"
+
+
+class RequestError(Exception):
+    """
+    クライアントの誤りによるリクエストの失敗（status で応答する）
+    """
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class QueryServer:
+    """
+    データセットごとのインデックスを持つ HTTP サーバー
+    """
+
+    def __init__(
+        self,
+        datasets: list[Dataset],
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        max_limit: int = MAX_LIMIT,
+        log: bool = True,
+    ):
+        self.datasets = {dataset.name: dataset for dataset in datasets}
+        self.indexes: dict[str, QueryIndex] = {}
+        self.cache = QueryCache(cache_size)
+        self.max_limit = max_limit
+        self.log = log
+        self._stamps: dict[str, tuple] = {}
+        self._locks = {name: asyncio.Lock() for name in self.datasets}
+
+    async def index(self, name: str) -> QueryIndex:
+        """
+        データセットのインデックス（データファイルが更新されていれば作り直す）
+        """
+        dataset = self.datasets[name]
+        async with self._locks[name]:
+            stamp = dataset.stamp()
+            if self._stamps.get(name) != stamp:
+                version = hashlib.sha1(f"{name}:{stamp}".encode("utf-8")).hexdigest()[:12]
+                started = time.perf_counter()
+                # 読み込みとインデックスの作成は時間がかかるため、イベントループを止めない
+                self.indexes[name] = await asyncio.to_thread(lambda: QueryIndex(dataset.load(), dataset, version))
+                self._stamps[name] = stamp
+                if self.log:
+                    print(
+                        f"📚 {name}: {len(self.indexes[name].records)} 件のインデックスを作成しました"
+                        f"（{(time.perf_counter() - started) * 1000:.0f}ms）"
+                    )
+        return self.indexes[name]
+
+    async def load_all(self) -> None:
+        for name in self.datasets:
+            await self.index(name)
+
+    async def respond(self, method: str, target: str, headers: dict[str, str]) -> tuple[int, dict[str, str], bytes]:
+        """
+        リクエストを処理し、(ステータス, 追加のヘッダー, 本文) を返す
+        """
+        if method == "OPTIONS":
+            return 204, {
+                "Access-Control-Allow-Methods": "GET, HEAD, OPTIONS",
+                "Access-Control-Allow-Headers": "If-None-Match",
+            }, b""
+        if method not in ("GET", "HEAD"):
+            raise RequestError(405, f"{method} には対応していません")
+
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+        if parts == ["api"]:
+            listing = {name: (await self.index(name)).describe() for name in self.datasets}
+            return 200, {"Cache-Control": "no-cache"}, encode_json(listing)
+        if len(parts) != 2 or parts[0] != "api" or parts[1] not in self.datasets:
+            raise RequestError(404, f"見つかりません: {url.path}")
+
+        name = parts[1]
+        index = await self.index(name)
+        params = self.parse_params(index, url.query)
+        key = json.dumps([name, index.version, params], ensure_ascii=False, sort_keys=True)
+        etag = '"' + hashlib.sha1(key.encode("utf-8")).hexdigest()[:20] + '"'
+        response_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(headers.get("if-none-match", ""), etag):
+            return 304, response_headers, b""
+
+        body = self.cache.get(key)
+        response_headers["X-Cache"] = "HIT" if body is not None else "MISS"
+        if body is None:
+            body = encode_json({"version": index.version, **index.query(**params)})
+            self.cache.put(key, body)
+        return 200, response_headers, body
+
+    def parse_params(self, index: QueryIndex, query_string: str) -> dict[str, Any]:
+        """
+        クエリ文字列を検索条件に変換する（不明なパラメータや不正な値は 400）
+        """
+        params = {name: values[-1] for name, values in parse_qs(query_string).items()}
+        unknown = set(params) - {"q", "sort", "offset", "limit", *index.facet_fields}
+        if unknown:
+            raise RequestError(400, f"不明なパラメータです: {', '.join(sorted(unknown))}")
+
+        sort = params.get("sort") or index.sort_names[0]
+        if sort not in index.sort_names:
+            raise RequestError(400, f"不明な並べ替えです: {sort}（{', '.join(index.sort_names)}）")
+        try:
+            offset = int(params.get("offset", 0))
+            limit = int(params.get("limit", DEFAULT_LIMIT))
+        except ValueError:
+            raise RequestError(400, "offset と limit には整数を指定してください")
+        if offset < 0 or not 0 < limit <= self.max_limit:
+            raise RequestError(400, f"offset は 0 以上、limit は 1〜{self.max_limit} で指定してください")
+
+        return {
+            "q": normalize_text(params.get("q", "")),
+            "filters": {field: params[field] for field in index.facet_fields if params.get(field)},
+            "sort": sort,
+            "offset": offset,
+            "limit": limit,
+        }
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        1 つの接続のリクエストを順に処理する（HTTP/1.1 の keep-alive に対応）
+        """
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    header, _, value = line.decode("latin-1").partition(":")
+                    headers[header.strip().lower()] = value.strip()
+                if int(headers.get("content-length") or 0):
+                    await reader.readexactly(int(headers["content-length"]))
+
+                started = time.perf_counter()
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    method, target, version = "", "", "HTTP/1.0"
+                try:
+                    if not method:
+                        raise RequestError(400, "リクエストを解釈できません")
+                    status, response_headers, body = await self.respond(method, target, headers)
+                except RequestError as e:
+                    status, response_headers, body = e.status, {}, encode_json({"error": str(e)})
+                except Exception as e:
+                    status, response_headers, body = 500, {}, encode_json({"error": f"{type(e).__name__}: {e}"})
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" or (version == "HTTP/1.1" and connection != "close")
+                writer.write(format_response(status, response_headers, body, head=method == "HEAD", keep_alive=keep_alive))
+                await writer.drain()
+                if self.log:
+                    cache = response_headers.get("X-Cache", "")
+                    print(f"   {status} {method} {target} {(time.perf_counter() - started) * 1000:.1f}ms {cache}".rstrip())
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            # 切断された接続・長すぎるヘッダー行
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        await self.load_all()
+        server = await asyncio.start_server(self.handle, host, port)
+        if self.log:
+            print(f"🚀 http://{host}:{port}/api で待ち受けています（Ctrl+C で終了）")
+        async with server:
+            await server.serve_forever()
+
+
+def encode_json(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    If-None-Match のいずれかの ETag（弱い比較）が一致するか
+    """
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return any(candidate == "*" or candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def format_response(status: int, headers: dict[str, str], body: bytes, head: bool = False, keep_alive: bool = True) -> bytes:
+    lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}"]
+    all_headers = {
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Expose-Headers": "ETag, X-Cache",
+        "Connection": "keep-alive" if keep_alive else "close",
+        **headers,
+    }
+    if status not in (204, 304):
+        all_headers["Content-Type"] = "application/json; charset=utf-8"
+        all_headers["Content-Length"] = str(len(body))
+    lines += [f"{name}: {value}" for name, value in all_headers.items()]
+    payload = b"" if head or status in (204, 304) else body
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload
+
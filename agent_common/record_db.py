@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+収集レコードの SQLite ストア
+
+JSON と同じ形式のデータ（{"collected_at": ..., "shops": [...]} など）を正規化して
+SQLite に保存する。スカラーのフィールドは列（絞り込み・並べ替えに使う列には
+インデックス）、リストのフィールドは子テーブル、それ以外のフィールド（明示的な null や
+空のリストを含む）は JSON として extra 列に入れ、load で元の形式に戻す。
+
+全文検索には trigram トークナイザーの FTS5 テーブルを使う。trigram では
+インデックスを使えない 2 文字以下の語（「醤油」など）は、文字列を 2 文字ずつに
+区切った（文字の連続の末尾の 1 文字も含む）FTS5 テーブルで探す。記号を含む短い語は
+FTS5 テーブルの LIKE で探す（全件を走査する）。
+検索対象の文字列と検索語は Web ページの検索と同じく NFKC 正規化・小文字化する
+"""
+
+import json
+import re
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from agent_common.search_index import normalize_text
+
+# trigram トークナイザーでインデックスを使える語の最小文字数
+MIN_TRIGRAM_LENGTH = 3
+
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+# 文字（str.isalnum と同じ、_ を除く \w）ごとに、次の文字までの 2 文字
+# （連続の末尾では 1 文字）
+BIGRAM = re.compile(r"(?=([^\W_][^\W_]?))")
+
+
+@dataclass(frozen=True)
+class RecordSchema:
+    """
+    レコードのテーブル定義
+
+    table はテーブル名とデータ中のレコード一覧のキーを兼ねる。
+    columns は列名と SQLite の型、list_fields は子テーブルに入れるリストのフィールド、
+    indexes はインデックスを作る列（列のタプルは複合インデックス、list_fields は
+    常に値にインデックスを作る）、
+    text_fields は全文検索の対象、order は読み込んだレコードのフィールドの順序
+    """
+
+    table: str
+    columns: dict[str, str]
+    list_fields: tuple[str, ...] = ()
+    indexes: tuple[str | tuple[str, ...], ...] = ()
+    text_fields: tuple[str, ...] = ()
+    order: tuple[str, ...] = ()
+
+    def ddl(self) -> list[str]:
+        columns = ", ".join(f"{name} {sql_type}" for name, sql_type in self.columns.items())
+        statements = [
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+            f"CREATE TABLE IF NOT EXISTS {self.table} (id INTEGER PRIMARY KEY, {columns}, extra TEXT)",
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table}_fts USING fts5(text, tokenize='trigram')",
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table}_bigram USING fts5("
+            f"text, tokenize='unicode61 remove_diacritics 0', detail=none)",
+        ]
+        for field in self.list_fields:
+            statements += [
+                f"CREATE TABLE IF NOT EXISTS {self.table}_{field} ("
+                f"record_id INTEGER NOT NULL REFERENCES {self.table}(id) ON DELETE CASCADE, "
+                f"position INTEGER NOT NULL, value TEXT NOT NULL, PRIMARY KEY (record_id, position)) WITHOUT ROWID",
+                f"CREATE INDEX IF NOT EXISTS {self.table}_{field}_value ON {self.table}_{field}(value, record_id)",
+            ]
+        for index in self.indexes:
+            columns = (index,) if isinstance(index, str) else index
+            statements.append(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_{'_'.join(columns)} ON {self.table}({', '.join(columns)})"
+            )
+        return statements
+
+
+class RecordDatabase:
+    """
+    1 種類のレコードを保存する SQLite データベース
+    """
+
+    def __init__(self, path: str | Path, schema: RecordSchema):
+        self.path = Path(path)
+        self.schema = schema
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self._count: int | None = None
+        with self.conn:
+            for statement in schema.ddl():
+                self.conn.execute(statement)
+
+    def __enter__(self) -> "RecordDatabase":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def replace_all(self, data: dict[str, Any]) -> int:
+        """
+        データ全体を 1 つのトランザクションで置き換え、保存したレコード数を返す
+        """
+        schema = self.schema
+        records = data.get(schema.table) or []
+        columns = list(schema.columns)
+        insert = (
+            f"INSERT INTO {schema.table} (id, {', '.join(columns)}, extra) "
+            f"VALUES (?, {', '.join('?' for _ in columns)}, ?)"
+        )
+        rows, fts_rows, bigram_rows = [], [], []
+        list_rows = {field: [] for field in schema.list_fields}
+        for record_id, record in enumerate(records, start=1):
+            values, extra = [], {}
+            for column in columns:
+                value = record.get(column)
+                if isinstance(value, SCALAR_TYPES) and not (value is None and column in record):
+                    values.append(value)
+                else:
+                    values.append(None)
+                    extra[column] = value
+            for field, value in record.items():
+                if field in schema.list_fields and isinstance(value, list) and value and all(isinstance(item, str) for item in value):
+                    list_rows[field] += [(record_id, i, item) for i, item in enumerate(value)]
+                elif field not in schema.columns:
+                    extra[field] = value
+            rows.append((record_id, *values, json.dumps(extra, ensure_ascii=False) if extra else None))
+            text = search_text(record, schema.text_fields)
+            fts_rows.append((record_id, text))
+            bigram_rows.append((record_id, bigram_text(text)))
+
+        with self.conn:
+            for field in schema.list_fields:
+                self.conn.execute(f"DELETE FROM {schema.table}_{field}")
+            self.conn.execute(f"DELETE FROM {schema.table}")
+            self.conn.execute(f"DELETE FROM {schema.table}_fts")
+            self.conn.execute(f"DELETE FROM {schema.table}_bigram")
+            self.conn.execute("DELETE FROM meta")
+            self.conn.executemany(insert, rows)
+            self.conn.executemany(f"INSERT INTO {schema.table}_fts (rowid, text) VALUES (?, ?)", fts_rows)
+            self.conn.executemany(f"INSERT INTO {schema.table}_bigram (rowid, text) VALUES (?, ?)", bigram_rows)
+            for field, values in list_rows.items():
+                self.conn.executemany(
+                    f"INSERT INTO {schema.table}_{field} (record_id, position, value) VALUES (?, ?, ?)", values
+                )
+            self.conn.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                # レコード一覧のキーも位置を保つために null で記録する
+                [(key, json.dumps(value if key != schema.table else None, ensure_ascii=False)) for key, value in data.items()],
+            )
+        self.conn.execute("ANALYZE")
+        self._count = len(records)
+        return len(records)
+
+    def load(self) -> dict[str, Any]:
+        """
+        保存したデータを JSON と同じ形式で読み込む
+        """
+        data = {
+            row["key"]: json.loads(row["value"])
+            for row in self.conn.execute("SELECT key, value FROM meta ORDER BY rowid")
+        }
+        rows = self.conn.execute(f"SELECT * FROM {self.schema.table} ORDER BY id").fetchall()
+        data[self.schema.table] = self._records(rows, all_rows=True)
+        return data
+
+    def count(self) -> int:
+        if self._count is None:
+            self._count = self.conn.execute(f"SELECT COUNT(*) FROM {self.schema.table}").fetchone()[0]
+        return self._count
+
+    def search(
+        self,
+        query: str = "",
+        filters: dict[str, Any] | None = None,
+        ranges: dict[str, tuple[Any, Any]] | None = None,
+        order_by: str | None = None,
+        descending: bool = False,
+        limit: int | None = 20,
+        offset: int = 0,
+    ) -> tuple[int, list[dict[str, Any]]]:
+        """
+        条件に合うレコードの件数と、order_by 順（NULL は最後、同じ値は id 順）の limit 件を返す
+
+        query は空白区切りの語をすべて含むレコード、filters は列またはリストの
+        フィールドの値（リストを渡すといずれかに一致）、ranges は列の (下限, 上限) で絞り込む
+        """
+        where, params = self.conditions(query, filters, ranges)
+        where_sql = f" WHERE {' AND '.join(where)}" if where else ""
+        table = self.schema.table
+
+        text_queries = self.text_queries(query)
+        if len(text_queries) == 1 and not filters and not ranges:
+            # 検索語だけの条件は全文検索のテーブルだけで数える
+            subquery, param = text_queries[0]
+            total = self.conn.execute(f"SELECT COUNT(*) FROM ({subquery})", [param]).fetchone()[0]
+        else:
+            total = self.conn.execute(f"SELECT COUNT(*) FROM {table}{where_sql}", params).fetchone()[0]
+        order_sql = " ORDER BY "
+        index_sql = ""
+        if order_by is not None:
+            self._check_column(order_by)
+            if where and order_by in self.schema.indexes and limit is not None:
+                # 一致するレコードが多い場合は、一致するレコードを並べ替えるより order_by の
+                # インデックスを順に走査して limit 件を見つけるほうが速い
+                scanned = (offset + limit) * self.count() / max(total, 1)
+                if scanned < total:
+                    index_sql = f" INDEXED BY {table}_{order_by}"
+            # インデックスの逆順の走査で並べられるよう、降順では同じ値を id の降順にする
+            direction = "DESC" if descending else "ASC"
+            order_sql += f"{order_by} {direction} NULLS LAST, id {direction}"
+        else:
+            order_sql += "id"
+        page_sql = " LIMIT ? OFFSET ?" if limit is not None else ""
+        page_params = [limit, offset] if limit is not None else []
+        rows = self.conn.execute(
+            f"SELECT * FROM {table}{index_sql}{where_sql}{order_sql}{page_sql}", [*params, *page_params]
+        ).fetchall()
+        return total, self._records(rows)
+
+    def conditions(
+        self,
+        query: str = "",
+        filters: dict[str, Any] | None = None,
+        ranges: dict[str, tuple[Any, Any]] | None = None,
+    ) -> tuple[list[str], list[Any]]:
+        """
+        search の絞り込み条件の WHERE 句（AND で結合する）とパラメータ
+        """
+        table = self.schema.table
+        where, params = [], []
+        for subquery, param in self.text_queries(query):
+            where.append(f"id IN ({subquery})")
+            params.append(param)
+
+        for field, value in (filters or {}).items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            placeholders = ", ".join("?" for _ in values)
+            if field in self.schema.list_fields:
+                where.append(f"id IN (SELECT record_id FROM {table}_{field} WHERE value IN ({placeholders}))")
+            else:
+                self._check_column(field)
+                where.append(f"{field} IN ({placeholders})")
+            params += list(values)
+
+        for field, (low, high) in (ranges or {}).items():
+            self._check_column(field)
+            if low is not None:
+                where.append(f"{field} >= ?")
+                params.append(low)
+            if high is not None:
+                where.append(f"{field} <= ?")
+                params.append(high)
+        return where, params
+
+    def text_queries(self, query: str) -> list[tuple[str, str]]:
+        """
+        検索語を含むレコードの id を返す副問い合わせとパラメータ
+
+        同じ全文検索のテーブルで探す語は 1 つの MATCH にまとめる
+        """
+        table = self.schema.table
+        trigrams, bigrams, queries = [], [], []
+        for term in normalize_text(query).split():
+            if len(term) >= MIN_TRIGRAM_LENGTH:
+                trigrams.append('"' + term.replace('"', '""') + '"')
+            elif term.isalnum():
+                # 2 文字の語は 2 文字のトークン、1 文字の語はその文字で始まるトークン
+                bigrams.append(f'"{term}"' if len(term) == 2 else f'"{term}" *')
+            else:
+                queries.append((
+                    f"SELECT rowid FROM {table}_fts WHERE text LIKE ? ESCAPE '\\'",
+                    "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%",
+                ))
+        if bigrams:
+            queries.insert(0, (f"SELECT rowid FROM {table}_bigram WHERE {table}_bigram MATCH ?", " AND ".join(bigrams)))
+        if trigrams:
+            queries.insert(0, (f"SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ?", " AND ".join(trigrams)))
+        return queries
+
+    def _check_column(self, name: str) -> None:
+        if name not in self.schema.columns:
+            raise ValueError(f"不明な列です: {name}")
+
+    def _records(self, rows: list[sqlite3.Row], all_rows: bool = False) -> list[dict[str, Any]]:
+        """
+        行を JSON と同じ形式のレコードに戻す（NULL の列は省略する）
+        """
+        ids = [row["id"] for row in rows]
+        lists: dict[str, dict[int, list[str]]] = {}
+        for field in self.schema.list_fields:
+            lists[field] = {}
+            sql = f"SELECT record_id, value FROM {self.schema.table}_{field}"
+            if all_rows:
+                cursor = self.conn.execute(sql + " ORDER BY record_id, position")
+            else:
+                cursor = self.conn.execute(
+                    sql + f" WHERE record_id IN ({', '.join('?' for _ in ids)}) ORDER BY record_id, position", ids
+                )
+            for record_id, value in cursor:
+                lists[field].setdefault(record_id, []).append(value)
+
+        records = []
+        for row in rows:
+            values = json.loads(row["extra"]) if row["extra"] else {}
+            for column in self.schema.columns:
+                if column not in values and row[column] is not None:
+                    values[column] = row[column]
+            for field in self.schema.list_fields:
+                if row["id"] in lists[field]:
+                    values[field] = lists[field][row["id"]]
+            record = {field: values.pop(field) for field in self.schema.order if field in values}
+            record.update(values)
+            records.append(record)
+        return records
+
+
+def bigram_text(text: str) -> str:
+    """
+    文字（英数字・かな・漢字など）の連続を 2 文字ずつに区切ったトークンを空白で連結する
+
+    連続の末尾の 1 文字もトークンにするため、1 文字の語はその文字で始まる
+    トークンの前方一致で探せる。同じトークンは 1 度だけ含める
+    """
+    return " ".join(dict.fromkeys(BIGRAM.findall(text)))
+
+
+def search_text(record: dict[str, Any], fields: tuple[str, ...]) -> str:
+    """
+    全文検索の対象にする正規化済みの文字列
+    """
+    parts = []
+    for field in fields:
+        value = record.get(field)
+        if isinstance(value, list):
+            parts += [str(item) for item in value]
+        elif value is not None:
+            parts.append(str(value))
+    return normalize_text("\n".join(parts))
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+収集レコードの追記型ログ（JSON Lines）
+
+保存のたびにデータ全体（スナップショット）を書き直す代わりに、現在の状態から
+変わったレコードだけを 1 行ずつ追記する。現在の状態はスナップショットに
+ログを先頭から順に適用したもので、compact でスナップショットに畳み込んでログを空にする。
+
+1 回の保存（実行）は以下の行からなり、commit の行まで書き込まれた実行だけを反映する
+（途中で中断した実行の行は読み込み時に無視する）:
+    {"type": "put", "run": "20260120-120000-1a2b", "t": "2026-01-20 12:00:00", "key": "...", "record": {...}}
+    {"type": "touch", "run": "20260120-120000-1a2b", "t": "2026-01-20 12:00:00", "key": "...", "fields": {...}}
+    {"type": "delete", "run": "20260120-120000-1a2b", "t": "2026-01-20 12:00:00", "key": "..."}
+    {"type": "commit", "run": "20260120-120000-1a2b", "t": "2026-01-20 12:00:00", "meta": {"collected_at": "..."}}
+
+put は同じキーの既存レコードをその位置で置き換え、新しいキーは末尾に追加する。
+volatile に指定したフィールド（最終確認日時など）だけが変わったレコードは変更とみなさず、
+レコード全体の put の代わりにそのフィールドだけを touch で更新する。
+meta はレコード一覧以外のトップレベルの値で、実行ごとに置き換える
+"""
+
+import json
+import os
+import secrets
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def log_path(directory: str | Path, snapshot: str | Path) -> Path:
+    """
+    スナップショット（ramen_shops.json など）の記録ログのパス（directory/ramen_shops.log.jsonl）
+
+    コレクターと、コレクターを読み込まずにログの有無を調べる generate_web.py が同じパスを使う
+    """
+    return Path(directory) / f"{Path(snapshot).stem}.log.jsonl"
+
+
+def _dump(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+class RecordLog:
+    """
+    スナップショット（JSON）と、それ以降の変更を記録するログ
+
+    records_key はデータ中のレコード一覧のキー、key はレコードの重複判定用のキー
+    （RecordStore と同じ関数）。volatile は変更の判定で無視するフィールド
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        snapshot: str | Path,
+        records_key: str,
+        key: Callable[[dict[str, Any]], str],
+        volatile: tuple[str, ...] = (),
+    ):
+        self.path = Path(path)
+        self.snapshot = Path(snapshot)
+        self.records_key = records_key
+        self.key = key
+        self.volatile = volatile
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def record_key(self, record: dict[str, Any]) -> str:
+        # キーが空のレコードは内容そのものをキーにする
+        return self.key(record) or _dump(record)
+
+    def runs(self) -> Iterator[tuple[list[dict[str, Any]], dict[str, Any]]]:
+        """
+        ログを 1 行ずつ読み、commit 済みの実行ごとに (put / touch / delete の行, meta) を返す
+        """
+        if not self.path.exists():
+            return
+        pending: dict[str, list[dict[str, Any]]] = {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 書き込み途中で中断した行
+                    continue
+                if not isinstance(entry, dict) or "run" not in entry:
+                    continue
+                if entry.get("type") in ("put", "touch", "delete"):
+                    pending.setdefault(entry["run"], []).append(entry)
+                elif entry.get("type") == "commit":
+                    yield pending.pop(entry["run"], []), entry.get("meta") or {}
+
+    def load(self) -> dict[str, Any] | None:
+        """
+        スナップショットにログを適用した現在のデータ（どちらもない場合は None）
+        """
+        if not self.snapshot.exists() and not self.path.exists():
+            return None
+        data: dict[str, Any] = {}
+        if self.snapshot.exists():
+            with open(self.snapshot, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        state = {self.record_key(record): record for record in data.get(self.records_key) or []}
+        meta = {name: value for name, value in data.items() if name != self.records_key}
+
+        for entries, run_meta in self.runs():
+            _apply(state, entries)
+            meta = run_meta
+        return self._document(meta, state)
+
+    def append(self, data: dict[str, Any], current: dict[str, Any] | None = None) -> tuple[dict[str, Any], dict[str, int]]:
+        """
+        data を新しい状態として、現在の状態（current、省略時は load()）との差分を追記する
+
+        ログを適用した後のデータ（レコードの並びは既存の位置を保つ）と、
+        追加・更新・削除したレコード数と volatile のフィールドだけを更新したレコード数（touched）を返す
+        """
+        current = self.load() if current is None else current
+        state = {self.record_key(record): record for record in (current or {}).get(self.records_key) or []}
+        incoming = {self.record_key(record): record for record in data.get(self.records_key) or []}
+        meta = {name: value for name, value in data.items() if name != self.records_key}
+
+        run = f"{datetime.now():%Y%m%d-%H%M%S}-{secrets.token_hex(2)}"
+        timestamp = datetime.now().strftime(TIMESTAMP_FORMAT)
+        entries = []
+        counts = {"added": 0, "updated": 0, "deleted": 0, "touched": 0}
+        for key, record in incoming.items():
+            current_record = state.get(key)
+            if current_record == record:
+                continue
+            fields = self._volatile_changes(current_record, record)
+            if fields is not None:
+                entries.append({"type": "touch", "run": run, "t": timestamp, "key": key, "fields": fields})
+                counts["touched"] += 1
+            else:
+                entries.append({"type": "put", "run": run, "t": timestamp, "key": key, "record": record})
+                counts["added" if current_record is None else "updated"] += 1
+        for key in state:
+            if key not in incoming:
+                entries.append({"type": "delete", "run": run, "t": timestamp, "key": key})
+                counts["deleted"] += 1
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        torn = False
+        if self.path.exists() and self.path.stat().st_size:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+        with open(self.path, "a", encoding="utf-8") as f:
+            if torn:
+                # 書き込み途中の行に続けて書かないよう改行する
+                f.write("\n")
+            for entry in entries:
+                f.write(_dump(entry) + "\n")
+            f.write(_dump({"type": "commit", "run": run, "t": timestamp, "meta": meta}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        _apply(state, entries)
+        return self._document(meta, state), counts
+
+    def _volatile_changes(self, current: dict[str, Any] | None, record: dict[str, Any]) -> dict[str, Any] | None:
+        """
+        current と record の違いが volatile のフィールドの値だけなら、record のそのフィールドの値
+        （それ以外の違いがあれば None）
+        """
+        if current is None or not self.volatile:
+            return None
+        if any(field in current and field not in record for field in self.volatile):
+            return None
+        strip = lambda value: {name: item for name, item in value.items() if name not in self.volatile}
+        if strip(current) != strip(record):
+            return None
+        return {field: record[field] for field in self.volatile if field in record and record[field] != current.get(field)}
+
+    def compact(self, save: Callable[[dict[str, Any]], Any]) -> dict[str, Any] | None:
+        """
+        現在のデータを save でスナップショットに書き込み、ログを削除する
+        """
+        data = self.load()
+        if data is None:
+            return None
+        save(data)
+        self.discard()
+        return data
+
+    def discard(self) -> None:
+        """
+        スナップショットに反映済みのログを削除
+        """
+        if self.path.exists():
+            self.path.unlink()
+
+    def _document(self, meta: dict[str, Any], state: dict[str, dict[str, Any]]) -> dict[str, Any]:
+        data = {**meta, self.records_key: list(state.values())}
+        if "total_count" in data:
+            data["total_count"] = len(state)
+        return data
+
+
+def _apply(state: dict[str, dict[str, Any]], entries: list[dict[str, Any]]) -> None:
+    for entry in entries:
+        if entry["type"] == "put":
+            state[entry["key"]] = entry["record"]
+        elif entry["type"] == "touch":
+            if entry["key"] in state:
+                state[entry["key"]] = {**state[entry["key"]], **entry["fields"]}
+        else:
+            state.pop(entry["key"], None)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+エージェントセッションの記録と再生
+
+query() が返すメッセージストリーム（テキストブロック、ツール使用ブロック、
+結果メッセージなど）を JSON Lines 形式で記録し、後からネットワークなしで
+同じ順序のまま再生する。パスが .gz で終わる場合は gzip 圧縮する。
+
+記録の 1 行は 1 メッセージで、以下の形式:
+    {"session": "渋谷", "t": 1.234, "message": {"type": "AssistantMessage", ...}}
+"""
+
+import asyncio
+import dataclasses
+import gzip
+import json
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, AsyncIterator
+
+try:
+    import claude_agent_sdk
+except ImportError:  # 再生だけなら SDK がなくても動作する
+    claude_agent_sdk = None
+
+
+def _open(path: Path, mode: str):
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def serialize_message(obj: Any) -> Any:
+    """
+    SDK のメッセージやブロックを JSON 化可能な値に変換（None のフィールドは省略）
+    """
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        data = {"type": type(obj).__name__}
+        for field in dataclasses.fields(obj):
+            value = getattr(obj, field.name)
+            if value is not None:
+                data[field.name] = serialize_message(value)
+        return data
+    if isinstance(obj, SimpleNamespace):
+        return serialize_message(vars(obj))
+    if isinstance(obj, dict):
+        return {str(k): serialize_message(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [serialize_message(v) for v in obj]
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    return str(obj)
+
+
+def deserialize_message(data: Any) -> Any:
+    """
+    serialize_message の逆変換
+
+    SDK がインストールされていれば元の型（AssistantMessage, TextBlock 等）を復元し、
+    なければ同じ属性を持つ SimpleNamespace を返す
+    """
+    if isinstance(data, list):
+        return [deserialize_message(v) for v in data]
+    if not isinstance(data, dict):
+        return data
+
+    fields = {k: deserialize_message(v) for k, v in data.items() if k != "type"}
+    type_name = data.get("type")
+    if not isinstance(type_name, str):
+        return fields if "type" not in data else {"type": type_name, **fields}
+
+    cls = getattr(claude_agent_sdk, type_name, None) if claude_agent_sdk else None
+    if isinstance(cls, type) and dataclasses.is_dataclass(cls):
+        names = {f.name for f in dataclasses.fields(cls)}
+        try:
+            return cls(**{k: v for k, v in fields.items() if k in names})
+        except TypeError:
+            pass
+
+    # 型を復元できない dict（ツール入力など）はそのまま返す
+    if type_name[:1].isupper():
+        return SimpleNamespace(**fields)
+    return {"type": type_name, **fields}
+
+
+class SessionRecorder:
+    """
+    メッセージストリームをファイルに記録する
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = _open(self.path, "w")
+        self.message_count = 0
+
+    async def record(self, session: str, messages: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        """
+        メッセージをそのまま流しつつ、経過時間とともに記録する
+        """
+        start = time.monotonic()
+        try:
+            async for message in messages:
+                line = {
+                    "session": session,
+                    "t": round(time.monotonic() - start, 3),
+                    "message": serialize_message(message),
+                }
+                self._file.write(json.dumps(line, ensure_ascii=False, separators=(",", ":")) + "\n")
+                self.message_count += 1
+                yield message
+        finally:
+            # 途中で打ち切られた場合も元のストリームを確実に閉じる
+            if hasattr(messages, "aclose"):
+                await messages.aclose()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+class SessionReplayer:
+    """
+    記録したメッセージストリームをセッション名ごとに再生する
+
+    speed が 0 の場合は待ち時間なしで再生し、正の値の場合は
+    記録時の経過時間を speed 倍速で再現する
+    """
+
+    def __init__(self, path: str | Path, speed: float = 0.0):
+        self.path = Path(path)
+        self.speed = speed
+        self.sessions: dict[str, list[tuple[float, Any]]] = {}
+
+        with _open(self.path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self.sessions.setdefault(entry["session"], []).append((entry.get("t", 0.0), entry["message"]))
+
+    async def replay(self, session: str) -> AsyncIterator[Any]:
+        if session not in self.sessions:
+            raise KeyError(
+                f"記録にセッション '{session}' がありません（記録済み: {', '.join(self.sessions) or 'なし'}）"
+            )
+
+        elapsed = 0.0
+        for t, data in self.sessions[session]:
+            if self.speed > 0 and t > elapsed:
+                await asyncio.sleep((t - elapsed) / self.speed)
+            elapsed = t
+            yield deserialize_message(data)
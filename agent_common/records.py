@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+収集レコードのストア
+
+エージェントの出力から得たレコードを検証・重複除去しながら蓄積し、
+目標件数に達したかどうかを判定する
+"""
+
+from typing import Any, Callable
+
+
+class RecordStore:
+    """
+    検証済み・重複除去済みのレコードを到着順に保持する
+
+    key が同じレコードが再び届いた場合は、既存レコードの空欄だけを補完する。
+    on_change を指定すると、レコードの追加・補完のたびに保持しているレコードを渡して呼ぶ
+    """
+
+    def __init__(
+        self,
+        key: Callable[[dict[str, Any]], str],
+        validate: Callable[[dict[str, Any]], bool],
+        target: int | None = None,
+        on_change: Callable[[dict[str, Any]], None] | None = None,
+    ):
+        self.key = key
+        self.validate = validate
+        self.target = target
+        self.on_change = on_change
+        self.records: list[dict[str, Any]] = []
+        self._index: dict[str, dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __contains__(self, record: dict[str, Any]) -> bool:
+        key = self.key(record)
+        return bool(key) and key in self._index
+
+    @property
+    def reached(self) -> bool:
+        """
+        目標件数に達したかどうか
+        """
+        return self.target is not None and len(self.records) >= self.target
+
+    def add(self, record: Any) -> bool:
+        """
+        レコードを追加し、新規レコードだった場合に True を返す
+        """
+        if not isinstance(record, dict) or not self.validate(record):
+            return False
+
+        key = self.key(record)
+        existing = self._index.get(key) if key else None
+        if existing is not None:
+            changed = False
+            for field, value in record.items():
+                if existing.get(field) in (None, "", []) and value not in (None, "", []):
+                    existing[field] = value
+                    changed = True
+            if changed and self.on_change is not None:
+                self.on_change(existing)
+            return False
+
+        record = dict(record)
+        self.records.append(record)
+        if key:
+            self._index[key] = record
+        if self.on_change is not None:
+            self.on_change(record)
+        return True
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+エージェント実行時の共通設定
+
+コレクターが query() を呼び出す際の記録・再生やツール結果のキャッシュ、
+複数エージェントで共有する実行枠と予算などをまとめて扱う
+"""
+
+import contextlib
+import dataclasses
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable
+
+from agent_common.budget import SessionBudget
+from agent_common.recording import SessionRecorder, SessionReplayer
+from agent_common.tool_cache import ToolCallCache
+from agent_common.tracing import SessionTracer
+
+
+@dataclass
+class AgentRuntime:
+    """
+    エージェントセッションの実行方法
+
+    recorder を設定するとメッセージストリームを記録し、
+    replayer を設定すると query() を呼ばずに記録を再生する。
+    tool_cache を設定すると同じ WebSearch / WebFetch の呼び出しをキャッシュで置き換える。
+    budget を設定するとセッションの同時実行数とターン数・コストを他のエージェントと
+    共有の上限で制限する（turns・cost_usd はこのランタイムで使った分）。
+    tracer を設定するとターン・ツール呼び出しごとの所要時間などを記録する
+    """
+
+    recorder: SessionRecorder | None = None
+    replayer: SessionReplayer | None = None
+    tool_cache: ToolCallCache | None = None
+    budget: SessionBudget | None = None
+    tracer: SessionTracer | None = None
+    turns: int = field(default=0, init=False)
+    cost_usd: float = field(default=0.0, init=False)
+
+    def configure(self, options: Any) -> Any:
+        """
+        ClaudeAgentOptions にフックなどの実行時設定を追加したコピーを返す
+        """
+        if self.tool_cache is None:
+            return options
+        hooks = {event: list(matchers) for event, matchers in (options.hooks or {}).items()}
+        for event, matchers in self.tool_cache.hooks().items():
+            hooks.setdefault(event, []).extend(matchers)
+        return dataclasses.replace(options, hooks=hooks)
+
+    def stream(
+        self,
+        session: str,
+        options: Any,
+        start: Callable[[Any], AsyncIterator[Any]],
+    ) -> AsyncIterator[Any]:
+        """
+        セッションのメッセージストリームを返す
+
+        start は options を受け取って実際に query() を呼び出す関数で、再生時には呼ばれない
+        """
+        if self.replayer is not None:
+            messages = self.replayer.replay(session)
+        elif self.budget is not None:
+            messages = self._budgeted(session, options, start)
+        else:
+            messages = start(options)
+            if self.recorder is not None:
+                messages = self.recorder.record(session, messages)
+        if self.tracer is not None:
+            cached = self.tool_cache.served if self.tool_cache is not None else None
+            messages = self.tracer.trace(session, messages, cached)
+        return messages
+
+    def record_added(self, session: str, key: str) -> None:
+        """
+        コレクターがレコードを登録したときに呼ぶ（計測時のみ記録する）
+        """
+        if self.tracer is not None:
+            self.tracer.record_added(session, key)
+
+    async def _budgeted(
+        self,
+        session: str,
+        options: Any,
+        start: Callable[[Any], AsyncIterator[Any]],
+    ) -> AsyncIterator[Any]:
+        """
+        共有の実行枠を確保し、残りの予算に合わせて max_turns・max_budget_usd を制限して実行する
+        """
+        async with self.budget.session(session, options.max_turns) as usage:
+            max_budget_usd = options.max_budget_usd
+            if usage["max_cost_usd"] is not None:
+                max_budget_usd = min(max_budget_usd or usage["max_cost_usd"], usage["max_cost_usd"])
+            limited = dataclasses.replace(options, max_turns=usage["max_turns"], max_budget_usd=max_budget_usd)
+
+            messages = start(limited)
+            if self.recorder is not None:
+                messages = self.recorder.record(session, messages)
+            assistant_turns = 0
+            try:
+                async with contextlib.aclosing(messages):
+                    async for message in messages:
+                        if hasattr(message, 'total_cost_usd'):
+                            usage["turns"] = message.num_turns
+                            usage["cost_usd"] = message.total_cost_usd or 0.0
+                        elif hasattr(message, 'model') and hasattr(message, 'content'):
+                            assistant_turns += 1
+                        yield message
+            finally:
+                # 途中で終了して ResultMessage を受け取れなかった場合は応答の回数で数える
+                if usage["turns"] is None:
+                    usage["turns"] = assistant_turns
+                self.turns += usage["turns"]
+                self.cost_usd += usage["cost_usd"]
+
+    def close(self) -> None:
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.tool_cache is not None:
+            self.tool_cache.save()
+        if self.tracer is not None:
+            self.tracer.close()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+検索ページに埋め込む転置インデックス
+
+生成時にレコードのテキストを正規化（NFKC・小文字化）してトークンに分割し、
+トークンごとのレコード番号リスト（ポスティングリスト）を作る。
+
+- ラテン文字・数字の連続: 単語トークン
+  （検索時は前方一致。クエリ先頭の単語は語中から始まりうるため語彙を部分一致で走査）
+- それ以外（日本語など）の連続: 1 文字と 2 文字の n-gram
+
+ブラウザ側（SEARCH_INDEX_JS）はクエリを同じ規則で分割してポスティングリストの
+積集合を取り、候補だけを従来どおりの部分一致で確認する。
+ポスティングリストは差分符号化して埋め込み、使うときに 1 度だけ復元する。
+"""
+
+import re
+import unicodedata
+from typing import Any, Iterable
+
+LATIN_CHARS = "0-9a-zÀ-ɏ"
+TOKEN_PATTERN = re.compile(rf"[{LATIN_CHARS}]+|[^\s{LATIN_CHARS}]+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    検索用にテキストを正規化（JS の normalize('NFKC').toLowerCase() に相当）
+    """
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def record_text(record: dict[str, Any], fields: Iterable[str]) -> str:
+    """
+    検索対象のフィールドを空白区切りで連結（リストは要素ごとに展開）
+    """
+    values = []
+    for field in fields:
+        value = record.get(field)
+        values.extend(value if isinstance(value, list) else [value])
+    return " ".join(str(value) for value in values if value)
+
+
+def tokenize(text: str) -> tuple[set[str], set[str]]:
+    """
+    正規化済みテキストを (単語トークン, n-gram) に分割
+    """
+    words = set()
+    grams = set()
+    for match in TOKEN_PATTERN.finditer(text):
+        run = match.group()
+        if re.match(rf"[{LATIN_CHARS}]", run):
+            words.add(run)
+            continue
+        grams.update(run)
+        grams.update(run[i:i + 2] for i in range(len(run) - 1))
+    return words, grams
+
+
+def _delta_encode(ids: list[int]) -> list[int]:
+    return [ids[0]] + [b - a for a, b in zip(ids, ids[1:])]
+
+
+def build_search_index(records: list[dict[str, Any]], fields: Iterable[str]) -> dict[str, Any]:
+    """
+    レコードの転置インデックスを作成
+
+    words はソート済みの単語一覧で、wordPostings が同じ順序のポスティングリスト。
+    grams は n-gram からポスティングリストへの辞書
+    """
+    fields = list(fields)
+    word_postings: dict[str, list[int]] = {}
+    gram_postings: dict[str, list[int]] = {}
+
+    for record_id, record in enumerate(records):
+        words, grams = tokenize(normalize_text(record_text(record, fields)))
+        for word in words:
+            word_postings.setdefault(word, []).append(record_id)
+        for gram in grams:
+            gram_postings.setdefault(gram, []).append(record_id)
+
+    words = sorted(word_postings)
+    return {
+        "fields": fields,
+        "words": words,
+        "wordPostings": [_delta_encode(word_postings[word]) for word in words],
+        "grams": {gram: _delta_encode(ids) for gram, ids in sorted(gram_postings.items())},
+    }
+
+
+# 生成する HTML の <script> 内に埋め込む検索処理
+SEARCH_INDEX_JS = r'''
+        // 転置インデックスによる検索
+        // search(query) は部分一致するレコード番号を昇順で返す
+        function createSearchIndex(index, records) {
+            const latinRun = /^[0-9a-zÀ-ɏ]/;
+            const tokenPattern = /[0-9a-zÀ-ɏ]+|[^\s0-9a-zÀ-ɏ]+/gu;
+            const allIds = records.map((_, i) => i);
+            const gramCache = new Map();
+            const wordCache = new Array(index.words.length);
+            const haystacks = new Array(records.length);
+
+            function normalize(text) {
+                return String(text).normalize('NFKC').toLowerCase();
+            }
+
+            // 差分符号化されたポスティングリストを復元
+            function decode(deltas) {
+                const ids = new Array(deltas.length);
+                let id = 0;
+                for (let i = 0; i < deltas.length; i++) {
+                    id += deltas[i];
+                    ids[i] = id;
+                }
+                return ids;
+            }
+
+            function gramPostings(gram) {
+                let ids = gramCache.get(gram);
+                if (ids === undefined) {
+                    ids = decode(index.grams[gram] || []);
+                    gramCache.set(gram, ids);
+                }
+                return ids;
+            }
+
+            function wordPostings(i) {
+                if (wordCache[i] === undefined) wordCache[i] = decode(index.wordPostings[i]);
+                return wordCache[i];
+            }
+
+            function union(lists) {
+                if (lists.length === 1) return lists[0];
+                const merged = [].concat(...lists).sort((a, b) => a - b);
+                return merged.filter((id, i) => i === 0 || id !== merged[i - 1]);
+            }
+
+            // 前方一致する単語のポスティングリストの和集合（ソート済みの語彙を二分探索）
+            function prefixPostings(prefix) {
+                const words = index.words;
+                let lo = 0, hi = words.length;
+                while (lo < hi) {
+                    const mid = (lo + hi) >> 1;
+                    if (words[mid] < prefix) lo = mid + 1; else hi = mid;
+                }
+                const lists = [];
+                for (let i = lo; i < words.length && words[i].startsWith(prefix); i++) {
+                    lists.push(wordPostings(i));
+                }
+                return union(lists);
+            }
+
+            // 部分一致する単語のポスティングリストの和集合（語彙を走査）
+            function infixPostings(fragment) {
+                const lists = [];
+                index.words.forEach((word, i) => {
+                    if (word.includes(fragment)) lists.push(wordPostings(i));
+                });
+                return union(lists);
+            }
+
+            function intersect(a, b) {
+                const result = [];
+                let i = 0, j = 0;
+                while (i < a.length && j < b.length) {
+                    if (a[i] === b[j]) {
+                        result.push(a[i]);
+                        i++;
+                        j++;
+                    } else if (a[i] < b[j]) {
+                        i++;
+                    } else {
+                        j++;
+                    }
+                }
+                return result;
+            }
+
+            function haystack(id) {
+                if (haystacks[id] === undefined) {
+                    const record = records[id];
+                    haystacks[id] = normalize(index.fields
+                        .flatMap(field => Array.isArray(record[field]) ? record[field] : [record[field]])
+                        .filter(Boolean)
+                        .join(' '));
+                }
+                return haystacks[id];
+            }
+
+            function search(query) {
+                const q = normalize(query);
+                if (!q) return allIds;
+
+                const lists = [];
+                for (const match of q.matchAll(tokenPattern)) {
+                    const run = match[0];
+                    if (latinRun.test(run)) {
+                        lists.push(match.index === 0 ? infixPostings(run) : prefixPostings(run));
+                        continue;
+                    }
+                    const chars = Array.from(run);
+                    if (chars.length === 1) {
+                        lists.push(gramPostings(chars[0]));
+                    }
+                    for (let i = 0; i + 1 < chars.length; i++) {
+                        lists.push(gramPostings(chars[i] + chars[i + 1]));
+                    }
+                }
+
+                // 短いリストから順に積集合を取り、候補を部分一致で確認
+                lists.sort((a, b) => a.length - b.length);
+                let candidates = lists.length ? lists[0] : allIds;
+                for (let i = 1; i < lists.length && candidates.length; i++) {
+                    candidates = intersect(candidates, lists[i]);
+                }
+                return candidates.filter(id => haystack(id).includes(q));
+            }
+
+            return { search };
+        }
+'''
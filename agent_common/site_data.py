@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+検索ページのデータを外部ファイルとして書き出す
+
+データを index.html に埋め込まず、内容のハッシュをファイル名に含めた JSON
+（例: shops-0.3f2a9c1b7e4d.json）として index.html と同じディレクトリに書き出す。
+ページは表示後に fetch で非同期に読み込む。
+
+レコードはキーの安定したハッシュでシャードに振り分けるため、データの一部が
+変わっても他のシャードのファイル名は変わらず、ブラウザや CDN のキャッシュが効く。
+"""
+
+import hashlib
+import json
+import re
+import zlib
+from pathlib import Path
+from typing import Any, Callable
+
+from agent_common.atomic_write import write_atomic
+
+HASH_LENGTH = 12
+HASHED_NAME_PATTERN = re.compile(rf"^(?P<stem>.+)\.[0-9a-f]{{{HASH_LENGTH}}}\.json$")
+
+
+def shard_records(
+    records: list[dict[str, Any]],
+    key: Callable[[dict[str, Any]], str],
+    shards: int,
+) -> list[list[dict[str, Any]]]:
+    """
+    レコードをキーのハッシュでシャードに振り分ける（シャード内は元の順序を保つ）
+    """
+    parts: list[list[dict[str, Any]]] = [[] for _ in range(max(1, shards))]
+    for record in records:
+        parts[zlib.crc32(key(record).encode("utf-8")) % len(parts)].append(record)
+    return parts
+
+
+def write_hashed_json(output_dir: Path, stem: str, obj: Any) -> str:
+    """
+    obj を内容のハッシュ付きのファイル名で書き出し、ファイル名を返す
+
+    同じ内容のファイルが既にあれば書き込まない
+    """
+    content = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    filename = f"{stem}.{hashlib.sha256(content).hexdigest()[:HASH_LENGTH]}.json"
+    path = output_dir / filename
+    if not path.exists():
+        write_atomic(path, content, skip_unchanged=False)
+    return filename
+
+
+def remove_stale_files(output_dir: Path, stems: Callable[[str], bool], keep: set[str]) -> list[str]:
+    """
+    以前の出力で書き出したハッシュ付きファイルのうち、keep にないものを削除
+
+    stems はファイル名からハッシュを除いた部分を受け取り、削除対象かを返す
+    """
+    removed = []
+    for path in sorted(output_dir.glob("*.json")):
+        match = HASHED_NAME_PATTERN.match(path.name)
+        if match and stems(match.group("stem")) and path.name not in keep:
+            path.unlink()
+            removed.append(path.name)
+    return removed
+
+
+# 生成する HTML の <script> 内に埋め込むデータ読み込み処理
+DATA_LOADER_JS = r'''
+        // 外部データファイルの読み込み
+        // manifest.shards を decode で変換して順に連結し、manifest.index があれば一緒に読み込む
+        async function loadSiteData(manifest, decode = records => records) {
+            const fetchJson = url => fetch(url).then(response => {
+                if (!response.ok) throw new Error(`${url}: ${response.status}`);
+                return response.json();
+            });
+            const [index, ...parts] = await Promise.all([
+                manifest.index ? fetchJson(manifest.index) : null,
+                ...manifest.shards.map(fetchJson),
+            ]);
+            return { records: [].concat(...parts.map(decode)), index };
+        }
+'''
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+WebSearch / WebFetch の呼び出し結果キャッシュ
+
+SDK のフックでツール呼び出しを横取りし、同じ検索クエリや URL への
+2 回目以降の呼び出しを実行せずにキャッシュ済みの結果で置き換える。
+
+- PostToolUse: 実行されたツールの結果を正規化したクエリ/URL をキーに保存
+- PreToolUse: 有効期限内の結果があれば前回の結果をエージェントに返す
+
+フックから組み込みツールの実行を省略する方法は permissionDecision の deny だけのため、
+キャッシュヒットは deny として返し、理由の欄に前回の結果を入れる。
+
+キャッシュは既定では 1 回の実行の中だけで共有する（メモリ上のみ）。
+ファイルを指定した場合だけ保存し、次回以降の実行でも TTL 内なら再利用する。
+"""
+
+import json
+import os
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit, urlunsplit
+
+CACHED_TOOLS = ("WebSearch", "WebFetch")
+# ファイルに保存したキャッシュの有効期間（毎日の更新より短くし、前日の結果を使い回さない）
+DEFAULT_TTL_HOURS = 12.0
+# 拒否理由に含める結果の最大文字数
+MAX_RESULT_CHARS = 20000
+
+
+def normalize_query(query: str) -> str:
+    """
+    検索クエリを正規化（NFKC・小文字化・空白の統一）
+    """
+    return " ".join(unicodedata.normalize("NFKC", query).lower().split())
+
+
+# スキームごとの既定のポート（URL から省略しても同じ）
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    URL を正規化（スキーム・ホストの小文字化、既定のポートとフラグメントを除去）
+
+    スキームやパスが違えば別のページになりうるため、http と https、末尾の / の有無は区別する
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port is not None and DEFAULT_PORTS.get(scheme) == port:
+        netloc = netloc.rsplit(":", 1)[0]
+    if parts.username is not None or parts.password is not None:
+        # ユーザー情報は大文字と小文字を区別する
+        userinfo = parts.netloc.rpartition("@")[0]
+        netloc = f"{userinfo}@{netloc.rpartition('@')[2]}"
+    # ホストだけの URL はパス / と同じ
+    path = parts.path or ("/" if netloc else "")
+    return urlunsplit((scheme, netloc, path, parts.query, ""))
+
+
+def cache_key(tool_name: str, tool_input: dict[str, Any]) -> str | None:
+    """
+    ツール呼び出しのキャッシュキーを返す（キャッシュ対象外なら None）
+    """
+    if tool_name == "WebSearch" and tool_input.get("query"):
+        return f"WebSearch:{normalize_query(str(tool_input['query']))}"
+    if tool_name == "WebFetch" and tool_input.get("url"):
+        return f"WebFetch:{normalize_url(str(tool_input['url']))}"
+    return None
+
+
+def _result_text(response: Any) -> str:
+    if isinstance(response, str):
+        return response
+    return json.dumps(response, ensure_ascii=False, default=str)
+
+
+class ToolCallCache:
+    """
+    ツール呼び出し結果のキャッシュ
+
+    hooks() を ClaudeAgentOptions.hooks に渡して使う。
+    path を指定しなければメモリ上だけに持ち、指定すると save() でファイルに保存する。
+    hits / misses に今回の実行でのヒット数・ミス数を、served にキャッシュの結果を
+    返したツール呼び出しの ID を記録する。
+    """
+
+    def __init__(self, path: str | Path | None = None, ttl_hours: float = DEFAULT_TTL_HOURS):
+        self.path = Path(path) if path is not None else None
+        self.ttl = ttl_hours * 3600
+        self.hits = 0
+        self.misses = 0
+        self.served: set[str] = set()
+        self.entries: dict[str, dict[str, Any]] = {}
+        if self.path is not None and self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️ ツールキャッシュを読み込めませんでした（空の状態で開始します）: {e}")
+        self._prune()
+
+    def _prune(self) -> None:
+        now = time.time()
+        self.entries = {
+            key: entry for key, entry in self.entries.items()
+            if now - entry.get("t", 0) < self.ttl
+        }
+
+    def get(self, tool_name: str, tool_input: dict[str, Any]) -> dict[str, Any] | None:
+        key = cache_key(tool_name, tool_input)
+        entry = self.entries.get(key) if key else None
+        if entry is None or time.time() - entry["t"] >= self.ttl:
+            return None
+        return entry
+
+    def put(self, tool_name: str, tool_input: dict[str, Any], response: Any) -> None:
+        key = cache_key(tool_name, tool_input)
+        if key is None:
+            return
+        self.entries[key] = {
+            "t": time.time(),
+            "input": tool_input,
+            "result": _result_text(response)[:MAX_RESULT_CHARS],
+        }
+
+    async def _pre_tool_use(self, input_data: dict[str, Any], tool_use_id: str | None, context: Any) -> dict[str, Any]:
+        tool_name = input_data.get("tool_name", "")
+        tool_input = input_data.get("tool_input") or {}
+        if cache_key(tool_name, tool_input) is None:
+            return {}
+        entry = self.get(tool_name, tool_input)
+        if entry is None:
+            self.misses += 1
+            return {}
+
+        self.hits += 1
+        if tool_use_id:
+            self.served.add(tool_use_id)
+        reason = (
+            f"キャッシュ済みの {tool_name} の結果です（エラーではありません）。"
+            f"同じ内容の呼び出しは実行済みのため、以下をこの呼び出しの結果として使ってください。"
+            f"\n入力: {json.dumps(entry['input'], ensure_ascii=False)}"
+            f"\n結果:\n{entry['result']}"
+        )
+        return {
+            "hookSpecificOutput": {
+                "hookEventName": "PreToolUse",
+                "permissionDecision": "deny",
+                "permissionDecisionReason": reason,
+            }
+        }
+
+    async def _post_tool_use(self, input_data: dict[str, Any], tool_use_id: str | None, context: Any) -> dict[str, Any]:
+        self.put(
+            input_data.get("tool_name", ""),
+            input_data.get("tool_input") or {},
+            input_data.get("tool_response"),
+        )
+        return {}
+
+    def hooks(self) -> dict[str, list[Any]]:
+        """
+        ClaudeAgentOptions.hooks に追加するフック設定を返す
+        """
+        from claude_agent_sdk import HookMatcher
+
+        matcher = "|".join(CACHED_TOOLS)
+        return {
+            "PreToolUse": [HookMatcher(matcher=matcher, hooks=[self._pre_tool_use])],
+            "PostToolUse": [HookMatcher(matcher=matcher, hooks=[self._post_tool_use])],
+        }
+
+    def save(self) -> None:
+        """
+        キャッシュをファイルに書き出す（一時ファイル経由で置き換える、path がなければ何もしない）
+        """
+        if self.path is None:
+            return
+        self._prune()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"ヒット {self.hits} / ミス {self.misses}（ヒット率 {rate:.0f}%、保存 {len(self.entries)} 件）"
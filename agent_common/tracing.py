@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+エージェントセッションの計測
+
+query() のメッセージストリームを流しながら、アシスタントのターン・ツール呼び出し・
+ツール結果・レコードの登録・結果メッセージごとにイベントを JSON Lines 形式で記録する。
+ツール結果にはツール呼び出しからの待ち時間、ターンには直前のイベントからの
+待ち時間とペイロードのサイズ、結果メッセージにはトークン数とコストを含める。
+ツールキャッシュが結果を返した呼び出し（SDK 上は拒否として返る）はエラーではなく
+キャッシュヒット（cached）として記録する。
+
+記録の 1 行は 1 イベントで、以下の形式:
+    {"t": 1767225600.123, "elapsed": 12.345, "session": "渋谷", "event": "tool_result",
+     "tool": "WebFetch", "id": "toolu_...", "latency": 3.21, "bytes": 18234, "is_error": false, "cached": false}
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+from agent_common.recording import serialize_message
+
+SLOWEST_TOOLS = 5
+
+
+def payload_size(value: Any) -> int:
+    """
+    JSON にした場合の UTF-8 バイト数
+    """
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(json.dumps(serialize_message(value), ensure_ascii=False).encode("utf-8"))
+
+
+class SessionTracer:
+    """
+    メッセージストリームのイベントをファイルに記録し、集計を表示する
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._start = time.monotonic()
+        self.events: list[dict[str, Any]] = []
+
+    def emit(self, session: str, event: str, **fields: Any) -> dict[str, Any]:
+        line = {
+            "t": round(time.time(), 3),
+            "elapsed": round(time.monotonic() - self._start, 3),
+            "session": session,
+            "event": event,
+            **fields,
+        }
+        self.events.append(line)
+        self._file.write(json.dumps(line, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+        return line
+
+    def record_added(self, session: str, key: str) -> None:
+        """
+        コレクターがレコードを登録したことを記録する
+        """
+        self.emit(session, "record", key=key)
+
+    async def trace(
+        self,
+        session: str,
+        messages: AsyncIterator[Any],
+        cached: set[str] | None = None,
+    ) -> AsyncIterator[Any]:
+        """
+        メッセージをそのまま流しつつ、ターン・ツール呼び出し・結果のイベントを記録する
+
+        cached はツールキャッシュが結果を返したツール呼び出しの ID（ToolCallCache.served）
+        """
+        cached = cached if cached is not None else set()
+        started = last = time.monotonic()
+        pending: dict[str, tuple[str, float]] = {}
+        turns = 0
+        self.emit(session, "session_start")
+        try:
+            async for message in messages:
+                now = time.monotonic()
+                kind = type(message).__name__
+                if hasattr(message, 'total_cost_usd'):
+                    self.emit(
+                        session, "result",
+                        num_turns=message.num_turns,
+                        duration_ms=message.duration_ms,
+                        duration_api_ms=message.duration_api_ms,
+                        cost_usd=message.total_cost_usd,
+                        usage=serialize_message(message.usage),
+                        is_error=message.is_error,
+                    )
+                elif hasattr(message, 'content') and isinstance(message.content, list):
+                    tool_results = []
+                    text_bytes = 0
+                    for block in message.content:
+                        if hasattr(block, 'tool_use_id'):
+                            tool_results.append(block)
+                        elif hasattr(block, 'name') and hasattr(block, 'input'):
+                            pending[block.id] = (block.name, now)
+                            self.emit(session, "tool_call", tool=block.name, id=block.id, bytes=payload_size(block.input))
+                        elif hasattr(block, 'text'):
+                            text_bytes += payload_size(block.text)
+                    if kind == "AssistantMessage":
+                        turns += 1
+                        self.emit(
+                            session, "turn",
+                            turn=turns,
+                            latency=round(now - last, 3),
+                            bytes=text_bytes,
+                            tool_calls=sum(1 for block in message.content if hasattr(block, 'input')),
+                            usage=serialize_message(getattr(message, 'usage', None)),
+                        )
+                    for block in tool_results:
+                        name, called = pending.pop(block.tool_use_id, (None, now))
+                        hit = block.tool_use_id in cached
+                        self.emit(
+                            session, "tool_result",
+                            tool=name,
+                            id=block.tool_use_id,
+                            latency=round(now - called, 3),
+                            bytes=payload_size(getattr(block, 'content', None)),
+                            is_error=bool(getattr(block, 'is_error', False)) and not hit,
+                            cached=hit,
+                        )
+                last = now
+                yield message
+        finally:
+            self.emit(session, "session_end", seconds=round(time.monotonic() - started, 3), turns=turns)
+            # 途中で打ち切られた場合も元のストリームを確実に閉じる
+            if hasattr(messages, "aclose"):
+                await messages.aclose()
+
+    def summary(self) -> list[str]:
+        return summarize_events(self.events)
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+def load_trace(path: str | Path) -> list[dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def summarize_events(events: list[dict[str, Any]]) -> list[str]:
+    """
+    イベントの集計（遅いツール、レコードあたりのターン数、最初のレコードまでの時間）を
+    表示用の行で返す
+    """
+    tools: dict[str, dict[str, Any]] = {}
+    sessions: dict[str, dict[str, Any]] = {}
+    for event in events:
+        session = sessions.setdefault(event["session"], {
+            "start": event["elapsed"], "turns": 0, "records": 0, "first": None, "seconds": None, "cost": None,
+        })
+        kind = event["event"]
+        if kind == "turn":
+            session["turns"] += 1
+        elif kind == "record":
+            session["records"] += 1
+            if session["first"] is None:
+                session["first"] = event["elapsed"] - session["start"]
+        elif kind == "result":
+            session["cost"] = event.get("cost_usd")
+        elif kind == "session_end":
+            session["seconds"] = event["seconds"]
+        elif kind == "tool_result":
+            stats = tools.setdefault(event.get("tool") or "?", {"calls": 0, "total": 0.0, "max": 0.0, "bytes": 0, "errors": 0, "cached": 0})
+            stats["calls"] += 1
+            stats["total"] += event["latency"]
+            stats["max"] = max(stats["max"], event["latency"])
+            stats["bytes"] += event["bytes"]
+            stats["errors"] += event["is_error"]
+            stats["cached"] += event.get("cached", False)
+
+    lines = []
+    if tools:
+        lines.append(
+            f"{'ツール':<28} {'回数':>5} {'合計':>8} {'平均':>7} {'最大':>7} {'結果サイズ':>10} {'キャッシュ':>5} {'エラー':>5}"
+        )
+        slowest = sorted(tools.items(), key=lambda item: -item[1]["total"])[:SLOWEST_TOOLS]
+        for name, stats in slowest:
+            lines.append(
+                f"{name:<28} {stats['calls']:>5} {stats['total']:>7.1f}s {stats['total'] / stats['calls']:>6.2f}s "
+                f"{stats['max']:>6.2f}s {stats['bytes'] / 1024:>8.1f}KB {stats['cached']:>5} {stats['errors']:>5}"
+            )
+
+    lines.append(f"{'セッション':<28} {'ターン':>5} {'登録':>5} {'ターン/件':>9} {'初回登録':>8} {'所要':>7} {'コスト':>9}")
+    for name, session in sessions.items():
+        per_record = f"{session['turns'] / session['records']:.1f}" if session["records"] else "-"
+        first = f"{session['first']:.1f}s" if session["first"] is not None else "-"
+        seconds = f"{session['seconds']:.1f}s" if session["seconds"] is not None else "-"
+        cost = f"${session['cost']:.4f}" if session["cost"] is not None else "-"
+        lines.append(
+            f"{name:<28} {session['turns']:>5} {session['records']:>5} {per_record:>9} {first:>8} {seconds:>7} {cost:>9}"
+        )
+
+    turns = sum(session["turns"] for session in sessions.values())
+    records = sum(session["records"] for session in sessions.values())
+    firsts = [event["elapsed"] for event in events if event["event"] == "record"]
+    first = f"{firsts[0] - events[0]['elapsed']:.1f}s" if firsts else "-"
+    per_record = f"{turns / records:.1f}" if records else "-"
+    lines.append(f"合計: {turns} ターン / {records} 件（1 件あたり {per_record} ターン）、最初の登録まで {first}")
+    return lines
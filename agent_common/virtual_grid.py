@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+検索ページのカードグリッドのウィンドウ表示
+
+件数が多いと、絞り込みのたびに全カードの HTML を組み立てて DOM に入れる処理が
+重くなる。ウィンドウ表示では画面に見えている行（と前後の余裕分）のカードだけを
+DOM に置き、それより上下の行はグリッド全幅のスペーサーで高さだけ確保する。
+行の高さは描画したカードから測り、カードの HTML はレコードごとにキャッシュする。
+"""
+
+# ウィンドウ表示を自動で有効にする件数
+WINDOWED_MIN_RECORDS = 200
+# 表示範囲の上下に余分に描画する行数
+DEFAULT_BUFFER_ROWS = 3
+
+
+def use_windowed(record_count: int, windowed: bool | None) -> bool:
+    """
+    ウィンドウ表示を使うかどうか（None なら件数で自動判定）
+    """
+    if windowed is None:
+        return record_count >= WINDOWED_MIN_RECORDS
+    return windowed
+
+
+# 生成する HTML の <script> 内に埋め込むグリッド描画処理
+VIRTUAL_GRID_JS = r'''
+        // カードグリッドの描画
+        // render(items) で表示するレコードを差し替える。enabled が true のときは
+        // 表示範囲の行だけを描画し、上下はスペーサーで高さを確保する
+        function createVirtualGrid(container, renderCard, options) {
+            const cache = new WeakMap();
+            let items = [];
+            let rowHeight = 0;
+            let measuredColumns = 0;
+            let range = null;
+            let scheduled = false;
+
+            // レコードごとにカードの HTML をキャッシュ
+            function cardHtml(item) {
+                let html = cache.get(item);
+                if (html === undefined) {
+                    html = renderCard(item);
+                    cache.set(item, html);
+                }
+                return html;
+            }
+
+            function spacer(height) {
+                return `<div class="grid-spacer" style="grid-column: 1 / -1; height: ${height}px"></div>`;
+            }
+
+            function update() {
+                scheduled = false;
+                const style = getComputedStyle(container);
+                const columns = Math.max(1, style.gridTemplateColumns.split(' ').filter(Boolean).length);
+                const gap = parseFloat(style.rowGap) || 0;
+                const rows = Math.ceil(items.length / columns);
+                // 未計測のうちは仮の行の高さで計算し、描画後に測り直す
+                const stride = (rowHeight || 400) + gap;
+                const top = -container.getBoundingClientRect().top;
+                const first = Math.min(rows, Math.max(0, Math.floor(top / stride) - options.bufferRows));
+                const last = Math.min(rows, Math.max(first, Math.ceil((top + window.innerHeight) / stride) + options.bufferRows));
+
+                if (range && range.first === first && range.last === last && range.columns === columns && range.stride === stride) {
+                    return;
+                }
+                range = { first, last, columns, stride };
+
+                const html = [];
+                if (first > 0) html.push(spacer(first * stride - gap));
+                const end = Math.min(items.length, last * columns);
+                for (let i = first * columns; i < end; i++) {
+                    html.push(cardHtml(items[i]));
+                }
+                if (last < rows) html.push(spacer((rows - last) * stride - gap));
+                container.innerHTML = html.join('');
+
+                // 初回と列数が変わったときに、描画した行の平均の高さを測る
+                const cards = container.querySelectorAll(':scope > :not(.grid-spacer)');
+                if (cards.length > 0 && columns !== measuredColumns) {
+                    const renderedRows = Math.ceil(cards.length / columns);
+                    const height = cards[cards.length - 1].getBoundingClientRect().bottom - cards[0].getBoundingClientRect().top;
+                    measuredColumns = columns;
+                    rowHeight = (height + gap) / renderedRows - gap;
+                    schedule();
+                }
+            }
+
+            function schedule() {
+                if (!scheduled) {
+                    scheduled = true;
+                    requestAnimationFrame(update);
+                }
+            }
+
+            function render(newItems) {
+                items = newItems;
+                range = null;
+                if (!options.enabled) {
+                    container.innerHTML = items.map(cardHtml).join('');
+                    return;
+                }
+                update();
+            }
+
+            if (options.enabled) {
+                window.addEventListener('scroll', schedule, { passive: true });
+                window.addEventListener('resize', schedule);
+            }
+
+            return { render };
+        }
+'''
@@ -6,16 +6,100 @@ AI ニュース検索 Web ページ生成スクリプト
 """
 
 import json
+import re
+import sys
 from pathlib import Path
 from datetime import datetime
 
+# 共通モジュールのパスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agent_common.virtual_grid import use_windowed, DEFAULT_BUFFER_ROWS, VIRTUAL_GRID_JS
+from agent_common.site_data import shard_records, write_hashed_json, remove_stale_files, DATA_LOADER_JS
+from agent_common.columnar import encode_records, COLUMNAR_JS
+from agent_common.atomic_write import write_atomic
+from agent_common.precompress import precompress_directory, format_results
+from agent_common.query_client import QUERY_CLIENT_JS
+from agent_common.record_log import log_path
+from agent_common.data_file import manifest_path
+
 OUTPUT_DIR = Path(__file__).parent.parent / "docs" / "ai_news_agent"
 DATA_FILE = OUTPUT_DIR / "ai_news.json"
 
-
-def generate_html(data: dict) -> str:
+# データの読み込み（記録ログの適用）に使うコレクターと記録ログ
+# （build_sites.py・serve_api.py が使う。コレクターの読み込みには時間がかかるため、ログの有無はここで調べる）
+COLLECTOR_FILE = Path(__file__).parent / "news_collector.py"
+LOG_FILE = log_path(Path(__file__).parent, DATA_FILE)
+
+# コレクターが保存時に書き出すデータファイルのマニフェスト（ビルドキャッシュの確認に使う）
+MANIFEST_FILE = manifest_path(Path(__file__).parent, DATA_FILE)
+
+# ポータルページ（docs/index.html）に表示するサイト情報
+SITE_META = {
+    "title": "AI News Aggregator",
+    "description": "AI関連の最新ニュースを収集・検索できるWebアプリ。カテゴリ、ソース、重要度でフィルタリング可能。",
+    "tags": ["Dark Theme"],
+    "records_key": "articles",
+    "unit": "記事",
+}
+
+# ビルドキャッシュのキーに含める生成処理のソースファイル
+GENERATOR_SOURCES = [
+    Path(__file__),
+    *(Path(__file__).parent.parent / "agent_common" / name for name in (
+        "virtual_grid.py",
+        "site_data.py",
+        "columnar.py",
+        "atomic_write.py",
+        "precompress.py",
+        "query_client.py",
+    )),
+]
+
+# 列指向データで辞書エンコードするフィールド
+DICTIONARY_FIELDS = ["category", "source", "importance"]
+
+# 検索 API（agent_common.query_server）のテキスト検索・絞り込み・並べ替え
+# （ページの filterAndSort と同じ）
+SEARCH_FIELDS = ["title", "summary", "source", "category", "tags"]
+FACET_FIELDS = ["category", "source", "importance"]
+IMPORTANCE_PRIORITY = {"high": 0, "medium": 1, "low": 2}
+SORT_KEYS = {
+    "date": [(lambda article: article.get('date') or '', True)],
+    "importance": [
+        (lambda article: IMPORTANCE_PRIORITY.get(article.get('importance'), 3), False),
+        (lambda article: article.get('date') or '', True),
+    ],
+    "source": [(lambda article: article.get('source') or '', False)],
+    "category": [(lambda article: article.get('category') or '', False)],
+}
+
+# 検索 API から 1 回に取得する記事数
+API_PAGE_SIZE = 60
+
+# 外部データファイルのファイル名（ハッシュを除いた部分）
+SHARD_STEM = "articles-{}"
+
+
+def generate_html(
+    data: dict,
+    windowed: bool | None = None,
+    window_buffer_rows: int = DEFAULT_BUFFER_ROWS,
+    data_files: dict | None = None,
+    columnar: bool = True,
+    api_url: str | None = None,
+) -> str:
     """
     検索可能な HTML ページを生成
+
+    windowed を True にすると、画面に見えているニュースカードだけを描画する
+    ウィンドウ表示にする（None なら記事数で自動判定）。
+    window_buffer_rows は表示範囲の上下に余分に描画する行数。
+    data_files（write_site が作るファイル一覧）を指定するとニュースデータを埋め込まず、
+    ページ表示後に外部ファイルから読み込む。
+    columnar が True ならニュースデータを列指向で埋め込み、False なら記事の配列のまま埋め込む。
+    api_url（検索 API サーバーの URL）を指定するとニュースデータを埋め込まず、
+    検索のたびに API から結果を API_PAGE_SIZE 件ずつ取得する
     """
     articles = data.get('articles', [])
     collected_at = data.get('collected_at', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
@@ -25,8 +109,7 @@ def generate_html(data: dict) -> str:
     sources = sorted(set(article.get('source', '') for article in articles if article.get('source')))
     importances = ['high', 'medium', 'low']
 
-    # JSON データを埋め込み用に整形
-    articles_json = json.dumps(articles, ensure_ascii=False)
+    grid_options = json.dumps({"enabled": use_windowed(len(articles), windowed), "bufferRows": window_buffer_rows})
 
     html = f'''<!DOCTYPE html>
 <html lang="ja">
@@ -452,7 +535,7 @@ def generate_html(data: dict) -> str:
         <div class="no-results" id="noResults" style="display: none;">
             <h3>該当するニュースがありません</h3>
             <p>検索条件を変更してお試しください</p>
-        </div>
+        </div>{MORE_BUTTON if api_url else ''}
     </main>
 
     <footer class="footer">
@@ -461,9 +544,12 @@ def generate_html(data: dict) -> str:
     </footer>
 
     <script>
-        // ニュースデータ
-        const articles = {articles_json};
+        // ニュースデータ（外部データファイルの場合は読み込み後に設定）
+        let articles = null;
         const totalCount = {len(articles)};
+        // 検索 API を使う場合の呼び出し（createQueryClient）
+        let queryClient = null;
+{VIRTUAL_GRID_JS}{COLUMNAR_JS}{DATA_LOADER_JS if data_files else ''}{QUERY_CLIENT_JS if api_url else ''}
 
         // DOM 要素
         const searchText = document.getElementById('searchText');
@@ -474,12 +560,25 @@ def generate_html(data: dict) -> str:
         const newsGrid = document.getElementById('newsGrid');
         const resultCount = document.getElementById('resultCount');
         const noResults = document.getElementById('noResults');
+        const newsGridView = createVirtualGrid(newsGrid, renderNewsCard, {grid_options});
 
         // 重要度の優先順位
         const importancePriority = {{ 'high': 0, 'medium': 1, 'low': 2 }};
 
         // 検索とフィルタリング
         function filterAndSort() {{
+            if (queryClient) {{
+                queryClient.search({{
+                    q: searchText.value,
+                    category: categoryFilter.value,
+                    source: sourceFilter.value,
+                    importance: importanceFilter.value,
+                    sort: sortOrder.value,
+                }});
+                return;
+            }}
+            if (!articles) return;
+
             const query = searchText.value.toLowerCase();
             const category = categoryFilter.value;
             const source = sourceFilter.value;
@@ -542,18 +641,17 @@ def generate_html(data: dict) -> str:
         }}
 
         // ニュースカードのレンダリング
-        function renderNews(filteredArticles) {{
-            resultCount.textContent = filteredArticles.length;
+        // total は検索 API で一部の記事だけを取得した場合の全件数
+        function renderNews(filteredArticles, total = filteredArticles.length) {{
+            resultCount.textContent = total;
 
-            if (filteredArticles.length === 0) {{
-                newsGrid.innerHTML = '';
-                noResults.style.display = 'block';
-                return;
-            }}
-
-            noResults.style.display = 'none';
+            noResults.style.display = total === 0 ? 'block' : 'none';
+            newsGridView.render(filteredArticles);
+        }}
 
-            newsGrid.innerHTML = filteredArticles.map(article => `
+        // ニュースカードの HTML
+        function renderNewsCard(article) {{
+            return `
                 <article class="news-card">
                     <div class="news-header">
                         <div class="news-meta">
@@ -578,15 +676,14 @@ def generate_html(data: dict) -> str:
                         ` : ''}}
                     </div>
                 </article>
-            `).join('');
+            `;
         }}
 
         // HTML エスケープ
+        const htmlEscapes = {{ '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' }};
         function escapeHtml(text) {{
             if (!text) return '';
-            const div = document.createElement('div');
-            div.textContent = text;
-            return div.innerHTML;
+            return String(text).replace(/[&<>"']/g, c => htmlEscapes[c]);
         }}
 
         // フィルタクリア
@@ -607,7 +704,7 @@ def generate_html(data: dict) -> str:
         sortOrder.addEventListener('change', filterAndSort);
 
         // 初期表示
-        filterAndSort();
+{generate_data_script(articles, data_files, columnar, api_url)}
     </script>
 </body>
 </html>
@@ -615,6 +712,107 @@ def generate_html(data: dict) -> str:
     return html
 
 
+def generate_data_script(articles: list, data_files: dict | None, columnar: bool = True, api_url: str | None = None) -> str:
+    """
+    ニュースデータ（または検索 API の呼び出し）を設定して初期表示する JS を生成
+    """
+    if api_url:
+        endpoint = api_url.rstrip('/') + '/api/' + SITE_META['records_key']
+        return f'''        const moreButton = document.getElementById('moreButton');
+        resultCount.textContent = '-';
+        queryClient = createQueryClient({json.dumps(endpoint)}, {API_PAGE_SIZE}, (records, total) => {{
+            renderNews(records, total);
+            moreButton.style.display = queryClient.hasMore() ? 'inline-block' : 'none';
+        }}, error => {{
+            noResults.style.display = 'block';
+            noResults.querySelector('h3').textContent = '検索 API に接続できませんでした';
+            console.error(error);
+        }});
+        moreButton.addEventListener('click', () => queryClient.more());
+        filterAndSort();'''
+
+    if data_files is None:
+        # JSON データを埋め込み用に整形
+        articles_json = json.dumps(encode_records(articles, columnar, DICTIONARY_FIELDS), ensure_ascii=False)
+        return f'''        articles = decodeRecords({articles_json});
+        filterAndSort();'''
+
+    return f'''        resultCount.textContent = '-';
+        loadSiteData({json.dumps(data_files)}, decodeRecords).then(data => {{
+            articles = data.records;
+            filterAndSort();
+        }}).catch(error => {{
+            noResults.style.display = 'block';
+            noResults.querySelector('h3').textContent = 'ニュースデータを読み込めませんでした';
+            console.error(error);
+        }});'''
+
+
+def write_site(
+    data: dict,
+    output_dir: Path = OUTPUT_DIR,
+    external_data: bool = False,
+    shards: int = 1,
+    columnar: bool = True,
+    precompress: bool = False,
+    api_url: str | None = None,
+    **html_options,
+) -> Path:
+    """
+    Web ページを output_dir に書き出し、index.html のパスを返す
+
+    external_data を指定するとニュースデータを内容のハッシュ付きの JSON ファイルとして
+    書き出し、ページからは非同期に読み込む。
+    記事は URL（なければタイトル）のハッシュで shards 個のファイルに振り分ける。
+    columnar は埋め込み・書き出しともにニュースデータを列指向にするかどうか。
+    precompress を指定すると出力ディレクトリの各ファイルの .gz（brotli があれば .br も）を書き出す。
+    api_url を指定するとデータを埋め込まず書き出しもせず、ページから検索 API を呼び出す
+    （external_data より優先する）
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    data_files = None
+    if external_data and not api_url:
+        parts = shard_records(
+            data.get('articles', []),
+            key=lambda article: str(article.get('url') or article.get('title', '')),
+            shards=shards,
+        )
+        data_files = {
+            "shards": [
+                write_hashed_json(output_dir, SHARD_STEM.format(i), encode_records(part, columnar, DICTIONARY_FIELDS))
+                for i, part in enumerate(parts) if part
+            ],
+        }
+        data = {**data, 'articles': [article for part in parts for article in part]}
+
+    html = generate_html(data, data_files=data_files, columnar=columnar, api_url=api_url, **html_options)
+
+    output_file = output_dir / "index.html"
+    write_atomic(output_file, html)
+
+    # 以前の出力で書き出した不要なデータファイルを削除
+    keep = set(data_files["shards"]) if data_files else set()
+    remove_stale_files(output_dir, _is_data_stem, keep)
+
+    if precompress:
+        for line in format_results(precompress_directory(output_dir)):
+            print(f"  {line}")
+
+    return output_file
+
+
+# 検索 API の次のページを取得するボタン
+MORE_BUTTON = '''
+        <div style="text-align: center; margin-top: 1.5rem;">
+            <button class="clear-btn" id="moreButton" style="display: none;">さらに表示</button>
+        </div>'''
+
+
+def _is_data_stem(stem: str) -> bool:
+    return re.fullmatch(r"articles-\d+", stem) is not None
+
+
 def generate_options(items: list) -> str:
     """
     select タグ用のオプションを生成
@@ -622,35 +820,33 @@ def generate_options(items: list) -> str:
     return '\n'.join(f'<option value="{item}">{item}</option>' for item in items)
 
 
-def main():
+def main(db: str | Path | None = None):
     """
-    メイン実行関数
+    メイン実行関数（db を指定すると JSON の代わりに SQLite データベースから読み込む）
     """
     print("=" * 60)
     print("AI News Web ページ生成")
     print("=" * 60)
     print()
 
-    # JSON データを読み込み
-    if not DATA_FILE.exists():
-        print(f"データファイルが見つかりません: {DATA_FILE}")
+    # JSON データ（記録ログがあれば適用する）またはデータベースを読み込み
+    # （スクリプトとして実行した場合のみ使うため、ここで読み込む）
+    if db:
+        from news_db import load_db
+        data = load_db(db) if Path(db).exists() else None
+    else:
+        from news_collector import load_data
+        data = load_data()
+    if data is None:
+        print(f"データファイルが見つかりません: {Path(db) if db else DATA_FILE}")
         print("先に news_collector.py を実行してデータを収集してください。")
         return
 
-    with open(DATA_FILE, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
     articles_count = len(data.get('articles', []))
     print(f"{articles_count} 件のニュースデータを読み込みました")
 
-    # HTML を生成
-    html = generate_html(data)
-
-    # ファイルに保存
-    output_file = OUTPUT_DIR / "index.html"
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html)
+    # HTML を生成してファイルに保存
+    output_file = write_site(data)
 
     print(f"Web ページを生成しました: {output_file}")
     print()
@@ -661,4 +857,13 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AI News Web ページ生成")
+    parser.add_argument(
+        '--db',
+        metavar='PATH',
+        help='JSON の代わりに読み込む SQLite データベース'
+    )
+    args = parser.parse_args()
+    main(db=args.db)
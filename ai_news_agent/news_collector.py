@@ -7,18 +7,34 @@ JSON 形式で保存するエージェント
 """
 
 import asyncio
+import contextlib
+import dataclasses
 import json
-import re
+import sys
 from pathlib import Path
 from datetime import datetime
-from typing import Any
+from typing import Any, Callable
 
-from claude_agent_sdk import query, ClaudeAgentOptions
+from claude_agent_sdk import query, tool, create_sdk_mcp_server, ClaudeAgentOptions
+
+# 共通モジュールのパスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agent_common.checkpoint import Checkpoint
+from agent_common.data_file import save_json, manifest_path
+from agent_common.json_stream import JsonStreamExtractor
+from agent_common.record_log import RecordLog, log_path
+from agent_common.records import RecordStore
+from agent_common.runtime import AgentRuntime
 
 
 # 出力ディレクトリ
 OUTPUT_DIR = Path(__file__).parent.parent / "docs" / "ai_news_agent"
 
+# スナップショット（ai_news.json）以降の変更を追記する記録ログ
+LOG_FILE = log_path(Path(__file__).parent, "ai_news.json")
+MANIFEST_FILE = manifest_path(Path(__file__).parent, "ai_news.json")
+
 # エージェントへのシステムプロンプト
 SYSTEM_PROMPT = """あなたは AI 関連ニュースを収集する専門エージェントです。
 
@@ -56,13 +72,17 @@ SYSTEM_PROMPT = """あなたは AI 関連ニュースを収集する専門エー
 3. WebFetch ツールを使用して記事の詳細を確認
 4. 最低15記事以上の情報を収集することを目標とする
 
-## 出力形式
-最終的に以下の JSON 形式で結果を出力してください：
+## 登録方法
+記事の情報を1件確認するたびに、record_article ツールを呼び出してその記事を登録してください。
+- 1回の呼び出しで1記事を登録します
+- 登録済みの記事を再度登録すると、空欄の項目だけが補完されます
+- 収集した全データを最後にまとめて出力する必要はありません
+
+record_article ツールが利用できない場合のみ、記事ごとに以下の形式の JSON を
+```json と ``` で囲んで出力してください：
 
 ```json
 {
-  "collected_at": "YYYY-MM-DD HH:MM:SS",
-  "total_count": 数値,
   "articles": [
     {
       "title": "記事タイトル",
@@ -83,97 +103,381 @@ SYSTEM_PROMPT = """あなたは AI 関連ニュースを収集する専門エー
 - 情報が不明な場合は null を設定してください
 - できるだけ最新のニュース（過去1週間以内）を優先してください
 - 英語・日本語両方のソースから収集可能です
-
-最後に、収集した全データを上記の JSON 形式で出力してください。
-JSON は ```json と ``` で囲んで出力してください。
 """
 
 
-async def collect_news_data() -> dict[str, Any]:
+# 記事登録ツール（エージェントが 1 記事ずつ呼び出すインプロセス MCP ツール）
+RECORD_SERVER_NAME = "news"
+RECORD_TOOL_NAME = f"mcp__{RECORD_SERVER_NAME}__record_article"
+
+# record_article ツールの入力スキーマ
+ARTICLE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string", "description": "記事タイトル"},
+        "source": {"type": ["string", "null"], "description": "情報源（TechCrunch 等）"},
+        "category": {"type": ["string", "null"], "description": "カテゴリ（LLM, Robotics 等）"},
+        "date": {"type": ["string", "null"], "description": "公開日（YYYY-MM-DD 形式）"},
+        "summary": {"type": ["string", "null"], "description": "記事の要約（2-3文）"},
+        "url": {"type": ["string", "null"], "description": "記事の URL"},
+        "importance": {"type": ["string", "null"], "enum": ["high", "medium", "low", None], "description": "重要度"},
+        "tags": {"type": "array", "items": {"type": "string"}, "description": "関連キーワード"},
+    },
+    "required": ["title"],
+}
+
+
+# カテゴリ並列モードで収集するカテゴリ（1 要素 = 1 エージェントセッション）
+# 要素をリストにすると複数カテゴリを 1 セッションにまとめられる
+CATEGORIES = [
+    "LLM",
+    "Computer Vision",
+    "Robotics",
+    "AI Ethics",
+    "AI Startups",
+    "Research",
+    "Industry",
+    "Regulation",
+]
+
+# カテゴリ並列モードでの 1 セッションあたりの最大ターン数
+CATEGORY_MAX_TURNS = 12
+
+# カテゴリ並列モードでの 1 セッションあたりのタイムアウト（秒）
+CATEGORY_TIMEOUT = 300.0
+
+# カテゴリ並列モードで各セッションに渡すプロンプト
+CATEGORY_PROMPT_TEMPLATE = """「{categories}」カテゴリの最新 AI 関連ニュースを収集してください。
+
+以下の手順で進めてください：
+1. 「{categories} AI news 2026」などで検索
+2. TechCrunch, The Verge, VentureBeat, Wired, MIT Technology Review などの主要メディアを優先
+3. category フィールドには {categories} のいずれかを設定
+4. 重要度が高い記事を優先的に収集
+5. 確認した記事は record_article ツールで1件ずつ登録
+
+担当カテゴリの記事に絞って、できるだけ多くの記事情報（カテゴリあたり3記事以上）を収集してください。"""
+
+
+async def collect_news_data(
+    parallel: bool = False,
+    categories: list[str | list[str]] | None = None,
+    max_concurrency: int = 4,
+    turns_per_category: int = CATEGORY_MAX_TURNS,
+    category_timeout: float = CATEGORY_TIMEOUT,
+    target_count: int | None = None,
+    runtime: AgentRuntime | None = None,
+    checkpoint: Checkpoint | None = None,
+) -> dict[str, Any]:
     """
     AI ニュースデータを収集するエージェントを実行
+
+    parallel=True の場合はカテゴリ（またはカテゴリグループ）ごとに
+    エージェントセッションを起動し、最大 max_concurrency 件を同時に実行して
+    articles をマージする。target_count を指定すると、検証・重複除去済みの
+    記事数がその件数に達した時点でセッションを終了する。
+    runtime でセッションの記録・再生を指定できる。
+    checkpoint を指定すると登録した記事と完了したカテゴリを逐次書き込み、
+    再開時は前回までの記事を引き継いで完了済みのカテゴリを省略する
     """
     print("=" * 60)
     print("AI News Aggregator - ニュース収集エージェント")
     print("=" * 60)
     print()
 
-    options = ClaudeAgentOptions(
-        system_prompt=SYSTEM_PROMPT,
-        allowed_tools=["WebSearch", "WebFetch"],
-        permission_mode='acceptEdits',
-        max_turns=50,
-    )
-
-    collected_text = ""
-
-    print("エージェントを起動してニュースを収集中...")
-    print("-" * 60)
-
-    async for message in query(
-        prompt="""最新の AI 関連ニュースを収集してください。
+    store = RecordStore(key=_article_key, validate=validate_article, target=target_count)
+    if target_count:
+        print(f"{target_count} 件に達した時点で収集を終了します")
+
+    done: list[str] = []
+    if checkpoint is not None:
+        records, done = checkpoint.open()
+        for article in records:
+            store.add(article)
+        store.on_change = checkpoint.record
+        if checkpoint.resume:
+            print(f"チェックポイントから再開: {len(store)} 件 / 完了済みカテゴリ {', '.join(done) or 'なし'}")
+    note = resume_note(store)
+
+    if parallel:
+        await collect_news_data_parallel(
+            [group for group in categories or CATEGORIES if _group_label(group) not in done],
+            store,
+            max_concurrency=max_concurrency,
+            turns_per_category=turns_per_category,
+            category_timeout=category_timeout,
+            runtime=runtime,
+            checkpoint=checkpoint,
+            note=note,
+        )
+    else:
+        options = ClaudeAgentOptions(
+            system_prompt=SYSTEM_PROMPT,
+            allowed_tools=["WebSearch", "WebFetch"],
+            permission_mode='acceptEdits',
+            max_turns=50,
+        )
+
+        print("エージェントを起動してニュースを収集中...")
+        print("-" * 60)
+
+        await run_agent_session(
+            prompt="""最新の AI 関連ニュースを収集してください。
 
 以下の手順で進めてください：
 1. まず「AI news 2026」「LLM news」「artificial intelligence latest」で検索
 2. TechCrunch, The Verge, VentureBeat, Wired, MIT Technology Review などの主要メディアを優先
 3. カテゴリ別（LLM, Computer Vision, Robotics, AI Ethics, AI Startups, Research, Industry, Regulation）にバランスよく収集
 4. 重要度が高い記事を優先的に収集
-5. 最終的に JSON 形式で出力
-
-できるだけ多くの記事情報（15記事以上）を収集してください。""",
-        options=options
-    ):
-        # メッセージの処理
-        if hasattr(message, 'content'):
-            for block in message.content:
-                if hasattr(block, 'text'):
-                    text = block.text
-                    print(text)
-                    collected_text += text + "\n"
-                elif hasattr(block, 'name'):
-                    # ツール使用の表示
-                    print(f"\n[Tool: {block.name}]")
-        elif hasattr(message, 'type') and message.type == 'result':
-            # ツール結果（簡略表示）
-            if hasattr(message, 'content'):
-                result_preview = str(message.content)[:200]
-                print(f"   -> {result_preview}...")
+5. 確認した記事は record_article ツールで1件ずつ登録
+
+できるだけ多くの記事情報（15記事以上）を収集してください。""" + note,
+            options=options,
+            store=store,
+            runtime=runtime,
+        )
 
     print("-" * 60)
     print("データ収集完了")
     print()
 
-    # JSON を抽出
-    news_data = extract_json_from_text(collected_text)
+    return build_news_data(store)
+
+
+async def collect_news_data_parallel(
+    categories: list[str | list[str]],
+    store: RecordStore,
+    max_concurrency: int = 4,
+    turns_per_category: int = CATEGORY_MAX_TURNS,
+    category_timeout: float = CATEGORY_TIMEOUT,
+    runtime: AgentRuntime | None = None,
+    checkpoint: Checkpoint | None = None,
+    note: str = "",
+) -> None:
+    """
+    カテゴリごとにエージェントセッションを並列実行し、articles を store にマージ
+
+    各セッションには turns_per_category のターン数と category_timeout 秒の
+    制限があり、タイムアウトしたセッションもそれまでに出力した記事は store に残る。
+    最後まで完了したカテゴリは checkpoint に記録する。note は各カテゴリのプロンプトに追加する
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    print(f"{len(categories)} カテゴリを最大 {max_concurrency} 並列で収集中...")
+    print("-" * 60)
+
+    async def collect_category(group: str | list[str]) -> None:
+        names = [group] if isinstance(group, str) else list(group)
+        label = _group_label(group)
+
+        async with semaphore:
+            if store.reached:
+                print(f"\n[{label}] 目標件数に達しているためスキップ")
+                return
+
+            print(f"\n[{label}] 収集を開始")
+            options = ClaudeAgentOptions(
+                system_prompt=SYSTEM_PROMPT,
+                allowed_tools=["WebSearch", "WebFetch"],
+                permission_mode='acceptEdits',
+                max_turns=turns_per_category,
+            )
+            try:
+                added = await asyncio.wait_for(
+                    run_agent_session(
+                        prompt=CATEGORY_PROMPT_TEMPLATE.format(categories=", ".join(names)) + note,
+                        options=options,
+                        store=store,
+                        label=label,
+                        runtime=runtime,
+                    ),
+                    timeout=category_timeout,
+                )
+            except asyncio.TimeoutError:
+                print(f"\n[{label}] {category_timeout:.0f} 秒でタイムアウトしました（途中までの結果を使用）")
+                return
+
+        print(f"\n[{label}] {added} 件を追加")
+        if checkpoint is not None:
+            checkpoint.done(label)
+
+    results = await asyncio.gather(*(collect_category(group) for group in categories), return_exceptions=True)
+
+    for group, result in zip(categories, results):
+        if isinstance(result, BaseException):
+            # 1 カテゴリの失敗で全体を止めない
+            print(f"[{_group_label(group)}] 収集に失敗しました: {result}")
+
 
-    return news_data
+def _group_label(group: str | list[str]) -> str:
+    return group if isinstance(group, str) else "+".join(group)
+
+
+def resume_note(store: RecordStore) -> str:
+    """
+    チェックポイントから再開した場合にプロンプトに追加する登録済み記事の一覧
+    """
+    if not store.records:
+        return ""
+    titles = "\n".join(f"- {article['title']}" for article in store.records)
+    return f"""
+
+## 登録済みの記事（{len(store)}件）
+前回中断するまでに登録済みの記事です。調べ直したり登録し直したりする必要はありません：
+{titles}"""
+
+
+async def run_agent_session(
+    prompt: str,
+    options: ClaudeAgentOptions,
+    store: RecordStore,
+    label: str | None = None,
+    runtime: AgentRuntime | None = None,
+) -> int:
+    """
+    エージェントセッションを 1 回実行し、出力から記事を逐次 store に追加する
+
+    このセッションで新たに追加した記事数を返す。
+    store が目標件数に達した時点でセッションを終了する。
+    label を指定すると並列実行時に出力の区別がつくよう各行の先頭に付与する。
+    label は記録・再生時のセッション名にも使う
+    """
+    prefix = f"[{label}] " if label else ""
+    extractor = JsonStreamExtractor("articles")
+    total_added = 0
+    runtime = runtime or AgentRuntime()
+
+    def ingest(article: Any) -> bool:
+        nonlocal total_added
+        if not store.add(article):
+            return False
+        total_added += 1
+        runtime.record_added(label or "main", article['title'])
+        print(f"{prefix}登録: {article['title']}（計 {len(store)} 件）")
+        return True
+
+    options = runtime.configure(dataclasses.replace(
+        options,
+        mcp_servers={RECORD_SERVER_NAME: create_record_server(store, ingest)},
+        allowed_tools=[*options.allowed_tools, RECORD_TOOL_NAME],
+    ))
+    messages = runtime.stream(label or "main", options, lambda options: query(prompt=prompt, options=options))
+
+    async with contextlib.aclosing(messages):
+        async for message in messages:
+            # メッセージの処理
+            if hasattr(message, 'content'):
+                for block in message.content:
+                    if hasattr(block, 'text'):
+                        text = block.text
+                        if prefix:
+                            print("\n".join(prefix + line for line in text.splitlines()))
+                        else:
+                            print(text)
+                        # record_article を使わずに JSON で出力された記事も登録する
+                        for payload in extractor.feed(text + "\n"):
+                            for article in payload.get("articles") or []:
+                                ingest(article)
+                    elif hasattr(block, 'name'):
+                        if block.name == RECORD_TOOL_NAME:
+                            # 再生時はツールが実行されないため、呼び出し内容から登録する
+                            if runtime.replayer is not None:
+                                ingest(block.input)
+                            continue
+                        # ツール使用の表示
+                        print(f"\n{prefix}[Tool: {block.name}]")
+            elif hasattr(message, 'type') and message.type == 'result':
+                # ツール結果（簡略表示）
+                if hasattr(message, 'content'):
+                    result_preview = str(message.content)[:200]
+                    print(f"   {prefix}-> {result_preview}...")
+
+            if store.reached:
+                print(f"\n{prefix}目標の {store.target} 件に到達したためセッションを終了します")
+                break
+
+    if not extractor.payloads:
+        for error in extractor.errors:
+            print(f"{prefix}JSON パースエラー: {error}")
+
+    return total_added
+
+
+def create_record_server(store: RecordStore, ingest: Callable[[dict[str, Any]], bool]):
+    """
+    エージェントが記事を 1 件ずつ登録するためのインプロセス MCP サーバーを作成
+
+    ツール呼び出しごとに入力を検証し、ingest で store に追加する
+    """
+    @tool("record_article", "確認した AI ニュース記事を1件登録します", ARTICLE_SCHEMA)
+    async def record_article(args: dict[str, Any]) -> dict[str, Any]:
+        if not validate_article(args):
+            return {
+                "content": [{"type": "text", "text": "title（記事タイトル）は必須です"}],
+                "is_error": True,
+            }
+
+        if ingest(args):
+            message = f"登録しました（計 {len(store)} 件）"
+        else:
+            message = "登録済みの記事です（空欄の項目を補完しました）"
+        if store.reached:
+            message += "。目標の記事数に達したので収集を終了してください"
+        return {"content": [{"type": "text", "text": message}]}
+
+    return create_sdk_mcp_server(name=RECORD_SERVER_NAME, version="1.0.0", tools=[record_article])
+
+
+def build_news_data(store: RecordStore) -> dict[str, Any]:
+    """
+    store に蓄積した記事から保存用のデータを作成
+    """
+    if not store.records:
+        # データが見つからない場合は空のテンプレートを返す
+        return {
+            "collected_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "total_count": 0,
+            "articles": [],
+            "error": "JSON データの抽出に失敗しました"
+        }
+
+    return {
+        "collected_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "total_count": len(store.records),
+        "articles": store.records,
+    }
+
+
+def validate_article(article: dict[str, Any]) -> bool:
+    """
+    記事として最低限必要な情報（タイトル）があるかを判定
+    """
+    title = article.get('title')
+    return isinstance(title, str) and bool(title.strip())
+
+
+def _article_key(article: dict[str, Any]) -> str:
+    """
+    重複判定用のキー（URL、URL がなければ小文字化したタイトル）
+    """
+    url = str(article.get('url') or '').strip().rstrip('/')
+    return url or " ".join(str(article.get('title') or '').split()).lower()
 
 
 def extract_json_from_text(text: str) -> dict[str, Any]:
     """
     テキストから JSON データを抽出
     """
-    # ```json ... ``` パターンを探す
-    json_pattern = r'```json\s*([\s\S]*?)\s*```'
-    matches = re.findall(json_pattern, text)
-
-    if matches:
-        # 最後の JSON ブロックを使用（最終結果のはず）
-        try:
-            return json.loads(matches[-1])
-        except json.JSONDecodeError as e:
-            print(f"JSON パースエラー: {e}")
+    extractor = JsonStreamExtractor("articles")
+    extractor.feed(text)
 
-    # フォールバック：{...} パターンを探す
-    brace_pattern = r'\{[\s\S]*"articles"[\s\S]*\}'
-    brace_matches = re.findall(brace_pattern, text)
+    # 最後の JSON を使用（最終結果のはず）
+    data = extractor.last()
+    if data is not None:
+        return data
 
-    if brace_matches:
-        for match in reversed(brace_matches):
-            try:
-                return json.loads(match)
-            except json.JSONDecodeError:
-                continue
+    for error in extractor.errors:
+        print(f"JSON パースエラー: {error}")
 
     # データが見つからない場合は空のテンプレートを返す
     return {
@@ -184,17 +488,40 @@ def extract_json_from_text(text: str) -> dict[str, Any]:
     }
 
 
-def save_data(data: dict[str, Any], filename: str = "ai_news.json") -> Path:
+def open_log(filename: str = "ai_news.json") -> RecordLog:
     """
-    データを JSON ファイルに保存
+    JSON ファイルをスナップショットとする記録ログ
+    """
+    return RecordLog(LOG_FILE, OUTPUT_DIR / filename, "articles", _article_key)
+
+
+def load_data(filename: str = "ai_news.json") -> dict[str, Any] | None:
+    """
+    保存済みの JSON ファイルを読み込む（記録ログがあれば適用する、どちらもない場合は None）
+    """
+    filepath = OUTPUT_DIR / filename
+    if LOG_FILE.exists():
+        return open_log(filename).load()
+    if not filepath.exists():
+        return None
+
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_data(data: dict[str, Any], filename: str = "ai_news.json", pretty: bool = True) -> Path:
+    """
+    データを JSON ファイルにアトミックに保存（pretty が False なら空白を省く）
+
+    レコードを 1 件ずつ一時ファイルに書き込んでから置き換え、
+    件数・バイト数・ハッシュのマニフェストも書き出す
     """
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     filepath = OUTPUT_DIR / filename
 
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    manifest = save_json(filepath, data, "articles", pretty=pretty, manifest_file=manifest_path(Path(__file__).parent, filename))
 
-    print(f"データを保存しました: {filepath}")
+    print(f"データを保存しました: {filepath}（{manifest['bytes'] / 1024:.0f}KB）")
     return filepath
 
 
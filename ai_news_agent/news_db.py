@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+AI ニュースデータの SQLite データベース
+
+ai_news.json と同じ内容を ai_news.db に保存し、カテゴリ・ソース・日付・重要度の
+インデックスと全文検索（FTS5 trigram）で記事を検索する。
+
+使い方:
+    python news_db.py import                          # ai_news.json を取り込む
+    python news_db.py search OpenAI --category "AI Startups" --since 2026-01-01
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+# 共通モジュールのパスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agent_common.record_db import RecordDatabase, RecordSchema
+
+DB_FILE = Path(__file__).parent / "ai_news.db"
+JSON_FILE = Path(__file__).parent.parent / "docs" / "ai_news_agent" / "ai_news.json"
+
+ARTICLE_SCHEMA = RecordSchema(
+    table="articles",
+    columns={
+        "title": "TEXT",
+        "source": "TEXT",
+        "category": "TEXT",
+        "date": "TEXT",
+        "summary": "TEXT",
+        "url": "TEXT",
+        "importance": "TEXT",
+    },
+    list_fields=("tags",),
+    # カテゴリでの絞り込みは日付順に並んだ複合インデックスを使う
+    indexes=(("category", "date"), "source", "date", "importance"),
+    text_fields=("title", "summary", "source", "category", "tags"),
+    order=("title", "source", "category", "date", "summary", "url", "importance", "tags"),
+)
+
+# search_articles の並べ替え（列名, 降順）
+SORT_KEYS = {
+    "date": ("date", True),
+    "title": ("title", False),
+    "source": ("source", False),
+}
+
+
+def open_db(path: str | Path = DB_FILE) -> RecordDatabase:
+    return RecordDatabase(path, ARTICLE_SCHEMA)
+
+
+def save_db(data: dict[str, Any], path: str | Path = DB_FILE) -> Path:
+    """
+    データをデータベースに保存（既存の内容は置き換える）
+    """
+    with open_db(path) as db:
+        count = db.replace_all(data)
+    print(f"データベースに保存しました: {path}（{count} 件）")
+    return Path(path)
+
+
+def load_db(path: str | Path = DB_FILE) -> dict[str, Any] | None:
+    """
+    データベースを ai_news.json と同じ形式で読み込む（存在しない場合は None）
+    """
+    if not Path(path).exists():
+        return None
+    with open_db(path) as db:
+        return db.load()
+
+
+def search_articles(
+    db: RecordDatabase,
+    query: str = "",
+    category: str | None = None,
+    source: str | None = None,
+    importance: str | None = None,
+    tag: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    sort: str = "date",
+    limit: int | None = 20,
+    offset: int = 0,
+) -> tuple[int, list[dict[str, Any]]]:
+    """
+    条件に合う記事の件数と、sort 順の limit 件を返す（since / until は YYYY-MM-DD）
+    """
+    filters = {}
+    if category:
+        filters["category"] = category
+    if source:
+        filters["source"] = source
+    if importance:
+        filters["importance"] = importance
+    if tag:
+        filters["tags"] = tag
+    ranges = {"date": (since, until)} if since or until else None
+    order_by, descending = SORT_KEYS[sort]
+    return db.search(query, filters, ranges, order_by=order_by, descending=descending, limit=limit, offset=offset)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI ニュースデータの SQLite データベース")
+    parser.add_argument('--db', default=str(DB_FILE), metavar='PATH', help=f'データベースファイル（デフォルト: {DB_FILE.name}）')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help='JSON データをデータベースに取り込む')
+    import_parser.add_argument('json_file', nargs='?', default=str(JSON_FILE), help=f'取り込む JSON（デフォルト: {JSON_FILE.name}）')
+
+    search_parser = subparsers.add_parser('search', help='記事を検索する')
+    search_parser.add_argument('query', nargs='?', default='', help='検索語（空白区切りですべてを含む記事）')
+    search_parser.add_argument('--category', help='カテゴリ')
+    search_parser.add_argument('--source', help='ソース')
+    search_parser.add_argument('--importance', choices=['high', 'medium', 'low'], help='重要度')
+    search_parser.add_argument('--tag', help='タグ')
+    search_parser.add_argument('--since', metavar='YYYY-MM-DD', help='この日付以降の記事')
+    search_parser.add_argument('--until', metavar='YYYY-MM-DD', help='この日付以前の記事')
+    search_parser.add_argument('--sort', choices=list(SORT_KEYS), default='date', help='並べ替え（デフォルト: date）')
+    search_parser.add_argument('--limit', type=int, default=20, help='表示する件数（デフォルト: 20）')
+
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        with open(args.json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        save_db(data, args.db)
+        return 0
+
+    if not Path(args.db).exists():
+        print(f"データベースが見つかりません: {args.db}")
+        print("先に python news_db.py import を実行してください。")
+        return 1
+
+    with open_db(args.db) as db:
+        started = time.perf_counter()
+        total, articles = search_articles(
+            db, args.query, category=args.category, source=args.source, importance=args.importance,
+            tag=args.tag, since=args.since, until=args.until, sort=args.sort, limit=args.limit,
+        )
+        elapsed = time.perf_counter() - started
+
+    print(f"{total} 件の記事が見つかりました（{elapsed * 1000:.2f}ms）")
+    for article in articles:
+        print(f"  [{article.get('date', '----------')}] {article.get('title', '')}")
+        print(f"    {article.get('source', '不明')} / {article.get('category', '不明')} / {article.get('importance', '-')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+SQLite ストアの検索のベンチマーク
+
+合成した店舗データ（デフォルト 10 万件）を ramen_db で SQLite に保存し、
+インデックスでの絞り込み・並べ替え、FTS5 の全文検索（3 文字以上は trigram、
+2 文字以下は 2 文字ずつのトークン）と、JSON を読み込んだリストの線形走査の
+検索時間を比較する。各検索の件数が両者で一致することも確認する
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+ROOT_DIR = Path(__file__).parent.parent
+
+# 共通モジュールのパスを追加
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(ROOT_DIR / "shibuya_ramen_agent"))
+
+from agent_common.record_db import search_text
+from ramen_db import SHOP_SCHEMA, open_db, search_shops
+from synthetic import make_shops
+
+# (説明, search_shops の引数)
+QUERIES = [
+    ("エリア + ジャンル + 評価", {"area": "渋谷", "genre": "味噌", "min_rating": 4.5}),
+    ("評価順の上位", {}),
+    ("全文検索（3 文字）", {"query": "道玄坂"}),
+    ("全文検索（2 文字）", {"query": "醤油"}),
+    ("全文検索（1 文字）", {"query": "凪"}),
+    ("全文検索（店名）+ エリア", {"query": "とみ田", "area": "恵比寿"}),
+    ("全文検索（2 語）", {"query": "道玄坂 特製"}),
+]
+
+
+def best_of(fn: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def linear_search(
+    shops: list[dict[str, Any]],
+    texts: list[str],
+    query: str = "",
+    area: str | None = None,
+    genre: str | None = None,
+    min_rating: float | None = None,
+    limit: int = 20,
+) -> tuple[int, list[dict[str, Any]]]:
+    """
+    search_shops と同じ条件・並び順の線形走査
+    """
+    terms = query.lower().split()
+    matched = [
+        shop for shop, text in zip(shops, texts)
+        if all(term in text for term in terms)
+        and (area is None or shop.get("area") == area)
+        and (genre is None or shop.get("genre") == genre)
+        and (min_rating is None or (shop.get("rating") is not None and shop["rating"] >= min_rating))
+    ]
+    ranked = sorted(matched, key=lambda shop: shop.get("rating") or 0, reverse=True)
+    return len(matched), ranked[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite ストアの検索のベンチマーク")
+    parser.add_argument('--count', type=int, default=100_000, help='合成する店舗数（デフォルト: 100000）')
+    parser.add_argument('--repeat', type=int, default=5, help='各検索の実行回数（最短時間を採用）')
+    args = parser.parse_args()
+
+    shops = make_shops(args.count)
+    data = {"collected_at": "2026-01-20 12:00:00", "total_count": len(shops), "shops": shops}
+    texts = [search_text(shop, SHOP_SCHEMA.text_fields) for shop in shops]
+
+    print("=" * 60)
+    print(f"SQLite ストアの検索のベンチマーク（{args.count:,} 店舗）")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ramen_shops.db"
+        with open_db(path) as db:
+            started = time.perf_counter()
+            db.replace_all(data)
+            print(f"保存: {time.perf_counter() - started:.2f}s（{path.stat().st_size / 1024 / 1024:.0f}MB）")
+            print()
+            print(f"{'検索':<26} {'件数':>7} {'SQLite':>10} {'線形走査':>10}")
+
+            for label, query in QUERIES:
+                db_seconds, (total, _) = best_of(lambda: search_shops(db, **query), args.repeat)
+                scan_seconds, (expected, _) = best_of(lambda: linear_search(shops, texts, **query), args.repeat)
+                mark = "" if total == expected else f" ⚠️ 件数が一致しません（線形走査: {expected}）"
+                print(f"{label:<26} {total:>7} {db_seconds * 1000:>8.2f}ms {scan_seconds * 1000:>8.2f}ms{mark}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+JSON ストリーミング抽出のベンチマーク
+
+数 MB の合成トランスクリプトに対して、従来の正規表現による抽出
+（テキスト全体を連結してから探索）と JsonStreamExtractor による逐次抽出の
+処理時間を比較し、入力サイズに対して線形に伸びることを確認する
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+# 共通モジュールのパスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agent_common.json_stream import JsonStreamExtractor
+
+
+def legacy_extract(text: str, key: str = "shops") -> dict | None:
+    """
+    従来の extract_json_from_text と同じ正規表現による抽出
+    """
+    matches = re.findall(r'```json\s*([\s\S]*?)\s*```', text)
+    if matches:
+        try:
+            return json.loads(matches[-1])
+        except json.JSONDecodeError:
+            pass
+
+    for match in reversed(re.findall(r'\{[\s\S]*"' + key + r'"[\s\S]*\}', text)):
+        try:
+            return json.loads(match)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def make_blocks(target_bytes: int, seed: int = 0) -> list[str]:
+    """
+    エージェントの出力を模した合成テキストブロックを生成
+
+    途中経過の文章、中括弧を含む文章、途中の JSON 断片を混ぜ、
+    最後に店舗一覧の JSON を ```json ブロックで出力する
+    """
+    rng = random.Random(seed)
+    areas = ["渋谷", "恵比寿", "代官山", "原宿", "表参道"]
+    genres = ["醤油", "味噌", "塩", "豚骨", "家系", "つけ麺"]
+    blocks = []
+    size = 0
+    shops = []
+
+    while size < target_bytes:
+        area = rng.choice(areas)
+        genre = rng.choice(genres)
+        shop = {
+            "name": f"{area}{genre}ラーメン{len(shops)}",
+            "address": f"東京都渋谷区{area}{rng.randint(1, 5)}-{rng.randint(1, 30)}-{rng.randint(1, 20)}",
+            "area": area,
+            "genre": genre,
+            "rating": round(rng.uniform(3.0, 4.5), 1),
+            "specialties": ["特製ラーメン", "味玉"],
+            "description": "濃厚なスープと自家製麺が特徴の人気店。" * 3,
+        }
+        shops.append(shop)
+        kind = rng.random()
+        if kind < 0.6:
+            block = f"{area}エリアで「{shop['name']}」を見つけました。{{詳細}} を確認します。" * 4
+        elif kind < 0.9:
+            block = "```json\n" + json.dumps(shop, ensure_ascii=False, indent=2) + "\n```"
+        else:
+            block = "途中経過: {\"note\": \"未完成のメモ"
+        blocks.append(block)
+        size += len(block.encode("utf-8"))
+
+    final = {"collected_at": "2026-01-01 00:00:00", "total_count": len(shops), "shops": shops}
+    blocks.append("```json\n" + json.dumps(final, ensure_ascii=False, indent=2) + "\n```")
+    return blocks
+
+
+def bench_stream(blocks: list[str]) -> tuple[float, int]:
+    start = time.perf_counter()
+    extractor = JsonStreamExtractor("shops")
+    for block in blocks:
+        extractor.feed(block + "\n")
+    result = extractor.last()
+    return time.perf_counter() - start, len(result["shops"]) if result else 0
+
+
+def bench_legacy(blocks: list[str]) -> tuple[float, int]:
+    start = time.perf_counter()
+    text = ""
+    for block in blocks:
+        text += block + "\n"
+    result = legacy_extract(text)
+    return time.perf_counter() - start, len(result["shops"]) if result else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON ストリーミング抽出のベンチマーク")
+    parser.add_argument(
+        '--sizes',
+        type=float,
+        nargs='+',
+        default=[1, 2, 4, 8, 16],
+        help='トランスクリプトのサイズ（MB）'
+    )
+    parser.add_argument(
+        '--legacy',
+        action='store_true',
+        help='従来の正規表現による抽出も計測する'
+    )
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("JSON ストリーミング抽出ベンチマーク")
+    print("=" * 60)
+    header = f"{'サイズ':>8} {'ブロック数':>10} {'逐次抽出':>10} {'MB/s':>8} {'店舗数':>8}"
+    if args.legacy:
+        header += f" {'従来方式':>10}"
+    print(header)
+
+    for size_mb in args.sizes:
+        blocks = make_blocks(int(size_mb * 1024 * 1024))
+        total_mb = sum(len(b.encode("utf-8")) for b in blocks) / (1024 * 1024)
+        elapsed, count = bench_stream(blocks)
+        line = f"{total_mb:>6.1f}MB {len(blocks):>10} {elapsed:>9.3f}s {total_mb / elapsed:>8.1f} {count:>8}"
+        if args.legacy:
+            legacy_elapsed, _ = bench_legacy(blocks)
+            line += f" {legacy_elapsed:>9.3f}s"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
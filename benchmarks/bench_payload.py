@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+ページに埋め込むデータ形式のベンチマーク
+
+合成した店舗・ニュースデータについて、従来の json.dumps による行指向の配列と
+列指向（辞書エンコード）の形式のサイズ（非圧縮・gzip）とパース時間を比較する。
+Node.js があればブラウザと同じ JSON.parse と decodeRecords の時間も計測する
+"""
+
+import argparse
+import gzip
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 共通モジュールのパスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agent_common.columnar import encode_columnar, COLUMNAR_JS
+from synthetic import make_shops, make_articles
+
+RAMEN_DICTIONARY_FIELDS = ["area", "genre"]
+NEWS_DICTIONARY_FIELDS = ["category", "source", "importance"]
+
+# JSON.parse と decodeRecords の時間（ミリ秒）を計測する Node.js スクリプト
+NODE_SCRIPT = COLUMNAR_JS + r'''
+const fs = require('fs');
+const text = fs.readFileSync(process.argv[2], 'utf8');
+const fields = JSON.parse(process.argv[3]);
+const best = fn => {
+    let min = Infinity;
+    for (let i = 0; i < 5; i++) {
+        const start = process.hrtime.bigint();
+        fn();
+        min = Math.min(min, Number(process.hrtime.bigint() - start) / 1e6);
+    }
+    return min;
+};
+const parse = best(() => JSON.parse(text));
+const decode = best(() => decodeRecords(JSON.parse(text)));
+// 全フィールドに 1 回ずつアクセスした場合（絞り込みとカード描画に相当）
+const access = best(() => {
+    for (const record of decodeRecords(JSON.parse(text))) {
+        for (const field of fields) record[field];
+    }
+});
+console.log(JSON.stringify({ parse, decode, access }));
+'''
+
+
+def measure_python(text: str) -> float:
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        json.loads(text)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def measure_node(node: str, text: str, fields: list[str]) -> dict | None:
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = Path(tmp) / "payload.json"
+        script_path = Path(tmp) / "bench.js"
+        data_path.write_text(text, encoding="utf-8")
+        script_path.write_text(NODE_SCRIPT, encoding="utf-8")
+        result = subprocess.run(
+            [node, str(script_path), str(data_path), json.dumps(fields)],
+            capture_output=True, text=True,
+        )
+    if result.returncode != 0:
+        print(f"⚠️ Node.js での計測に失敗しました: {result.stderr.strip()}")
+        return None
+    return json.loads(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ページに埋め込むデータ形式のベンチマーク")
+    parser.add_argument(
+        '--counts',
+        type=int,
+        nargs='+',
+        default=[1000, 10000, 100000],
+        help='合成するレコード数'
+    )
+    parser.add_argument(
+        '--no-node',
+        action='store_true',
+        help='Node.js での計測を行わない'
+    )
+    args = parser.parse_args()
+
+    node = None if args.no_node else shutil.which("node")
+
+    print("=" * 60)
+    print("埋め込みデータ形式ベンチマーク（行指向 vs 列指向）")
+    print("=" * 60)
+    if node is None:
+        print("Node.js が見つからないため、Python の json.loads のみ計測します")
+    header = f"{'データ':>6} {'件数':>8} {'形式':>6} {'サイズ':>10} {'gzip':>10} {'loads':>9}"
+    if node:
+        header += f" {'JSON.parse':>11} {'+decode':>9} {'+全参照':>9}"
+    print(header)
+
+    datasets = [
+        ("店舗", make_shops, RAMEN_DICTIONARY_FIELDS),
+        ("ニュース", make_articles, NEWS_DICTIONARY_FIELDS),
+    ]
+    for label, make, dictionary_fields in datasets:
+        for count in args.counts:
+            records = make(count)
+            fields = list(records[0])
+            payloads = [
+                ("行", json.dumps(records, ensure_ascii=False)),
+                ("列", json.dumps(encode_columnar(records, dictionary_fields), ensure_ascii=False)),
+            ]
+            for kind, text in payloads:
+                raw = text.encode("utf-8")
+                line = (
+                    f"{label:>6} {count:>8} {kind:>6} {len(raw) / 1024:>8.0f}KB "
+                    f"{len(gzip.compress(raw)) / 1024:>8.0f}KB {measure_python(text):>7.1f}ms"
+                )
+                if node:
+                    timings = measure_node(node, text, fields)
+                    if timings:
+                        line += f" {timings['parse']:>9.1f}ms {timings['decode']:>7.1f}ms {timings['access']:>7.1f}ms"
+                print(line)
+
+
+if __name__ == "__main__":
+    main()
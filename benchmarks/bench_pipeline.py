@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+データ処理パイプラインのベンチマーク
+
+合成した店舗・ニュースデータ（1k〜1M 件）について、コレクターの
+extract_json_from_text と save_data、generate_web の generate_html、
+保存した JSON の json.load の処理時間と出力サイズを計測する。
+
+結果は --output で JSON ファイルに書き出し、--compare で以前の結果と比較できる
+（コミット間の性能の変化を確認する）。10 万件以上は 1 回だけ計測する
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable
+
+ROOT_DIR = Path(__file__).parent.parent
+
+# 共通モジュールのパスを追加
+sys.path.insert(0, str(ROOT_DIR))
+
+from agent_common.module_loader import load_module
+from synthetic import make_data
+
+DATASETS = {
+    "shops": ROOT_DIR / "shibuya_ramen_agent",
+    "articles": ROOT_DIR / "ai_news_agent",
+}
+COLLECTOR_FILES = {
+    "shops": "ramen_collector.py",
+    "articles": "news_collector.py",
+}
+SINGLE_RUN_COUNT = 100_000
+
+
+def best_of(fn: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    """
+    repeat 回実行した最短時間（秒）と最後の戻り値
+    """
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def transcript(kind: str, data: dict) -> str:
+    """
+    エージェントが JSON をまとめて出力した場合のテキスト
+    """
+    return (
+        "収集が完了しました。以下が結果です。\n\n```json\n"
+        + json.dumps({kind: data[kind]}, ensure_ascii=False, indent=2)
+        + "\n```\n"
+    )
+
+
+def bench_dataset(kind: str, count: int, repeat: int, tmp: Path) -> list[dict]:
+    collector = load_module(DATASETS[kind] / COLLECTOR_FILES[kind])
+    generator = load_module(DATASETS[kind] / "generate_web.py")
+    data = make_data(kind, count)
+    text = transcript(kind, data)
+    path = tmp / f"{kind}-{count}.json"
+    results = []
+
+    def add(operation: str, seconds: float, size: int | None = None) -> None:
+        results.append({"dataset": kind, "count": count, "operation": operation, "seconds": seconds, "bytes": size})
+
+    seconds, extracted = best_of(lambda: collector.extract_json_from_text(text), repeat)
+    assert len(extracted[kind]) == count
+    add("extract_json_from_text", seconds, len(text.encode("utf-8")))
+
+    # save_data の保存完了メッセージは表示しない
+    with contextlib.redirect_stdout(io.StringIO()):
+        seconds, _ = best_of(lambda: collector.save_data(data, filename=str(path)), repeat)
+    add("save_data", seconds, path.stat().st_size)
+
+    def load() -> dict:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    seconds, _ = best_of(load, repeat)
+    add("json.load", seconds, path.stat().st_size)
+
+    seconds, html = best_of(lambda: generator.generate_html(data), repeat)
+    add("generate_html", seconds, len(html.encode("utf-8")))
+    return results
+
+
+def git_revision() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def compare(results: list[dict], baseline_path: Path) -> None:
+    """
+    以前の結果ファイルと同じ計測項目の時間を比較して表示
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    before = {(r["dataset"], r["count"], r["operation"]): r["seconds"] for r in baseline["results"]}
+
+    print()
+    print(f"比較: {baseline_path}（{baseline.get('revision') or '不明'}）")
+    for result in results:
+        old = before.get((result["dataset"], result["count"], result["operation"]))
+        if old is None:
+            continue
+        ratio = result["seconds"] / old if old else float("inf")
+        mark = " ⚠️" if ratio > 1.2 else ""
+        print(
+            f"{result['dataset']:>8} {result['count']:>8} {result['operation']:<24} "
+            f"{old * 1000:>9.1f}ms → {result['seconds'] * 1000:>9.1f}ms ({ratio:.2f}x){mark}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="データ処理パイプラインのベンチマーク")
+    parser.add_argument(
+        '--counts',
+        type=int,
+        nargs='+',
+        default=[1000, 10000, 100000],
+        help='合成するレコード数（100 万件は --counts 1000 10000 100000 1000000 のように指定）'
+    )
+    parser.add_argument(
+        '--datasets',
+        nargs='+',
+        choices=list(DATASETS),
+        default=list(DATASETS),
+        help='計測するデータの種類'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help=f'各処理の実行回数（最短時間を採用、{SINGLE_RUN_COUNT:,} 件以上は 1 回）'
+    )
+    parser.add_argument(
+        '--output',
+        metavar='PATH',
+        help='結果を書き出す JSON ファイル'
+    )
+    parser.add_argument(
+        '--compare',
+        metavar='PATH',
+        help='以前の結果ファイルと比較する'
+    )
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("データ処理パイプラインのベンチマーク")
+    print("=" * 60)
+    print(f"{'データ':>6} {'件数':>8} {'処理':<24} {'時間':>11} {'サイズ':>10}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind in args.datasets:
+            for count in args.counts:
+                repeat = args.repeat if count < SINGLE_RUN_COUNT else 1
+                for result in bench_dataset(kind, count, repeat, Path(tmp)):
+                    results.append(result)
+                    size = f"{result['bytes'] / 1024:>8.0f}KB" if result["bytes"] is not None else ""
+                    print(
+                        f"{kind:>8} {count:>8} {result['operation']:<24} "
+                        f"{result['seconds'] * 1000:>9.1f}ms {size}"
+                    )
+
+    if args.output:
+        report = {
+            "revision": git_revision(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"\n結果を書き出しました: {args.output}")
+
+    if args.compare:
+        compare(results, Path(args.compare))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+店舗の名寄せのベンチマーク
+
+合成した店舗データ（デフォルト 10 万件）の一部に、表記を変えた重複
+（ひらがな・カタカナ・全角、ラーメンの表記ゆれ、支店名の追加、店名の先頭語の省略、
+「1丁目2番3号」「一丁目2-3」、東京都の省略、号の省略、住所なし）を加え、
+ramen_collector.resolve_shops でまとめる。
+
+件数を変えて実行時間と比較した組の数（全組比較の n(n-1)/2 との比）を測り、
+加えた重複をまとめられた割合（再現率）と、まとめた組のうち正しい組の割合（適合率）を表示する
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+ROOT_DIR = Path(__file__).parent.parent
+
+# 共通モジュールのパスを追加
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(ROOT_DIR / "shibuya_ramen_agent"))
+
+from agent_common.entity_resolution import find_duplicates
+from ramen_collector import _resolution_name, resolve_shops
+from synthetic import make_shops
+
+_FULL_WIDTH = {code: code + 0xFEE0 for code in range(0x21, 0x7F)}
+_HIRAGANA = {code + 0x60: code for code in range(0x3041, 0x3097)}
+_KANJI = "〇一二三四五六七八九"
+RAMEN_SPELLINGS = ["らーめん", "ラーメン", "らぁ麺", "拉麺", "らあめん"]
+
+
+def vary_name(name: str, rng: random.Random) -> str:
+    prefix, rest = name.split(" ", 1)
+    kind = rng.randrange(5)
+    if kind == 0:
+        return name.translate(_FULL_WIDTH).replace(" ", "　")
+    if kind == 1 and prefix in RAMEN_SPELLINGS:
+        return f"{rng.choice([spelling for spelling in RAMEN_SPELLINGS if spelling != prefix])} {rest}"
+    if kind == 2:
+        return f"{name} {rng.choice(['渋谷店', '恵比寿', '東口店'])}"
+    if kind == 3:
+        return rest
+    return f"{prefix.translate(_HIRAGANA)} {rest}（{rng.choice(['らーめん', 'めんや'])}）"
+
+
+def vary_address(address: str, rng: random.Random) -> str | None:
+    head, _, building = address.partition(" ")
+    body = head.removeprefix("東京都渋谷区")
+    split = next(i for i, char in enumerate(body) if char.isdigit())
+    town, numbers = body[:split], body[split:].split("-")
+    kind = rng.randrange(6)
+    if kind == 0:
+        return None
+    if kind == 1:
+        text = f"{town}{numbers[0]}丁目{numbers[1]}番{numbers[2]}号"
+    elif kind == 2:
+        text = f"東京都渋谷区{town}{_KANJI[int(numbers[0])]}丁目{numbers[1]}-{numbers[2]}"
+    elif kind == 3:
+        text = f"東京都渋谷区{town}{'－'.join(numbers)}".translate(_FULL_WIDTH)
+    elif kind == 4:
+        text = f"渋谷区{town}{numbers[0]}-{numbers[1]}"
+    else:
+        text = f"〒150-0000 東京都渋谷区{town}{'-'.join(numbers)}"
+    return f"{text} {building}".rstrip() if rng.random() < 0.5 else text
+
+
+def make_dataset(count: int, duplicate_ratio: float, seed: int = 0) -> tuple[list[dict[str, Any]], int, dict[int, int]]:
+    """
+    合成店舗と重複のリスト、元の店舗数、重複の位置 → 元の店舗の位置を返す
+    """
+    rng = random.Random(seed)
+    originals = make_shops(count, seed)
+    duplicates = []
+    for i in rng.sample(range(count), int(count * duplicate_ratio)):
+        shop = originals[i]
+        duplicate = {
+            **shop,
+            "name": vary_name(shop["name"], rng),
+            "address": vary_address(shop["address"], rng),
+            "url": f"https://retty.me/area/PRE13/ARE8/SUB803/{100000 + i}/",
+            "last_verified_at": f"2026-04-{rng.randint(1, 28):02d} 12:00:00",
+            "specialties": rng.sample(shop["specialties"], 1) + ["餃子"],
+        }
+        for field in rng.sample(["rating", "hours", "closed_days", "price_range", "description"], 2):
+            duplicate[field] = None
+        duplicates.append((i, duplicate))
+    rng.shuffle(duplicates)
+    truth = {count + j: i for j, (i, _) in enumerate(duplicates)}
+    return originals + [duplicate for _, duplicate in duplicates], count, truth
+
+
+def score(clusters: list[list[int]], truth: dict[int, int]) -> tuple[float, float]:
+    """
+    (再現率, 適合率)
+    """
+    cluster_of = {i: c for c, members in enumerate(clusters) for i in members}
+    recall = sum(1 for dup, original in truth.items() if cluster_of[dup] == cluster_of[original]) / max(1, len(truth))
+    entity = lambda i: truth.get(i, i)
+    predicted = correct = 0
+    for members in clusters:
+        for x, a in enumerate(members):
+            for b in members[x + 1:]:
+                predicted += 1
+                correct += entity(a) == entity(b)
+    return recall, correct / max(1, predicted)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="店舗の名寄せのベンチマーク")
+    parser.add_argument("--count", type=int, default=100000, help="元の店舗数の最大（デフォルト: 100000）")
+    parser.add_argument("--duplicates", type=float, default=0.2, help="重複を加える店舗の割合（デフォルト: 0.2）")
+    args = parser.parse_args()
+
+    sizes = sorted({size for size in (args.count // 10, args.count // 3, args.count) if size})
+    print(f"{'店舗数':>8} {'レコード':>8} {'時間':>8} {'比較':>10} {'全組比較との比':>14} {'再現率':>7} {'適合率':>7}")
+    for size in sizes:
+        shops, _, truth = make_dataset(size, args.duplicates)
+        started = time.perf_counter()
+        resolved, stats = resolve_shops(shops)
+        elapsed = time.perf_counter() - started
+        clusters = find_duplicates(shops, _resolution_name, lambda shop: shop.get("address"))
+        recall, precision = score(clusters, truth)
+        pairs = len(shops) * (len(shops) - 1) // 2
+        print(
+            f"{size:>8} {len(shops):>8} {elapsed:>7.2f}s {stats.comparisons:>10} "
+            f"{stats.comparisons / pairs:>14.2e} {recall:>7.1%} {precision:>7.1%}"
+        )
+    print(f"\n最後の実行: {stats.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+ベンチマーク用の合成データ
+
+ramen_shops.json・ai_news.json と同じ形式で、実データに近い日本語の店名・住所・
+説明文・看板メニュー、英語の見出しと日本語の要約・タグを持つレコードを生成する。
+同じ seed からは常に同じデータになる。
+
+単体で実行すると合成データを JSON ファイルに書き出す:
+    python benchmarks/synthetic.py shops 100000 -o /tmp/ramen_shops.json
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# エリアと、そのエリアの町名
+AREA_TOWNS = {
+    "渋谷": ["道玄坂", "宇田川町", "神南", "桜丘町", "円山町", "渋谷"],
+    "恵比寿": ["恵比寿", "恵比寿西", "恵比寿南", "広尾"],
+    "代官山": ["代官山町", "猿楽町", "鶯谷町"],
+    "原宿": ["神宮前"],
+    "表参道": ["神宮前", "渋谷"],
+    "神泉": ["神泉町", "松濤"],
+    "代々木": ["代々木", "代々木神園町", "富ヶ谷", "元代々木町"],
+    "千駄ヶ谷": ["千駄ヶ谷"],
+    "笹塚": ["笹塚", "幡ヶ谷"],
+    "初台": ["初台", "本町"],
+}
+GENRES = ["醤油", "味噌", "塩", "豚骨", "豚骨魚介", "家系", "二郎系", "つけ麺", "担々麺", "鶏白湯", "中華そば", "煮干し", "油そば"]
+NAME_PREFIXES = ["らーめん", "ラーメン", "麺屋", "らぁ麺", "中華そば", "つけ麺", "麺処", "拉麺", "支那そば", "中華麺店"]
+NAME_WORDS = [
+    "はやし", "喜楽", "一燈", "すみれ", "なりたけ", "鶏の穴", "桜坂", "虎", "玄", "凪",
+    "ひのき", "栄屋", "青葉", "千里眼", "和", "匠", "大将", "とみ田", "まる", "一心",
+]
+NAME_SUFFIXES = ["", "", "", " 本店", " 渋谷店", " 2号店", " 別館", " 恵比寿店"]
+MENU_ITEMS = [
+    "特製ラーメン", "味玉ラーメン", "チャーシュー麺", "ワンタン麺", "つけ麺", "まぜそば", "塩らーめん",
+    "濃厚つけ麺", "辛味噌ラーメン", "煮干しそば", "鶏白湯そば", "替え玉", "ネギラーメン", "餃子",
+]
+BUILDINGS = ["", "", " 1F", " B1F", " 2F", " 渋谷ビル 1F", " 第2ビル B1"]
+HOURS = [
+    "11:00〜22:00", "11:30〜15:00、18:00〜21:00", "11:00〜翌2:00", "11:30〜15:30（スープなくなり次第終了）",
+    "10:30〜23:00", "18:00〜翌5:00",
+]
+CLOSED_DAYS = ["無休", "月曜日", "水曜日", "日曜・祝日", "水曜・日曜・祝日", "不定休"]
+DESCRIPTION_PARTS = [
+    "{genre}スープと自家製麺が特徴の{area}の人気店。",
+    "開店前から行列ができる名店で、{menu}が看板メニュー。",
+    "無化調にこだわった{genre}の一杯が味わえる。",
+    "ラーメン百名店に{years}年連続で選出。",
+    "{area}駅から徒歩{minutes}分、深夜まで営業しているため仕事帰りの客も多い。",
+    "創業{founded}年の老舗で、昔ながらの味を守り続けている。",
+    "カウンターのみの小さな店だが、{menu}を目当てに遠方から訪れる客も多い。",
+]
+
+CATEGORIES = ["LLM", "Computer Vision", "Robotics", "AI Ethics", "AI Startups", "Research", "Industry", "Regulation"]
+SOURCES = [
+    "TechCrunch", "The Verge", "VentureBeat", "Wired", "MIT Technology Review", "Axios",
+    "Reuters", "Bloomberg", "ITmedia", "日経クロステック",
+]
+COMPANIES = ["OpenAI", "Anthropic", "Google DeepMind", "Meta", "xAI", "Mistral", "NVIDIA", "Microsoft", "Sakana AI", "Preferred Networks"]
+HEADLINES = [
+    "{company} Releases {product} with Improved Reasoning",
+    "{company} Raises ${amount}B in New Funding Round",
+    "{company} Unveils {product} for Enterprise Customers",
+    "Researchers at {company} Publish New Findings on {topic}",
+    "EU Regulators Question {company} over {topic}",
+    "{company} Partners with Automakers on {topic}",
+]
+PRODUCTS = ["Gemini", "Claude", "GPT", "Llama", "Grok", "Mistral Large", "Cosmos", "Phi"]
+TOPICS = ["AI Safety", "Agents", "Multimodal Models", "Robotics", "Data Centers", "Copyright", "Open Weights"]
+SUMMARY_PARTS = [
+    "{company}が{product}の新バージョンを発表した。",
+    "推論性能が前世代から大きく向上し、{topic}分野での活用が期待される。",
+    "企業価値は約{amount}00億ドルに達したと報じられている。",
+    "{topic}をめぐる議論が各国で活発になっている。",
+    "同社は年内に日本市場向けの提供も開始する予定。",
+]
+TAGS = ["AI", "LLM", "GPU", "agents", "funding", "safety", "open source", "multimodal", "regulation", "robotics"]
+
+
+def make_shops(count: int, seed: int = 0) -> list[dict]:
+    """
+    ramen_shops.json と同じ形式の合成店舗データを生成
+    """
+    rng = random.Random(seed)
+    verified_base = datetime(2026, 1, 1)
+    shops = []
+    for i in range(count):
+        area = rng.choice(list(AREA_TOWNS))
+        town = rng.choice(AREA_TOWNS[area])
+        genre = rng.choice(GENRES)
+        specialties = rng.sample(MENU_ITEMS, rng.randint(1, 4))
+        values = {
+            "genre": genre, "area": area, "menu": specialties[0], "years": rng.randint(1, 8),
+            "minutes": rng.randint(1, 12), "founded": rng.randint(1950, 2020),
+        }
+        shops.append({
+            "name": f"{rng.choice(NAME_PREFIXES)} {rng.choice(NAME_WORDS)}{rng.choice(NAME_SUFFIXES)} {i}",
+            "address": f"東京都渋谷区{town}{rng.randint(1, 5)}-{rng.randint(1, 30)}-{rng.randint(1, 20)}{rng.choice(BUILDINGS)}",
+            "area": area,
+            "genre": genre,
+            "rating": round(rng.uniform(3.0, 4.8), 1) if rng.random() > 0.1 else None,
+            "price_range": rng.choice(["800-1000円", "850-1100円", "900-1200円", "1000-1500円", "1200-1800円"]),
+            "specialties": specialties,
+            "hours": rng.choice(HOURS),
+            "closed_days": rng.choice(CLOSED_DAYS),
+            "url": f"https://tabelog.com/tokyo/A1303/A130301/{13000000 + i}/",
+            "description": "".join(part.format(**values) for part in rng.sample(DESCRIPTION_PARTS, rng.randint(2, 3))),
+            "last_verified_at": (verified_base + timedelta(minutes=rng.randint(0, 60 * 24 * 90))).strftime("%Y-%m-%d %H:%M:%S"),
+        })
+    return shops
+
+
+def make_articles(count: int, seed: int = 0) -> list[dict]:
+    """
+    ai_news.json と同じ形式の合成ニュースデータを生成
+    """
+    rng = random.Random(seed)
+    articles = []
+    for i in range(count):
+        values = {
+            "company": rng.choice(COMPANIES), "product": rng.choice(PRODUCTS), "topic": rng.choice(TOPICS),
+            "amount": rng.randint(1, 40),
+        }
+        source = rng.choice(SOURCES)
+        articles.append({
+            "title": f"{rng.choice(HEADLINES).format(**values)} (#{i})",
+            "source": source,
+            "category": rng.choice(CATEGORIES),
+            "date": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "summary": "".join(part.format(**values) for part in rng.sample(SUMMARY_PARTS, rng.randint(2, 3))),
+            "url": f"https://{source.lower().replace(' ', '')}.example.com/2026/ai/{i}",
+            "importance": rng.choice(["high", "medium", "medium", "low"]),
+            "tags": [values["company"], *rng.sample(TAGS, rng.randint(2, 4))],
+        })
+    return articles
+
+
+def make_data(kind: str, count: int, seed: int = 0) -> dict:
+    """
+    save_data・generate_html に渡すデータ全体（kind は "shops" または "articles"）
+    """
+    records = make_shops(count, seed) if kind == "shops" else make_articles(count, seed)
+    return {
+        "collected_at": "2026-01-20 12:00:00",
+        "total_count": len(records),
+        kind: records,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ベンチマーク用の合成データを書き出す")
+    parser.add_argument('kind', choices=["shops", "articles"], help='データの種類')
+    parser.add_argument('count', type=int, help='レコード数')
+    parser.add_argument('-o', '--output', required=True, help='出力ファイル')
+    parser.add_argument('--seed', type=int, default=0, help='乱数のシード（デフォルト: 0）')
+    args = parser.parse_args()
+
+    data = make_data(args.kind, args.count, args.seed)
+    Path(args.output).write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"{args.count} 件を書き出しました: {args.output}")
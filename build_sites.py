@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+全エージェントの Web ページとポータルページの一括生成
+
+リポジトリ直下の */generate_web.py を探し、各エージェントのサイトを
+プロセスプールで並列に生成する。その後、各サイトの情報（SITE_META・件数・
+データ収集日時）からポータルページ docs/index.html を生成し直す。
+
+generate_web.py はエージェントごとに同じモジュール名のため、
+agent_common.module_loader でファイルパスを指定して別々のモジュールとして読み込む。
+"""
+
+import argparse
+import html
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from types import ModuleType
+
+ROOT_DIR = Path(__file__).parent
+DOCS_DIR = ROOT_DIR / "docs"
+PORTAL_FILE = DOCS_DIR / "index.html"
+
+sys.path.insert(0, str(ROOT_DIR))
+
+from agent_common.atomic_write import write_atomic
+from agent_common.data_file import read_manifest
+from agent_common.build_cache import BuildCache, fingerprint
+from agent_common.module_loader import load_module
+from agent_common.precompress import compress_file, available_encodings
+
+BUILD_CACHE_NAME = ".build_cache.json"
+
+
+def find_generators(root: Path = ROOT_DIR) -> list[Path]:
+    """
+    SITE_META を持つエージェントの generate_web.py を探す
+    """
+    return sorted(
+        path for path in root.glob("*/generate_web.py")
+        if "SITE_META" in path.read_text(encoding="utf-8")
+    )
+
+
+def load_data(module: ModuleType) -> dict:
+    """
+    generate_web.py のデータを読み込む
+
+    記録ログがあればコレクターの load_data でログを適用する（コレクターの読み込みには
+    時間がかかるため、ログがなければ JSON を直接読み込む）
+    """
+    if module.LOG_FILE.exists():
+        return load_module(module.COLLECTOR_FILE).load_data()
+    with open(module.DATA_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build_site(path: str, options: dict, force: bool = False) -> dict:
+    """
+    1 エージェントのサイトを生成し、ポータル用の情報を返す（プロセスプールで実行）
+
+    エージェントの main.py --web-only と同じビルドキャッシュを使い、
+    入力に変更がなければ生成を省略する
+    """
+    started = time.perf_counter()
+    module = load_module(Path(path))
+    meta = dict(module.SITE_META)
+    meta["name"] = Path(path).parent.name
+
+    # 記録ログもビルドキャッシュの入力に含める（main.py --web-only と同じ）
+    inputs = [file for file in (module.DATA_FILE, module.LOG_FILE) if file.exists()]
+    if not inputs:
+        meta["error"] = f"データファイルが見つかりません: {module.DATA_FILE}"
+        return meta
+
+    cache = BuildCache(Path(path).parent / BUILD_CACHE_NAME)
+    key = fingerprint([*inputs, *module.GENERATOR_SOURCES], options, manifests={module.DATA_FILE: module.MANIFEST_FILE})
+    meta["skipped"] = not force and cache.is_fresh(module.OUTPUT_DIR, key)
+    # マニフェストの件数はスナップショットのもののため、記録ログがあれば使えない
+    manifest = None if module.LOG_FILE.exists() else read_manifest(module.DATA_FILE, module.MANIFEST_FILE)
+    if meta["skipped"] and manifest is not None:
+        # 生成しない場合、ポータル用の件数と収集日時はマニフェストから取る（データを読まない）
+        meta["count"] = manifest["count"]
+        meta["collected_at"] = manifest["meta"].get("collected_at", "")
+    else:
+        data = load_data(module)
+        meta["count"] = len(data.get(meta["records_key"], []))
+        meta["collected_at"] = data.get("collected_at", "")
+
+    if not meta["skipped"]:
+        module.write_site(
+            data,
+            external_data=options["external_data"],
+            shards=options["data_shards"],
+            precompress=options["precompress"],
+            api_url=options["api_url"],
+        )
+        cache.update(module.OUTPUT_DIR, key)
+
+    meta["seconds"] = time.perf_counter() - started
+    return meta
+
+
+def generate_portal(sites: list[dict]) -> str:
+    """
+    各サイトへのリンクを並べたポータルページを生成
+    """
+    cards = []
+    for site in sites:
+        tags = ["Claude Agent SDK", f"{site['count']}{site['unit']}", *site["tags"]]
+        if site.get("collected_at"):
+            tags.append(f"{site['collected_at'][:10]} 更新")
+        tags_html = "\n".join(f'                <span class="tag">{html.escape(tag)}</span>' for tag in tags)
+        cards.append(f'''            <a href="./{site['name']}/" class="project-card">
+                <h2>{html.escape(site['title'])}</h2>
+                <p>{html.escape(site['description'])}</p>
+{tags_html}
+            </a>''')
+    cards_html = "\n".join(cards)
+
+    return f'''<!DOCTYPE html>
+<html lang="ja">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Projects</title>
+    <style>
+        * {{
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+        }}
+        body {{
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            min-height: 100vh;
+            padding: 40px 20px;
+        }}
+        .container {{
+            max-width: 800px;
+            margin: 0 auto;
+        }}
+        h1 {{
+            color: white;
+            text-align: center;
+            margin-bottom: 40px;
+            font-size: 2.5rem;
+            text-shadow: 2px 2px 4px rgba(0,0,0,0.2);
+        }}
+        .projects {{
+            display: grid;
+            gap: 20px;
+        }}
+        .project-card {{
+            background: white;
+            border-radius: 12px;
+            padding: 24px;
+            text-decoration: none;
+            color: inherit;
+            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+            transition: transform 0.2s, box-shadow 0.2s;
+        }}
+        .project-card:hover {{
+            transform: translateY(-4px);
+            box-shadow: 0 8px 25px rgba(0,0,0,0.15);
+        }}
+        .project-card h2 {{
+            color: #333;
+            margin-bottom: 8px;
+            display: flex;
+            align-items: center;
+            gap: 10px;
+        }}
+        .project-card p {{
+            color: #666;
+            line-height: 1.6;
+        }}
+        .tag {{
+            display: inline-block;
+            background: #f0f0f0;
+            color: #555;
+            padding: 4px 10px;
+            border-radius: 20px;
+            font-size: 0.8rem;
+            margin-top: 12px;
+            margin-right: 6px;
+        }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>Projects</h1>
+        <div class="projects">
+{cards_html}
+        </div>
+    </div>
+</body>
+</html>
+'''
+
+
+def build_all(
+    external_data: bool = False,
+    data_shards: int = 1,
+    precompress: bool = False,
+    api_url: str | None = None,
+    force: bool = False,
+    max_workers: int | None = None,
+) -> int:
+    """
+    全サイトを並列に生成してからポータルページを生成
+
+    api_url を指定すると各サイトのデータをページに含めず、検索 API サーバーから取得する
+    """
+    print("=" * 60)
+    print("🏗️  全サイト一括生成")
+    print("=" * 60)
+
+    generators = find_generators()
+    if not generators:
+        print("❌ generate_web.py が見つかりません")
+        return 1
+
+    options = {
+        "external_data": external_data,
+        "data_shards": data_shards,
+        "precompress": precompress,
+        "api_url": api_url,
+    }
+    started = time.perf_counter()
+    sites = []
+    failed = 0
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(build_site, str(path), options, force): path for path in generators}
+        for future in as_completed(futures):
+            name = futures[future].parent.name
+            try:
+                site = future.result()
+            except Exception as e:
+                print(f"❌ {name}: {e}")
+                failed += 1
+                continue
+            if "error" in site:
+                print(f"❌ {name}: {site['error']}")
+                failed += 1
+                continue
+            status = "変更なし（スキップ）" if site["skipped"] else "生成"
+            print(f"✅ {name}: {status} {site['count']}{site['unit']} {site['seconds'] * 1000:.0f}ms")
+            sites.append(site)
+
+    if failed:
+        # 失敗したサイトがポータルから消えないよう、ポータルページは更新しない
+        print(f"⚠️  {failed} サイトの生成に失敗したため、ポータルページは更新しません")
+        return 1
+
+    sites.sort(key=lambda site: site["name"])
+    if write_atomic(PORTAL_FILE, generate_portal(sites)):
+        print(f"🌐 ポータルページを更新しました: {PORTAL_FILE}")
+    else:
+        print(f"🌐 ポータルページに変更はありません: {PORTAL_FILE}")
+    if precompress:
+        for encoding in available_encodings():
+            compress_file(PORTAL_FILE, encoding)
+
+    print(f"⏱️  合計: {time.perf_counter() - started:.2f}s（{len(sites)} サイト）")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="全エージェントの Web ページとポータルページを一括生成"
+    )
+    parser.add_argument(
+        '--external-data',
+        action='store_true',
+        help='データを index.html に埋め込まず、ハッシュ付きの JSON ファイルとして書き出す'
+    )
+    parser.add_argument(
+        '--data-shards',
+        type=int,
+        default=1,
+        metavar='N',
+        help='--external-data 時にデータを分割するファイル数（デフォルト: 1）'
+    )
+    parser.add_argument(
+        '--precompress',
+        action='store_true',
+        help='出力ファイルの圧縮済みファイル（.gz、brotli があれば .br）も書き出す'
+    )
+    parser.add_argument(
+        '--api-url',
+        metavar='URL',
+        help='データをページに含めず、検索 API サーバー（serve_api.py）から取得する（例: http://localhost:8080）'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='入力が変わっていなくても Web ページを生成し直す'
+    )
+    parser.add_argument(
+        '--max-workers',
+        type=int,
+        help='同時に生成するサイト数（デフォルト: CPU 数）'
+    )
+
+    args = parser.parse_args()
+
+    sys.exit(build_all(
+        external_data=args.external_data,
+        data_shards=args.data_shards,
+        precompress=args.precompress,
+        api_url=args.api_url,
+        force=args.force,
+        max_workers=args.max_workers,
+    ))
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+全エージェントのデータ収集の同時実行
+
+COLLECTORS に登録したコレクター（collect_ramen_data、collect_news_data など）を
+asyncio のタスクとして同時に実行する。全エージェントのセッションは
+SessionBudget で同時実行数とターン数・コストの上限を共有する。
+
+1 エージェントが失敗しても他のエージェントは止めず、各エージェントのデータは
+そのエージェントの収集が終わった時点で保存する。収集中のレコードは各エージェントの
+main.py と同じチェックポイントに書き込み、--resume で中断した収集を再開できる。
+コレクターはエージェントごとに別のディレクトリにあるため、
+agent_common.module_loader でファイルパスを指定して読み込む
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+ROOT_DIR = Path(__file__).parent
+
+sys.path.insert(0, str(ROOT_DIR))
+
+from agent_common.budget import SessionBudget
+from agent_common.checkpoint import Checkpoint
+from agent_common.module_loader import load_module
+from agent_common.runtime import AgentRuntime
+from agent_common.tool_cache import ToolCallCache, DEFAULT_TTL_HOURS
+
+TOOL_CACHE_NAME = ".tool_cache.json"
+CHECKPOINT_NAME = ".checkpoint.jsonl"
+
+
+@dataclass
+class Collector:
+    """
+    オーケストレーターから実行するコレクター
+
+    path のモジュールの collect 関数を options と runtime・checkpoint を指定して呼び出し、
+    結果をモジュールの save_data で保存する。records_key はデータ中のレコードの一覧
+    """
+
+    name: str
+    path: Path
+    collect: str
+    records_key: str
+    options: dict[str, Any] = field(default_factory=dict)
+
+
+# 新しいエージェントを追加する場合はここに登録する
+# （各エージェント内の並列数は共有の上限に合わせて run_all で指定する）
+COLLECTORS = [
+    Collector(
+        name="shibuya_ramen_agent",
+        path=ROOT_DIR / "shibuya_ramen_agent" / "ramen_collector.py",
+        collect="collect_ramen_data",
+        records_key="shops",
+        options={"sharded": True},
+    ),
+    Collector(
+        name="ai_news_agent",
+        path=ROOT_DIR / "ai_news_agent" / "news_collector.py",
+        collect="collect_news_data",
+        records_key="articles",
+        options={"parallel": True},
+    ),
+]
+
+
+async def run_collector(
+    collector: Collector,
+    budget: SessionBudget,
+    max_concurrency: int,
+    target_count: int | None = None,
+    tool_cache: bool = True,
+    persist_tool_cache: bool = False,
+    tool_cache_ttl: float = DEFAULT_TTL_HOURS,
+    resume: bool = False,
+) -> dict[str, Any]:
+    """
+    1 エージェントの収集を実行してデータを保存し、結果を返す（例外は結果に含める）
+
+    ツールキャッシュは今回の実行の中だけで共有し、persist_tool_cache を指定した場合だけ
+    エージェントのディレクトリに保存して tool_cache_ttl 時間以内の次回の実行でも再利用する
+    """
+    tool_cache_file = collector.path.parent / TOOL_CACHE_NAME if persist_tool_cache else None
+    started = time.perf_counter()
+    result: dict[str, Any] = {"name": collector.name}
+    runtime = AgentRuntime(
+        tool_cache=ToolCallCache(tool_cache_file, tool_cache_ttl) if tool_cache else None,
+        budget=budget,
+    )
+    checkpoint = Checkpoint(collector.path.parent / CHECKPOINT_NAME, resume=resume)
+    try:
+        module = load_module(collector.path)
+        data = await getattr(module, collector.collect)(
+            **collector.options,
+            max_concurrency=max_concurrency,
+            target_count=target_count,
+            runtime=runtime,
+            checkpoint=checkpoint,
+        )
+        result["count"] = len(data.get(collector.records_key, []))
+        # 他のエージェントの終了を待たずに保存する
+        if result["count"]:
+            result["path"] = module.save_data(data)
+            if module.LOG_FILE.exists():
+                # 保存したデータが最新のため、古い記録ログを適用しないよう削除する（main.py と同じ）
+                module.open_log().discard()
+            checkpoint.discard()
+        else:
+            result["error"] = "収集できたデータが 0 件のため保存しませんでした"
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        runtime.close()
+        checkpoint.close()
+
+    result["turns"] = runtime.turns
+    result["cost_usd"] = runtime.cost_usd
+    result["seconds"] = time.perf_counter() - started
+    status = f"❌ {result['error']}" if "error" in result else f"✅ {result['count']} 件を保存"
+    print(f"\n🏁 [{collector.name}] {status}（{result['seconds']:.0f}s）")
+    return result
+
+
+async def run_all(
+    names: list[str] | None = None,
+    max_concurrency: int = 4,
+    max_turns: int | None = None,
+    max_cost_usd: float | None = None,
+    target_count: int | None = None,
+    tool_cache: bool = True,
+    persist_tool_cache: bool = False,
+    tool_cache_ttl: float = DEFAULT_TTL_HOURS,
+    resume: bool = False,
+) -> int:
+    """
+    コレクターを同時に実行し、エージェントごとの結果を表示する
+    """
+    print("=" * 60)
+    print("🤖 全エージェント同時収集")
+    print("=" * 60)
+
+    collectors = [collector for collector in COLLECTORS if not names or collector.name in names]
+    unknown = set(names or []) - {collector.name for collector in COLLECTORS}
+    if unknown or not collectors:
+        print(f"❌ 不明なエージェント: {', '.join(sorted(unknown)) or '（なし）'}")
+        print(f"   登録済み: {', '.join(collector.name for collector in COLLECTORS)}")
+        return 1
+
+    budget = SessionBudget(max_concurrency=max_concurrency, max_turns=max_turns, max_cost_usd=max_cost_usd)
+    print(f"📡 {len(collectors)} エージェントを同時実行（セッションは全体で最大 {max_concurrency} 並列）")
+    if max_turns is not None or max_cost_usd is not None:
+        limits = []
+        if max_turns is not None:
+            limits.append(f"{max_turns} ターン")
+        if max_cost_usd is not None:
+            limits.append(f"${max_cost_usd:.2f}")
+        print(f"💰 全体の予算: {' / '.join(limits)}")
+    print("-" * 60)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        run_collector(
+            collector,
+            budget,
+            max_concurrency=max_concurrency,
+            target_count=target_count,
+            tool_cache=tool_cache,
+            persist_tool_cache=persist_tool_cache,
+            tool_cache_ttl=tool_cache_ttl,
+            resume=resume,
+        )
+        for collector in collectors
+    ))
+
+    print()
+    print("=" * 60)
+    print("📊 エージェント別の結果")
+    print("=" * 60)
+    for result in results:
+        status = "失敗" if "error" in result else f"{result['count']} 件"
+        print(
+            f"   {result['name']:<22} {status:>8} {result['turns']:>5} ターン "
+            f"${result['cost_usd']:.4f} {result['seconds']:>6.0f}s"
+        )
+    print(f"💰 {budget.summary()}")
+    print(f"⏱️  合計: {time.perf_counter() - started:.0f}s")
+
+    return 1 if any("error" in result for result in results) else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="全エージェントのデータ収集を同時実行"
+    )
+    parser.add_argument(
+        '--agents',
+        nargs='+',
+        metavar='NAME',
+        help='実行するエージェント（デフォルト: 登録済みのすべて）'
+    )
+    parser.add_argument(
+        '--max-concurrency',
+        type=int,
+        default=4,
+        help='全エージェント合計のセッションの最大同時実行数（デフォルト: 4）'
+    )
+    parser.add_argument(
+        '--max-turns',
+        type=int,
+        help='全エージェント合計のターン数の上限'
+    )
+    parser.add_argument(
+        '--max-cost',
+        type=float,
+        metavar='USD',
+        help='全エージェント合計のコスト（USD）の上限'
+    )
+    parser.add_argument(
+        '--target',
+        type=int,
+        metavar='N',
+        help='エージェントごとに N 件に達した時点で収集を終了する'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='中断した収集を各エージェントのチェックポイントから再開する'
+    )
+    parser.add_argument(
+        '--persist-tool-cache',
+        action='store_true',
+        help=f'WebSearch / WebFetch のキャッシュを各エージェントの {TOOL_CACHE_NAME} に保存し、次回の実行でも再利用する'
+    )
+    parser.add_argument(
+        '--tool-cache-ttl',
+        type=float,
+        default=DEFAULT_TTL_HOURS,
+        metavar='HOURS',
+        help=f'--persist-tool-cache で保存したキャッシュの有効期間（デフォルト: {DEFAULT_TTL_HOURS:g} 時間）'
+    )
+    parser.add_argument(
+        '--no-tool-cache',
+        action='store_true',
+        help='WebSearch / WebFetch の結果をキャッシュしない'
+    )
+
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run_all(
+        names=args.agents,
+        max_concurrency=args.max_concurrency,
+        max_turns=args.max_turns,
+        max_cost_usd=args.max_cost,
+        target_count=args.target,
+        tool_cache=not args.no_tool_cache,
+        persist_tool_cache=args.persist_tool_cache,
+        tool_cache_ttl=args.tool_cache_ttl,
+        resume=args.resume,
+    )))
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+検索 API サーバーの起動
+
+SOURCES に登録したエージェントのデータを agent_common.query_server で配信する。
+テキスト検索・絞り込み・並べ替えの定義は各エージェントの generate_web.py
+（SEARCH_FIELDS・FACET_FIELDS・SORT_KEYS）のものを使うため、API の結果は
+Web ページの検索と同じになる。
+
+--db を指定すると JSON の代わりに各エージェントの SQLite データベースから読み込む。
+Web ページから使うには、--api-url を指定してページを生成する:
+    python serve_api.py --port 8080
+    python shibuya_ramen_agent/main.py --web-only --api-url http://localhost:8080
+"""
+
+import argparse
+import asyncio
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent
+
+sys.path.insert(0, str(ROOT_DIR))
+
+from agent_common.query_server import (
+    Dataset,
+    QueryServer,
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    DEFAULT_CACHE_SIZE,
+    MAX_LIMIT,
+)
+from agent_common.module_loader import load_module
+from build_sites import load_data
+
+
+@dataclass
+class Source:
+    """
+    API で配信するエージェントのデータ
+
+    generator（generate_web.py）の SITE_META の records_key が URL のパスになる。
+    database は load_db と DB_FILE を持つモジュール
+    """
+
+    name: str
+    generator: Path
+    database: Path
+
+
+# 新しいエージェントを追加する場合はここに登録する
+SOURCES = [
+    Source(
+        name="shibuya_ramen_agent",
+        generator=ROOT_DIR / "shibuya_ramen_agent" / "generate_web.py",
+        database=ROOT_DIR / "shibuya_ramen_agent" / "ramen_db.py",
+    ),
+    Source(
+        name="ai_news_agent",
+        generator=ROOT_DIR / "ai_news_agent" / "generate_web.py",
+        database=ROOT_DIR / "ai_news_agent" / "news_db.py",
+    ),
+]
+
+
+def build_datasets(names: list[str] | None = None, use_db: bool = False) -> list[Dataset]:
+    """
+    登録済みのエージェントのうち、データファイルがあるもののデータセット
+    """
+    datasets = []
+    for source in SOURCES:
+        if names and source.name not in names:
+            continue
+        generator = load_module(source.generator)
+        if use_db:
+            database = load_module(source.database)
+            path, watch = database.DB_FILE, []
+            load = lambda database=database: database.load_db(database.DB_FILE)
+        else:
+            # 記録ログがあれば適用し（main.py --web-only と同じデータ）、ログの更新でも読み込み直す
+            path, watch = generator.DATA_FILE, [generator.LOG_FILE]
+            load = lambda generator=generator: load_data(generator)
+        if not any(file.exists() for file in (path, *watch)):
+            print(f"⚠️  [{source.name}] データファイルが見つからないため省略します: {path}")
+            continue
+        datasets.append(Dataset(
+            name=generator.SITE_META["records_key"],
+            source=path,
+            load=load,
+            search_fields=generator.SEARCH_FIELDS,
+            facet_fields=generator.FACET_FIELDS,
+            sorts=generator.SORT_KEYS,
+            watch=watch,
+        ))
+    return datasets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="収集データの検索 API サーバー")
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'待ち受けるアドレス（デフォルト: {DEFAULT_HOST}）')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'待ち受けるポート（デフォルト: {DEFAULT_PORT}）')
+    parser.add_argument(
+        '--agents',
+        nargs='+',
+        metavar='NAME',
+        help='配信するエージェント（デフォルト: 登録済みのすべて）'
+    )
+    parser.add_argument(
+        '--db',
+        action='store_true',
+        help='JSON の代わりに各エージェントの SQLite データベースから読み込む'
+    )
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help=f'LRU キャッシュに保持する応答数（デフォルト: {DEFAULT_CACHE_SIZE}、0 で無効）'
+    )
+    parser.add_argument(
+        '--max-limit',
+        type=int,
+        default=MAX_LIMIT,
+        help=f'1 回の応答の最大件数（デフォルト: {MAX_LIMIT}）'
+    )
+    parser.add_argument(
+        '--quiet',
+        action='store_true',
+        help='リクエストごとのログを表示しない'
+    )
+    args = parser.parse_args()
+
+    datasets = build_datasets(args.agents, use_db=args.db)
+    if not datasets:
+        print("❌ 配信できるデータがありません。先にデータ収集を実行してください。")
+        return 1
+
+    server = QueryServer(datasets, cache_size=args.cache_size, max_limit=args.max_limit, log=not args.quiet)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print(f"\n🗃️  応答キャッシュ: {server.cache.summary()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,16 +6,99 @@
 """
 
 import json
+import re
+import sys
 from pathlib import Path
 from datetime import datetime
 
+# 共通モジュールのパスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agent_common.search_index import build_search_index, SEARCH_INDEX_JS
+from agent_common.virtual_grid import use_windowed, DEFAULT_BUFFER_ROWS, VIRTUAL_GRID_JS
+from agent_common.site_data import shard_records, write_hashed_json, remove_stale_files, DATA_LOADER_JS
+from agent_common.columnar import encode_records, COLUMNAR_JS
+from agent_common.atomic_write import write_atomic
+from agent_common.precompress import precompress_directory, format_results
+from agent_common.query_client import QUERY_CLIENT_JS
+from agent_common.record_log import log_path
+from agent_common.data_file import manifest_path
+
 OUTPUT_DIR = Path(__file__).parent.parent / "docs" / "shibuya_ramen_agent"
 DATA_FILE = OUTPUT_DIR / "ramen_shops.json"
 
-
-def generate_html(data: dict) -> str:
+# データの読み込み（記録ログの適用）に使うコレクターと記録ログ
+# （build_sites.py・serve_api.py が使う。コレクターの読み込みには時間がかかるため、ログの有無はここで調べる）
+COLLECTOR_FILE = Path(__file__).parent / "ramen_collector.py"
+LOG_FILE = log_path(Path(__file__).parent, DATA_FILE)
+
+# コレクターが保存時に書き出すデータファイルのマニフェスト（ビルドキャッシュの確認に使う）
+MANIFEST_FILE = manifest_path(Path(__file__).parent, DATA_FILE)
+
+# ポータルページ（docs/index.html）に表示するサイト情報
+SITE_META = {
+    "title": "渋谷区ラーメン店検索",
+    "description": "渋谷区のラーメン店情報を検索・フィルタリングできるWebアプリ。Claude Agent SDKを使用して自動収集したデータを表示。",
+    "tags": ["検索機能"],
+    "records_key": "shops",
+    "unit": "店舗",
+}
+
+# ビルドキャッシュのキーに含める生成処理のソースファイル
+GENERATOR_SOURCES = [
+    Path(__file__),
+    *(Path(__file__).parent.parent / "agent_common" / name for name in (
+        "search_index.py",
+        "virtual_grid.py",
+        "site_data.py",
+        "columnar.py",
+        "atomic_write.py",
+        "precompress.py",
+        "query_client.py",
+    )),
+]
+
+# テキスト検索の対象フィールド
+SEARCH_FIELDS = ["name", "address", "area", "genre", "description", "specialties"]
+
+# 列指向データで辞書エンコードするフィールド
+DICTIONARY_FIELDS = ["area", "genre"]
+
+# 検索 API（agent_common.query_server）の絞り込みと並べ替え（ページの filterAndSort と同じ）
+FACET_FIELDS = ["area", "genre"]
+SORT_KEYS = {
+    "name": [(lambda shop: shop.get('name') or '', False)],
+    "rating": [(lambda shop: shop.get('rating') or 0, True)],
+    "area": [(lambda shop: shop.get('area') or '', False)],
+}
+
+# 検索 API から 1 回に取得する店舗数
+API_PAGE_SIZE = 60
+
+# 外部データファイルのファイル名（ハッシュを除いた部分）
+SHARD_STEM = "shops-{}"
+INDEX_STEM = "search-index"
+
+
+def generate_html(
+    data: dict,
+    windowed: bool | None = None,
+    window_buffer_rows: int = DEFAULT_BUFFER_ROWS,
+    data_files: dict | None = None,
+    columnar: bool = True,
+    api_url: str | None = None,
+) -> str:
     """
     検索可能な HTML ページを生成
+
+    windowed を True にすると、画面に見えている店舗カードだけを描画する
+    ウィンドウ表示にする（None なら店舗数で自動判定）。
+    window_buffer_rows は表示範囲の上下に余分に描画する行数。
+    data_files（write_site が作るファイル一覧）を指定すると店舗データを埋め込まず、
+    ページ表示後に外部ファイルから読み込む。
+    columnar が True なら店舗データを列指向で埋め込み、False なら店舗の配列のまま埋め込む。
+    api_url（検索 API サーバーの URL）を指定すると店舗データを埋め込まず、
+    検索のたびに API から結果を API_PAGE_SIZE 件ずつ取得する
     """
     shops = data.get('shops', [])
     collected_at = data.get('collected_at', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
@@ -24,8 +107,7 @@ def generate_html(data: dict) -> str:
     areas = sorted(set(shop.get('area', '不明') for shop in shops if shop.get('area')))
     genres = sorted(set(shop.get('genre', '不明') for shop in shops if shop.get('genre')))
 
-    # JSON データを埋め込み用に整形
-    shops_json = json.dumps(shops, ensure_ascii=False)
+    grid_options = json.dumps({"enabled": use_windowed(len(shops), windowed), "bufferRows": window_buffer_rows})
 
     html = f'''<!DOCTYPE html>
 <html lang="ja">
@@ -378,7 +460,7 @@ def generate_html(data: dict) -> str:
         <div class="no-results" id="noResults" style="display: none;">
             <h3>該当する店舗が見つかりません</h3>
             <p>検索条件を変更してお試しください</p>
-        </div>
+        </div>{MORE_BUTTON if api_url else ''}
     </main>
 
     <footer class="footer">
@@ -387,8 +469,12 @@ def generate_html(data: dict) -> str:
     </footer>
 
     <script>
-        // 店舗データ
-        const shops = {shops_json};
+        // 店舗データ（外部データファイルの場合は読み込み後に設定）
+        let shops = [];
+        let searchIndex = null;
+        // 検索 API を使う場合の呼び出し（createQueryClient）
+        let queryClient = null;
+{SEARCH_INDEX_JS}{VIRTUAL_GRID_JS}{COLUMNAR_JS}{DATA_LOADER_JS if data_files else ''}{QUERY_CLIENT_JS if api_url else ''}
 
         // DOM 要素
         const searchText = document.getElementById('searchText');
@@ -398,30 +484,23 @@ def generate_html(data: dict) -> str:
         const shopGrid = document.getElementById('shopGrid');
         const resultCount = document.getElementById('resultCount');
         const noResults = document.getElementById('noResults');
+        const shopGridView = createVirtualGrid(shopGrid, renderShopCard, {grid_options});
 
         // 検索とフィルタリング
         function filterAndSort() {{
-            const query = searchText.value.toLowerCase();
+            if (queryClient) {{
+                queryClient.search({{ q: searchText.value, area: areaFilter.value, genre: genreFilter.value, sort: sortOrder.value }});
+                return;
+            }}
+            if (!searchIndex) return;
+
             const area = areaFilter.value;
             const genre = genreFilter.value;
             const sort = sortOrder.value;
 
-            let filtered = shops.filter(shop => {{
-                // テキスト検索
-                if (query) {{
-                    const searchFields = [
-                        shop.name,
-                        shop.address,
-                        shop.area,
-                        shop.genre,
-                        shop.description,
-                        ...(shop.specialties || [])
-                    ].filter(Boolean).join(' ').toLowerCase();
-
-                    if (!searchFields.includes(query)) {{
-                        return false;
-                    }}
-                }}
+            // テキスト検索（インデックスで候補を絞り込んだ店舗番号）
+            const ids = searchIndex.search(searchText.value).filter(id => {{
+                const shop = shops[id];
 
                 // エリアフィルタ
                 if (area && shop.area !== area) {{
@@ -437,6 +516,7 @@ def generate_html(data: dict) -> str:
             }});
 
             // ソート
+            const filtered = ids.map(id => shops[id]);
             filtered.sort((a, b) => {{
                 switch (sort) {{
                     case 'rating':
@@ -453,18 +533,17 @@ def generate_html(data: dict) -> str:
         }}
 
         // 店舗カードのレンダリング
-        function renderShops(filteredShops) {{
-            resultCount.textContent = `${{filteredShops.length}} 店舗`;
+        // total は検索 API で一部の店舗だけを取得した場合の全件数
+        function renderShops(filteredShops, total = filteredShops.length) {{
+            resultCount.textContent = `${{total}} 店舗`;
 
-            if (filteredShops.length === 0) {{
-                shopGrid.innerHTML = '';
-                noResults.style.display = 'block';
-                return;
-            }}
-
-            noResults.style.display = 'none';
+            noResults.style.display = total === 0 ? 'block' : 'none';
+            shopGridView.render(filteredShops);
+        }}
 
-            shopGrid.innerHTML = filteredShops.map(shop => `
+        // 店舗カードの HTML
+        function renderShopCard(shop) {{
+            return `
                 <article class="shop-card">
                     <div class="shop-header">
                         <h2 class="shop-name">${{escapeHtml(shop.name)}}</h2>
@@ -493,15 +572,14 @@ def generate_html(data: dict) -> str:
                         ${{shop.url ? `<a href="${{escapeHtml(shop.url)}}" target="_blank" rel="noopener noreferrer" class="shop-link">詳細を見る →</a>` : ''}}
                     </div>
                 </article>
-            `).join('');
+            `;
         }}
 
         // HTML エスケープ
+        const htmlEscapes = {{ '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' }};
         function escapeHtml(text) {{
             if (!text) return '';
-            const div = document.createElement('div');
-            div.textContent = text;
-            return div.innerHTML;
+            return String(text).replace(/[&<>"']/g, c => htmlEscapes[c]);
         }}
 
         // フィルタクリア
@@ -520,7 +598,7 @@ def generate_html(data: dict) -> str:
         sortOrder.addEventListener('change', filterAndSort);
 
         // 初期表示
-        filterAndSort();
+{generate_data_script(shops, data_files, columnar, api_url)}
     </script>
 </body>
 </html>
@@ -528,6 +606,107 @@ def generate_html(data: dict) -> str:
     return html
 
 
+def generate_data_script(shops: list, data_files: dict | None, columnar: bool = True, api_url: str | None = None) -> str:
+    """
+    店舗データと検索インデックス（または検索 API の呼び出し）を設定して初期表示する JS を生成
+    """
+    if api_url:
+        endpoint = api_url.rstrip('/') + '/api/' + SITE_META['records_key']
+        return f'''        const moreButton = document.getElementById('moreButton');
+        resultCount.textContent = '読み込み中...';
+        queryClient = createQueryClient({json.dumps(endpoint)}, {API_PAGE_SIZE}, (records, total) => {{
+            renderShops(records, total);
+            moreButton.style.display = queryClient.hasMore() ? 'inline-block' : 'none';
+        }}, error => {{
+            resultCount.textContent = '検索 API に接続できませんでした';
+            console.error(error);
+        }});
+        moreButton.addEventListener('click', () => queryClient.more());
+        filterAndSort();'''
+
+    if data_files is None:
+        # JSON データを埋め込み用に整形
+        shops_json = json.dumps(encode_records(shops, columnar, DICTIONARY_FIELDS), ensure_ascii=False)
+        index_json = json.dumps(build_search_index(shops, SEARCH_FIELDS), ensure_ascii=False, separators=(',', ':'))
+        return f'''        shops = decodeRecords({shops_json});
+        searchIndex = createSearchIndex({index_json}, shops);
+        filterAndSort();'''
+
+    return f'''        resultCount.textContent = '読み込み中...';
+        loadSiteData({json.dumps(data_files)}, decodeRecords).then(data => {{
+            shops = data.records;
+            searchIndex = createSearchIndex(data.index, shops);
+            filterAndSort();
+        }}).catch(error => {{
+            resultCount.textContent = 'データを読み込めませんでした';
+            console.error(error);
+        }});'''
+
+
+def write_site(
+    data: dict,
+    output_dir: Path = OUTPUT_DIR,
+    external_data: bool = False,
+    shards: int = 1,
+    columnar: bool = True,
+    precompress: bool = False,
+    api_url: str | None = None,
+    **html_options,
+) -> Path:
+    """
+    Web ページを output_dir に書き出し、index.html のパスを返す
+
+    external_data を指定すると店舗データと検索インデックスを内容のハッシュ付きの
+    JSON ファイルとして書き出し、ページからは非同期に読み込む。
+    店舗は店名のハッシュで shards 個のファイルに振り分ける。
+    columnar は埋め込み・書き出しともに店舗データを列指向にするかどうか。
+    precompress を指定すると出力ディレクトリの各ファイルの .gz（brotli があれば .br も）を書き出す。
+    api_url を指定するとデータを埋め込まず書き出しもせず、ページから検索 API を呼び出す
+    （external_data より優先する）
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    data_files = None
+    if external_data and not api_url:
+        parts = shard_records(data.get('shops', []), key=lambda shop: str(shop.get('name', '')), shards=shards)
+        # インデックスの店舗番号は読み込み後の並び（シャード順に連結）に合わせる
+        shops = [shop for part in parts for shop in part]
+        data_files = {
+            "shards": [
+                write_hashed_json(output_dir, SHARD_STEM.format(i), encode_records(part, columnar, DICTIONARY_FIELDS))
+                for i, part in enumerate(parts) if part
+            ],
+            "index": write_hashed_json(output_dir, INDEX_STEM, build_search_index(shops, SEARCH_FIELDS)),
+        }
+        data = {**data, 'shops': shops}
+
+    html = generate_html(data, data_files=data_files, columnar=columnar, api_url=api_url, **html_options)
+
+    output_file = output_dir / "index.html"
+    write_atomic(output_file, html)
+
+    # 以前の出力で書き出した不要なデータファイルを削除
+    keep = {*data_files["shards"], data_files["index"]} if data_files else set()
+    remove_stale_files(output_dir, _is_data_stem, keep)
+
+    if precompress:
+        for line in format_results(precompress_directory(output_dir)):
+            print(f"   🗜️  {line}")
+
+    return output_file
+
+
+# 検索 API の次のページを取得するボタン
+MORE_BUTTON = '''
+        <div style="text-align: center; margin-top: 1.5rem;">
+            <button class="clear-btn" id="moreButton" style="display: none;">さらに表示</button>
+        </div>'''
+
+
+def _is_data_stem(stem: str) -> bool:
+    return stem == INDEX_STEM or re.fullmatch(r"shops-\d+", stem) is not None
+
+
 def generate_options(items: list) -> str:
     """
     select タグ用のオプションを生成
@@ -535,34 +714,33 @@ def generate_options(items: list) -> str:
     return '\n'.join(f'<option value="{item}">{item}</option>' for item in items)
 
 
-def main():
+def main(db: str | Path | None = None):
     """
-    メイン実行関数
+    メイン実行関数（db を指定すると JSON の代わりに SQLite データベースから読み込む）
     """
     print("=" * 60)
     print("🌐 渋谷区ラーメン店検索 Web ページ生成")
     print("=" * 60)
     print()
 
-    # JSON データを読み込み
-    if not DATA_FILE.exists():
-        print(f"❌ データファイルが見つかりません: {DATA_FILE}")
+    # JSON データ（記録ログがあれば適用する）またはデータベースを読み込み
+    # （スクリプトとして実行した場合のみ使うため、ここで読み込む）
+    if db:
+        from ramen_db import load_db
+        data = load_db(db) if Path(db).exists() else None
+    else:
+        from ramen_collector import load_data
+        data = load_data()
+    if data is None:
+        print(f"❌ データファイルが見つかりません: {Path(db) if db else DATA_FILE}")
         print("   先に ramen_collector.py を実行してデータを収集してください。")
         return
 
-    with open(DATA_FILE, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
     shops_count = len(data.get('shops', []))
     print(f"📖 {shops_count} 店舗のデータを読み込みました")
 
-    # HTML を生成
-    html = generate_html(data)
-
-    # ファイルに保存
-    output_file = OUTPUT_DIR / "index.html"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html)
+    # HTML を生成してファイルに保存
+    output_file = write_site(data)
 
     print(f"✅ Web ページを生成しました: {output_file}")
     print()
@@ -576,4 +754,13 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="渋谷区ラーメン店検索 Web ページ生成")
+    parser.add_argument(
+        '--db',
+        metavar='PATH',
+        help='JSON の代わりに読み込む SQLite データベース'
+    )
+    args = parser.parse_args()
+    main(db=args.db)
@@ -8,19 +8,76 @@ Claude Agent SDK を使用してラーメン店データを収集し、
 
 import asyncio
 import sys
+import time
 from pathlib import Path
 
 # モジュールのパスを追加
 sys.path.insert(0, str(Path(__file__).parent))
-
-from ramen_collector import collect_ramen_data, save_data
-from generate_web import generate_html, OUTPUT_DIR, DATA_FILE
-
-
-async def main():
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ramen_collector import collect_ramen_data, load_data, save_data, open_log, LOG_FILE, DEFAULT_TTL_DAYS
+from generate_web import write_site, OUTPUT_DIR, DATA_FILE, MANIFEST_FILE, GENERATOR_SOURCES
+from ramen_db import save_db, load_db, DB_FILE
+from agent_common.recording import SessionRecorder, SessionReplayer
+from agent_common.runtime import AgentRuntime
+from agent_common.tool_cache import ToolCallCache, DEFAULT_TTL_HOURS
+from agent_common.tracing import SessionTracer
+from agent_common.profiling import StageProfiler
+from agent_common.checkpoint import Checkpoint
+from agent_common.build_cache import BuildCache, fingerprint, snapshot, changed_files
+
+BUILD_CACHE_FILE = Path(__file__).parent / ".build_cache.json"
+PROFILE_DIR = Path(__file__).parent / "profiles"
+CHECKPOINT_FILE = Path(__file__).parent / ".checkpoint.jsonl"
+
+
+async def main(
+    sharded: bool = False,
+    max_concurrency: int = 3,
+    target_count: int | None = None,
+    incremental: bool = False,
+    ttl_days: float = DEFAULT_TTL_DAYS,
+    record: str | None = None,
+    replay: str | None = None,
+    trace: str | None = None,
+    tool_cache: bool = True,
+    tool_cache_file: str | Path | None = None,
+    tool_cache_ttl: float = DEFAULT_TTL_HOURS,
+    external_data: bool = False,
+    data_shards: int = 1,
+    precompress: bool = False,
+    profile: str | Path | None = None,
+    resume: bool = False,
+    db: str | Path | None = None,
+    api_url: str | None = None,
+    log: bool = False,
+    pretty: bool = True,
+):
     """
     メイン実行関数：データ収集から Web 生成まで一括実行
+
+    incremental を指定すると既存の JSON データを読み込み、TTL を過ぎた店舗の
+    再確認と新規店舗の探索だけを行う。
+    record を指定するとエージェントセッションを記録し、
+    replay を指定すると記録したセッションを再生してオフラインで実行する。
+    trace を指定するとターン・ツール呼び出しごとの所要時間などを JSON Lines で記録し、
+    収集後に集計を表示する。
+    tool_cache が True なら今回の実行の中で同じ WebSearch / WebFetch の呼び出しを
+    キャッシュで置き換え、tool_cache_file を指定するとその結果を保存して
+    tool_cache_ttl 時間以内の次回の実行でも再利用する。
+    external_data を指定するとデータを index.html に埋め込まず、
+    data_shards 個のハッシュ付き JSON ファイルとして書き出す。
+    precompress を指定すると出力ファイルの圧縮済みファイル（.gz / .br）も書き出す。
+    profile に指定したディレクトリに段階（収集・保存・Web 生成）ごとの .pstats を書き出し、
+    経過時間・CPU 時間・メモリのピークを表示する。
+    収集中は登録したレコードをチェックポイントに逐次書き込み（保存後に削除）、
+    resume を指定すると中断した収集をチェックポイントから再開する。
+    db を指定すると JSON に加えて SQLite データベースにも保存する。
+    api_url を指定するとデータをページに含めず、検索 API サーバー（serve_api.py）から取得する。
+    log を指定すると JSON 全体を書き直さず、前回から変わったレコードだけを記録ログに追記する。
+    pretty が False なら JSON を空白を省いて保存する
     """
+    profiler = StageProfiler(profile)
     print()
     print("╔" + "═" * 58 + "╗")
     print("║" + " 🍜 渋谷区ラーメン店データ収集・Web生成エージェント 🍜 ".center(56) + "║")
@@ -37,24 +94,88 @@ async def main():
     print("\n📡 ステップ 1/3: ラーメン店データを収集中...")
     print("─" * 60)
 
+    runtime = AgentRuntime(
+        recorder=SessionRecorder(record) if record else None,
+        replayer=SessionReplayer(replay) if replay else None,
+        tracer=SessionTracer(trace) if trace else None,
+        # 再生時はツールが実行されないためキャッシュしない
+        tool_cache=ToolCallCache(tool_cache_file, tool_cache_ttl) if tool_cache and not replay else None,
+    )
+    if replay:
+        print(f"♻️  記録したセッションを再生します: {replay}")
+
+    # 再生は実際の収集ではないためチェックポイントを書かない
+    checkpoint = None if replay else Checkpoint(CHECKPOINT_FILE, resume=resume)
+    if resume and not CHECKPOINT_FILE.exists():
+        print("⚠️  チェックポイントがないため、最初から収集します")
+    elif not resume and checkpoint is not None and CHECKPOINT_FILE.exists():
+        print("⚠️  前回中断した収集のチェックポイントを破棄して新しく収集します（再開するには --resume）")
+
+    existing = load_data() if incremental else None
+    if incremental and existing is None:
+        print("⚠️  既存データがないため、全店舗を収集します")
+
     try:
-        ramen_data = await collect_ramen_data()
+        with profiler.stage("collect", "データ収集"):
+            ramen_data = await collect_ramen_data(
+                sharded=sharded,
+                max_concurrency=max_concurrency,
+                target_count=target_count,
+                existing=existing,
+                ttl_days=ttl_days,
+                runtime=runtime,
+                checkpoint=checkpoint,
+            )
     except Exception as e:
         print(f"\n❌ データ収集中にエラーが発生しました: {e}")
+        if checkpoint is not None and CHECKPOINT_FILE.exists():
+            print("   💾 登録済みの店舗はチェックポイントに保存されています。--resume で再開できます")
         print("   Claude Agent SDK がインストールされているか確認してください。")
         print("   pip install claude-agent-sdk")
+        print_profile(profiler)
         return 1
+    finally:
+        runtime.close()
+        if checkpoint is not None:
+            checkpoint.close()
+
+    if record:
+        print(f"📼 セッションを記録しました: {record}")
+    if runtime.tool_cache is not None:
+        print(f"🗃️  ツールキャッシュ: {runtime.tool_cache.summary()}")
+    if runtime.tracer is not None:
+        print(f"⏱️  計測結果を記録しました: {trace}")
+        for line in runtime.tracer.summary():
+            print(f"   {line}")
 
     # ステップ 2: データ保存
     print("\n💾 ステップ 2/3: データを JSON 形式で保存中...")
     print("─" * 60)
 
-    filepath = save_data(ramen_data)
+    with profiler.stage("save", "データ保存"):
+        if log:
+            ramen_data, counts = open_log().append(ramen_data)
+            print(
+                f"   📝 記録ログに追記しました: {LOG_FILE}"
+                f"（追加 {counts['added']} / 更新 {counts['updated']} / 削除 {counts['deleted']}"
+                f" / 確認日時のみ {counts['touched']}）"
+            )
+        else:
+            save_data(ramen_data, pretty=pretty)
+            if LOG_FILE.exists():
+                # 保存したデータは記録ログの変更も含むため、ログは不要になる
+                open_log().discard()
+                print(f"   🗑️  スナップショットに反映済みの記録ログを削除しました: {LOG_FILE}")
+        if db:
+            save_db(ramen_data, db)
+    if checkpoint is not None:
+        checkpoint.discard()
 
     shops_count = len(ramen_data.get('shops', []))
     if shops_count == 0:
         print("\n⚠️  収集できた店舗数が 0 です。")
         print("   ネットワーク接続やAPI制限を確認してください。")
+        print_profile(profiler)
         return 1
 
     print(f"   保存完了: {shops_count} 店舗のデータ")
@@ -63,11 +184,8 @@ async def main():
     print("\n🌐 ステップ 3/3: 検索 Web ページを生成中...")
     print("─" * 60)
 
-    html = generate_html(ramen_data)
-
-    output_file = OUTPUT_DIR / "index.html"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html)
+    with profiler.stage("generate", "Web 生成"):
+        output_file = write_site(ramen_data, external_data=external_data, shards=data_shards, precompress=precompress, api_url=api_url)
 
     print(f"   生成完了: {output_file}")
 
@@ -91,43 +209,139 @@ async def main():
     print()
     print(f"📁 出力ファイル:")
     print(f"   - JSON: {DATA_FILE}")
+    if log:
+        print(f"   - LOG:  {LOG_FILE}")
+    if db:
+        print(f"   - DB:   {db}")
     print(f"   - HTML: {output_file}")
     print()
     print("🖥️  Web ページを表示するには:")
     print(f"   cd {OUTPUT_DIR} && python -m http.server 8000")
     print("   ブラウザで http://localhost:8000 を開いてください")
     print()
+    print_profile(profiler)
 
     return 0
 
 
-def run_web_generation_only():
+def run_web_generation_only(
+    external_data: bool = False,
+    data_shards: int = 1,
+    precompress: bool = False,
+    force: bool = False,
+    profile: str | Path | None = None,
+    db: str | Path | None = None,
+    api_url: str | None = None,
+):
     """
     既存の JSON データから Web ページのみを生成
+
+    JSON データに記録ログがあれば、ログを 1 行ずつ読んで適用する。
+    データファイル（db を指定した場合は SQLite データベース）・記録ログ・生成処理のソース・
+    生成オプションが前回と同じで、出力ファイルも変更されていなければ生成を省略する
+    （force で常に生成）。
+    profile を指定すると段階（読み込み・Web 生成）ごとに計測する（生成処理を計測するため
+    ビルドキャッシュは使わない）
     """
+    profiler = StageProfiler(profile)
     print()
     print("🌐 既存データから Web ページを生成")
     print("─" * 60)
 
-    if not DATA_FILE.exists():
-        print(f"❌ データファイルが見つかりません: {DATA_FILE}")
-        print("   先にデータ収集を実行してください。")
+    data_file = Path(db) if db else DATA_FILE
+    inputs = [path for path in (data_file, None if db else LOG_FILE) if path is not None and path.exists()]
+    if not inputs:
+        print(f"❌ データファイルが見つかりません: {data_file}")
+        if db:
+            print("   先に python ramen_db.py import で JSON データを取り込んでください。")
+        else:
+            print("   先にデータ収集を実行してください。")
         return 1
 
-    import json
-    with open(DATA_FILE, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    timings = []
+    started = time.perf_counter()
+
+    cache = BuildCache(BUILD_CACHE_FILE)
+    options = {
+        "external_data": external_data,
+        "data_shards": data_shards,
+        "precompress": precompress,
+        "api_url": api_url,
+    }
+    key = fingerprint([*inputs, *GENERATOR_SOURCES], options, manifests={DATA_FILE: MANIFEST_FILE})
+    timings.append(("キャッシュ確認", time.perf_counter() - started))
+
+    if not force and not profiler.enabled and cache.is_fresh(OUTPUT_DIR, key):
+        print(f"✅ 入力に変更がないため生成をスキップしました: {OUTPUT_DIR / 'index.html'}")
+        print_timings(timings)
+        return 0
+
+    step_started = time.perf_counter()
+    with profiler.stage("load", "データ読み込み"):
+        if db:
+            data = load_db(db)
+        else:
+            data = load_data()
+    timings.append(("データ読み込み", time.perf_counter() - step_started))
+
+    step_started = time.perf_counter()
+    before = snapshot(OUTPUT_DIR)
+    with profiler.stage("generate", "Web 生成"):
+        output_file = write_site(data, external_data=external_data, shards=data_shards, precompress=precompress, api_url=api_url)
+    updated, removed = changed_files(before, snapshot(OUTPUT_DIR))
+    timings.append(("HTML 生成・書き込み", time.perf_counter() - step_started))
+
+    cache.update(OUTPUT_DIR, key)
 
-    html = generate_html(data)
+    print(f"✅ Web ページを生成しました: {output_file}")
+    if updated:
+        print(f"   📝 更新: {', '.join(updated)}")
+    if removed:
+        print(f"   🗑️  削除: {', '.join(removed)}")
+    if not updated and not removed:
+        print("   📝 出力に変更はありません")
+    print_timings(timings)
+    print_profile(profiler)
+    return 0
 
-    output_file = OUTPUT_DIR / "index.html"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html)
 
-    print(f"✅ Web ページを生成しました: {output_file}")
+def compact_log(pretty: bool = True) -> int:
+    """
+    記録ログをスナップショット（ramen_shops.json）に反映してログを削除
+    """
+    if not LOG_FILE.exists():
+        print("✅ 記録ログはありません（スナップショットは最新です）")
+        return 0
+    started = time.perf_counter()
+    data = open_log().compact(lambda data: save_data(data, pretty=pretty))
+    print(
+        f"🗜️  記録ログをスナップショットに反映しました: {len(data.get('shops', []))} 店舗"
+        f"（{(time.perf_counter() - started) * 1000:.0f}ms）"
+    )
     return 0
 
 
+def print_timings(timings: list[tuple[str, float]]) -> None:
+    """
+    ステップごとの所要時間を表示
+    """
+    for step, elapsed in timings:
+        print(f"   ⏱️  {step}: {elapsed * 1000:.1f}ms")
+    print(f"   ⏱️  合計: {sum(elapsed for _, elapsed in timings) * 1000:.1f}ms")
+
+
+def print_profile(profiler: StageProfiler) -> None:
+    """
+    段階ごとの計測結果を表示（--profile 指定時のみ）
+    """
+    lines = profiler.summary()
+    if not lines:
+        return
+    print("\n📈 プロファイル:")
+    for line in lines:
+        print(f"   {line}")
+
+
 if __name__ == "__main__":
     import argparse
 
@@ -139,10 +353,163 @@ if __name__ == "__main__":
         action='store_true',
         help='既存の JSON データから Web ページのみを生成'
     )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='--web-only 時に入力が変わっていなくても Web ページを生成し直す'
+    )
+    parser.add_argument(
+        '--sharded',
+        action='store_true',
+        help='エリアごとにエージェントを並列起動して収集'
+    )
+    parser.add_argument(
+        '--max-concurrency',
+        type=int,
+        default=3,
+        help='--sharded 時に同時実行するエージェント数（デフォルト: 3）'
+    )
+    parser.add_argument(
+        '--target',
+        type=int,
+        metavar='N',
+        help='重複除去済みの店舗数が N に達した時点で収集を終了'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='既存データのうち TTL を過ぎた店舗の再確認と新規店舗の探索だけを行う'
+    )
+    parser.add_argument(
+        '--ttl-days',
+        type=float,
+        default=DEFAULT_TTL_DAYS,
+        help=f'--incremental 時に店舗を再確認するまでの日数（デフォルト: {DEFAULT_TTL_DAYS:g}）'
+    )
+    parser.add_argument(
+        '--tool-cache',
+        metavar='PATH',
+        help='WebSearch / WebFetch のキャッシュを保存し、次回の実行でも再利用するファイル（デフォルト: 今回の実行内のみ）'
+    )
+    parser.add_argument(
+        '--tool-cache-ttl',
+        type=float,
+        default=DEFAULT_TTL_HOURS,
+        metavar='HOURS',
+        help=f'--tool-cache に保存したキャッシュの有効期間（時間、デフォルト: {DEFAULT_TTL_HOURS:g}）'
+    )
+    parser.add_argument(
+        '--no-tool-cache',
+        action='store_true',
+        help='ツールキャッシュを使わない'
+    )
+    parser.add_argument(
+        '--external-data',
+        action='store_true',
+        help='データを index.html に埋め込まず、ハッシュ付きの JSON ファイルとして書き出す'
+    )
+    parser.add_argument(
+        '--data-shards',
+        type=int,
+        default=1,
+        metavar='N',
+        help='--external-data 時にデータを分割するファイル数（デフォルト: 1）'
+    )
+    parser.add_argument(
+        '--precompress',
+        action='store_true',
+        help='出力ファイルの圧縮済みファイル（.gz、brotli があれば .br）も書き出す'
+    )
+    parser.add_argument(
+        '--log',
+        action='store_true',
+        help='JSON 全体を書き直さず、前回から変わったレコードだけを記録ログに追記する'
+    )
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='記録ログを JSON データ（スナップショット）に反映してログを削除する'
+    )
+    parser.add_argument(
+        '--json-format',
+        choices=['pretty', 'compact'],
+        default='pretty',
+        help='JSON データの形式（pretty: 字下げあり、compact: 空白なしで約半分のサイズ、デフォルト: pretty）'
+    )
+    parser.add_argument(
+        '--api-url',
+        metavar='URL',
+        help='データをページに含めず、検索 API サーバー（serve_api.py）から取得する（例: http://localhost:8080）'
+    )
+    parser.add_argument(
+        '--db',
+        nargs='?',
+        const=str(DB_FILE),
+        metavar='PATH',
+        help=f'SQLite データベースにも保存する（--web-only 時はデータベースから読み込む、デフォルト: {DB_FILE.name}）'
+    )
+    parser.add_argument(
+        '--record',
+        metavar='PATH',
+        help='エージェントセッションを記録するファイル（.gz で圧縮）'
+    )
+    parser.add_argument(
+        '--replay',
+        metavar='PATH',
+        help='記録したセッションを再生してオフラインで実行'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='中断した収集をチェックポイントから再開する'
+    )
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const=str(PROFILE_DIR),
+        metavar='DIR',
+        help=f'段階ごとの .pstats を DIR に書き出し、経過時間・CPU 時間・メモリのピークを表示（デフォルト: {PROFILE_DIR.name}/）'
+    )
+    parser.add_argument(
+        '--trace',
+        metavar='PATH',
+        help='ターン・ツール呼び出しごとの所要時間などを JSON Lines で記録するファイル'
+    )
 
     args = parser.parse_args()
 
-    if args.web_only:
-        sys.exit(run_web_generation_only())
+    if args.compact:
+        sys.exit(compact_log(pretty=args.json_format == 'pretty'))
+    elif args.web_only:
+        sys.exit(run_web_generation_only(
+            external_data=args.external_data,
+            data_shards=args.data_shards,
+            precompress=args.precompress,
+            force=args.force,
+            profile=args.profile,
+            db=args.db,
+            api_url=args.api_url,
+        ))
     else:
-        sys.exit(asyncio.run(main()))
+        sys.exit(asyncio.run(main(
+            sharded=args.sharded,
+            max_concurrency=args.max_concurrency,
+            target_count=args.target,
+            incremental=args.incremental,
+            ttl_days=args.ttl_days,
+            record=args.record,
+            replay=args.replay,
+            trace=args.trace,
+            tool_cache=not args.no_tool_cache,
+            tool_cache_file=args.tool_cache,
+            tool_cache_ttl=args.tool_cache_ttl,
+            external_data=args.external_data,
+            data_shards=args.data_shards,
+            precompress=args.precompress,
+            profile=args.profile,
+            resume=args.resume,
+            db=args.db,
+            api_url=args.api_url,
+            log=args.log,
+            pretty=args.json_format == 'pretty',
+        )))
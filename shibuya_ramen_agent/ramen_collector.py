@@ -7,18 +7,39 @@ JSON 形式で保存するエージェント
 """
 
 import asyncio
+import contextlib
+import dataclasses
 import json
 import os
+import re
+import sys
+import unicodedata
 from pathlib import Path
-from datetime import datetime
-from typing import Any
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+from typing import Any, Callable
 
-from claude_agent_sdk import query, ClaudeAgentOptions
+from claude_agent_sdk import query, tool, create_sdk_mcp_server, ClaudeAgentOptions
+
+# 共通モジュールのパスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agent_common.checkpoint import Checkpoint
+from agent_common.data_file import save_json, manifest_path
+from agent_common.entity_resolution import ResolutionStats, fold_kana, resolve_records
+from agent_common.json_stream import JsonStreamExtractor
+from agent_common.record_log import RecordLog, log_path
+from agent_common.records import RecordStore
+from agent_common.runtime import AgentRuntime
 
 
 # 出力ディレクトリ
 OUTPUT_DIR = Path(__file__).parent.parent / "docs" / "shibuya_ramen_agent"
 
+# スナップショット（ramen_shops.json）以降の変更を追記する記録ログ
+LOG_FILE = log_path(Path(__file__).parent, "ramen_shops.json")
+MANIFEST_FILE = manifest_path(Path(__file__).parent, "ramen_shops.json")
+
 # エージェントへのシステムプロンプト
 SYSTEM_PROMPT = """あなたは渋谷区のラーメン店情報を収集する専門エージェントです。
 
@@ -45,13 +66,17 @@ SYSTEM_PROMPT = """あなたは渋谷区のラーメン店情報を収集する
 3. WebFetch ツールを使用して各店舗の詳細情報を収集
 4. 最低20店舗以上の情報を収集することを目標とする
 
-## 出力形式
-最終的に以下のJSON形式で結果を出力してください：
+## 登録方法
+店舗の情報を1件確認するたびに、record_shop ツールを呼び出してその店舗を登録してください。
+- 1回の呼び出しで1店舗を登録します
+- 登録済みの店舗を再度登録すると、空欄の項目だけが補完されます
+- 収集した全データを最後にまとめて出力する必要はありません
+
+record_shop ツールが利用できない場合のみ、店舗ごとに以下の形式の JSON を
+```json と ``` で囲んで出力してください：
 
 ```json
 {
-  "collected_at": "YYYY-MM-DD HH:MM:SS",
-  "total_count": 数値,
   "shops": [
     {
       "name": "店名",
@@ -75,119 +100,563 @@ SYSTEM_PROMPT = """あなたは渋谷区のラーメン店情報を収集する
 - 情報が不明な場合は null を設定してください
 - 閉店した店舗は含めないでください
 - 情報源を明記してください
-
-最後に、収集した全データを上記の JSON 形式で出力してください。
-JSON は ```json と ``` で囲んで出力してください。
 """
 
 
-async def collect_ramen_data() -> dict[str, Any]:
+# 店舗登録ツール（エージェントが 1 店舗ずつ呼び出すインプロセス MCP ツール）
+RECORD_SERVER_NAME = "ramen"
+RECORD_TOOL_NAME = f"mcp__{RECORD_SERVER_NAME}__record_shop"
+
+# record_shop ツールの入力スキーマ
+SHOP_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "description": "店名"},
+        "address": {"type": ["string", "null"], "description": "住所"},
+        "area": {"type": ["string", "null"], "description": "エリア（渋谷、恵比寿など）"},
+        "genre": {"type": ["string", "null"], "description": "ラーメンの種類"},
+        "rating": {"type": ["number", "null"], "description": "評価（5点満点）"},
+        "price_range": {"type": ["string", "null"], "description": "価格帯（例: 800-1200円）"},
+        "specialties": {"type": "array", "items": {"type": "string"}, "description": "看板メニューや特徴"},
+        "hours": {"type": ["string", "null"], "description": "営業時間"},
+        "closed_days": {"type": ["string", "null"], "description": "定休日"},
+        "url": {"type": ["string", "null"], "description": "公式サイトまたは情報源URL"},
+        "description": {"type": ["string", "null"], "description": "店舗の説明や特徴"},
+    },
+    "required": ["name"],
+}
+
+
+# 増分更新モードで店舗情報を再確認するまでの日数
+DEFAULT_TTL_DAYS = 30.0
+
+# 増分更新モードのターン数（基本ターン数 + 再確認する店舗ごとのターン数）
+REFRESH_BASE_TURNS = 10
+REFRESH_TURNS_PER_SHOP = 2
+
+# 増分更新モードで渡すプロンプト
+REFRESH_PROMPT_TEMPLATE = """渋谷区のラーメン店情報を更新してください。
+
+## 再確認が必要な店舗（{stale_count}店舗）
+前回の確認から時間が経っている店舗です。WebFetch で最新の住所・営業時間・定休日などを確認し、
+record_shop ツールで登録し直してください（閉店している場合は登録しないでください）：
+{stale_list}
+
+## 確認済みの店舗（{fresh_count}店舗）
+最近確認済みの店舗です。調べ直す必要はありません：
+{fresh_list}
+
+## 新しい店舗
+余裕があれば、上記に含まれない渋谷区のラーメン店を探して record_shop ツールで登録してください。"""
+
+# 時刻の保存形式（collected_at / last_verified_at）
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+# エリア分割モードで並列に収集するエリア（1 エリア = 1 エージェントセッション）
+AREAS = ["渋谷", "恵比寿", "代官山", "原宿", "表参道"]
+
+# エリア分割モードでの 1 セッションあたりの最大ターン数
+AREA_MAX_TURNS = 20
+
+# エリア分割モードで各セッションに渡すプロンプト
+AREA_PROMPT_TEMPLATE = """渋谷区の「{area}」エリアにあるラーメン店情報を収集してください。
+
+以下の手順で進めてください：
+1. 「{area} ラーメン ランキング」「{area} ラーメン 人気」で検索して有名店をリストアップ
+2. 見つかった店舗の詳細情報を WebFetch で収集
+3. area フィールドには「{area}」を設定
+4. 確認した店舗は record_shop ツールで1件ずつ登録
+
+{area}エリアの店舗に絞って、できるだけ多くの店舗情報（5店舗以上）を収集してください。"""
+
+
+async def collect_ramen_data(
+    sharded: bool = False,
+    areas: list[str] | None = None,
+    max_concurrency: int = 3,
+    target_count: int | None = None,
+    existing: dict[str, Any] | None = None,
+    ttl_days: float = DEFAULT_TTL_DAYS,
+    runtime: AgentRuntime | None = None,
+    checkpoint: Checkpoint | None = None,
+) -> dict[str, Any]:
     """
     渋谷区のラーメン店データを収集するエージェントを実行
+
+    sharded=True の場合はエリアごとにエージェントセッションを起動し、
+    最大 max_concurrency 件を同時に実行して結果をマージする。
+    target_count を指定すると、検証・重複除去済みの店舗数がその件数に
+    達した時点でセッションを終了する。
+    existing に前回のデータを渡すと増分更新モードになり、最終確認から
+    ttl_days 日以上経った店舗の再確認と新規店舗の探索だけを行う
+    （sharded は無視される）。
+    runtime でセッションの記録・再生を指定できる。
+    checkpoint を指定すると登録した店舗と完了したエリアを逐次書き込み、
+    再開時は前回までの店舗を引き継いで完了済みのエリアを省略する
     """
     print("=" * 60)
     print("🍜 渋谷区ラーメン店データ収集エージェント")
     print("=" * 60)
     print()
 
+    store = RecordStore(key=_shop_key, validate=validate_shop, target=target_count)
+    if target_count:
+        print(f"🎯 {target_count} 店舗に達した時点で収集を終了します")
+
+    done: list[str] = []
+    if checkpoint is not None:
+        records, done = checkpoint.open()
+        for shop in records:
+            store.add(shop)
+        store.on_change = checkpoint.record
+        if checkpoint.resume:
+            print(f"⏯️  チェックポイントから再開: {len(store)} 店舗 / 完了済みエリア {', '.join(done) or 'なし'}")
+    note = resume_note(store)
+
+    if existing is not None:
+        await refresh_ramen_data(existing, store, ttl_days, runtime=runtime)
+    elif sharded:
+        await collect_ramen_data_sharded(
+            [area for area in areas or AREAS if area not in done],
+            store,
+            max_concurrency,
+            runtime=runtime,
+            checkpoint=checkpoint,
+            note=note,
+        )
+    else:
+        options = ClaudeAgentOptions(
+            system_prompt=SYSTEM_PROMPT,
+            allowed_tools=["WebSearch", "WebFetch"],
+            permission_mode='acceptEdits',
+            max_turns=50,  # 十分な探索を許可
+        )
+
+        print("📡 エージェントを起動してデータを収集中...")
+        print("-" * 60)
+
+        await run_agent_session(
+            prompt="""渋谷区のラーメン店情報を収集してください。
+
+以下の手順で進めてください：
+1. まず「渋谷区 ラーメン ランキング」「渋谷 ラーメン 人気」で検索して有名店をリストアップ
+2. 各エリア（渋谷、恵比寿、代官山、原宿、表参道）ごとにも検索
+3. 見つかった店舗の詳細情報を WebFetch で収集
+4. 確認した店舗は record_shop ツールで1件ずつ登録
+
+できるだけ多くの店舗情報（20店舗以上）を収集してください。""" + note,
+            options=options,
+            store=store,
+            runtime=runtime,
+        )
+
+    print("-" * 60)
+    print("✅ データ収集完了")
+    print()
+
+    return build_ramen_data(store)
+
+
+async def refresh_ramen_data(
+    existing: dict[str, Any],
+    store: RecordStore,
+    ttl_days: float = DEFAULT_TTL_DAYS,
+    runtime: AgentRuntime | None = None,
+) -> None:
+    """
+    前回のデータのうち TTL を過ぎた店舗だけをエージェントに再確認させる
+
+    TTL 内の店舗はそのまま store に入れ、再確認されなかった店舗も
+    以前の last_verified_at のまま残す
+    """
+    fresh, stale = plan_refresh(existing, ttl_days)
+    # チェックポイントから再開した場合、前回の実行で再確認済みの店舗は省略する
+    rechecked = sum(1 for shop in stale if shop in store)
+    stale = [shop for shop in stale if shop not in store]
+    if rechecked:
+        print(f"⏯️  前回の実行で再確認済み: {rechecked} 店舗")
+
+    for shop in fresh:
+        store.add(shop)
+
+    print(f"♻️  増分更新: 再確認 {len(stale)} 店舗 / 確認済み {len(fresh)} 店舗（TTL {ttl_days:g} 日）")
+    print("-" * 60)
+
     options = ClaudeAgentOptions(
         system_prompt=SYSTEM_PROMPT,
         allowed_tools=["WebSearch", "WebFetch"],
         permission_mode='acceptEdits',
-        max_turns=50,  # 十分な探索を許可
+        max_turns=min(50, REFRESH_BASE_TURNS + REFRESH_TURNS_PER_SHOP * len(stale)),
     )
 
-    collected_text = ""
+    def describe(shop: dict[str, Any]) -> str:
+        return f"- {shop['name']}" + (f"（{shop['url']}）" if shop.get('url') else "")
+
+    added = await run_agent_session(
+        prompt=REFRESH_PROMPT_TEMPLATE.format(
+            stale_count=len(stale),
+            stale_list="\n".join(describe(shop) for shop in stale) or "（なし）",
+            fresh_count=len(fresh),
+            fresh_list="、".join(shop['name'] for shop in fresh) or "（なし）",
+        ),
+        options=options,
+        store=store,
+        runtime=runtime,
+    )
+
+    # 再確認されなかった店舗は以前の情報のまま残す（再確認された店舗は空欄だけ補完される）
+    kept = sum(1 for shop in stale if store.add(shop))
+    print(f"\n🏁 再確認・新規 {added} 店舗 / 未確認のまま維持 {kept} 店舗")
+
+
+def resume_note(store: RecordStore) -> str:
+    """
+    チェックポイントから再開した場合にプロンプトに追加する登録済み店舗の一覧
+    """
+    if not store.records:
+        return ""
+    names = "、".join(shop['name'] for shop in store.records)
+    return f"""
+
+## 登録済みの店舗（{len(store)}店舗）
+前回中断するまでに登録済みの店舗です。調べ直したり登録し直したりする必要はありません：
+{names}"""
+
+
+def plan_refresh(
+    existing: dict[str, Any],
+    ttl_days: float = DEFAULT_TTL_DAYS,
+    now: datetime | None = None,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """
+    前回のデータを TTL 内の店舗と再確認が必要な店舗に分ける
+
+    last_verified_at がない店舗はデータ全体の collected_at を最終確認日時とみなす
+    """
+    now = now or datetime.now()
+    deadline = now - timedelta(days=ttl_days)
+    default_verified_at = _parse_timestamp(existing.get('collected_at'))
+
+    fresh, stale = [], []
+    for shop in existing.get('shops', []):
+        if not isinstance(shop, dict) or not validate_shop(shop):
+            continue
+        verified_at = _parse_timestamp(shop.get('last_verified_at')) or default_verified_at
+        if verified_at is not None and verified_at > deadline:
+            fresh.append(shop)
+        else:
+            stale.append(shop)
+    return fresh, stale
+
+
+def _parse_timestamp(value: Any) -> datetime | None:
+    try:
+        return datetime.strptime(str(value), TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+async def collect_ramen_data_sharded(
+    areas: list[str],
+    store: RecordStore,
+    max_concurrency: int = 3,
+    runtime: AgentRuntime | None = None,
+    checkpoint: Checkpoint | None = None,
+    note: str = "",
+) -> None:
+    """
+    エリアごとにエージェントセッションを並列実行し、結果を store にマージ
 
-    print("📡 エージェントを起動してデータを収集中...")
+    完了したエリアは checkpoint に記録する。note は各エリアのプロンプトに追加する
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    print(f"📡 {len(areas)} エリアを最大 {max_concurrency} 並列で収集中...")
     print("-" * 60)
 
-    async for message in query(
-        prompt="""渋谷区のラーメン店情報を収集してください。
+    async def collect_area(area: str) -> None:
+        async with semaphore:
+            if store.reached:
+                print(f"\n⏭️  [{area}] 目標店舗数に達しているためスキップ")
+                return
+
+            print(f"\n🚀 [{area}] 収集を開始")
+            options = ClaudeAgentOptions(
+                system_prompt=SYSTEM_PROMPT,
+                allowed_tools=["WebSearch", "WebFetch"],
+                permission_mode='acceptEdits',
+                max_turns=AREA_MAX_TURNS,
+            )
+            added = await run_agent_session(
+                prompt=AREA_PROMPT_TEMPLATE.format(area=area) + note,
+                options=options,
+                store=store,
+                label=area,
+                runtime=runtime,
+            )
+            print(f"\n🏁 [{area}] {added} 店舗を追加")
+            if checkpoint is not None:
+                checkpoint.done(area)
+
+    results = await asyncio.gather(*(collect_area(area) for area in areas), return_exceptions=True)
+
+    for area, result in zip(areas, results):
+        if isinstance(result, BaseException):
+            # 1 エリアの失敗で全体を止めない
+            print(f"⚠️ [{area}] 収集に失敗しました: {result}")
+
+
+async def run_agent_session(
+    prompt: str,
+    options: ClaudeAgentOptions,
+    store: RecordStore,
+    label: str | None = None,
+    runtime: AgentRuntime | None = None,
+) -> int:
+    """
+    エージェントセッションを 1 回実行し、出力から店舗を逐次 store に追加する
 
-以下の手順で進めてください：
-1. まず「渋谷区 ラーメン ランキング」「渋谷 ラーメン 人気」で検索して有名店をリストアップ
-2. 各エリア（渋谷、恵比寿、代官山、原宿、表参道）ごとにも検索
-3. 見つかった店舗の詳細情報を WebFetch で収集
-4. 最終的に JSON 形式で出力
-
-できるだけ多くの店舗情報（20店舗以上）を収集してください。""",
-        options=options
-    ):
-        # メッセージの処理
-        if hasattr(message, 'content'):
-            for block in message.content:
-                if hasattr(block, 'text'):
-                    text = block.text
-                    print(text)
-                    collected_text += text + "\n"
-                elif hasattr(block, 'name'):
-                    # ツール使用の表示
-                    print(f"\n🔧 Tool: {block.name}")
-        elif hasattr(message, 'type') and message.type == 'result':
-            # ツール結果（簡略表示）
+    このセッションで新たに追加した店舗数を返す。
+    store が目標件数に達した時点でセッションを終了する。
+    label を指定すると並列実行時に出力の区別がつくよう各行の先頭に付与する。
+    label は記録・再生時のセッション名にも使う
+    """
+    prefix = f"[{label}] " if label else ""
+    extractor = JsonStreamExtractor("shops")
+    total_added = 0
+    runtime = runtime or AgentRuntime()
+
+    def ingest(shop: Any) -> bool:
+        nonlocal total_added
+        if isinstance(shop, dict):
+            # 店舗ごとに最終確認日時を記録する
+            shop = {**shop, "last_verified_at": datetime.now().strftime(TIMESTAMP_FORMAT)}
+        if not store.add(shop):
+            return False
+        total_added += 1
+        runtime.record_added(label or "main", shop['name'])
+        print(f"{prefix}📥 {shop['name']} を登録（計 {len(store)} 店舗）")
+        return True
+
+    options = runtime.configure(dataclasses.replace(
+        options,
+        mcp_servers={RECORD_SERVER_NAME: create_record_server(store, ingest)},
+        allowed_tools=[*options.allowed_tools, RECORD_TOOL_NAME],
+    ))
+    messages = runtime.stream(label or "main", options, lambda options: query(prompt=prompt, options=options))
+
+    async with contextlib.aclosing(messages):
+        async for message in messages:
+            # メッセージの処理
             if hasattr(message, 'content'):
-                result_preview = str(message.content)[:200]
-                print(f"   ↳ {result_preview}...")
+                for block in message.content:
+                    if hasattr(block, 'text'):
+                        text = block.text
+                        if prefix:
+                            print("\n".join(prefix + line for line in text.splitlines()))
+                        else:
+                            print(text)
+                        # record_shop を使わずに JSON で出力された店舗も登録する
+                        for payload in extractor.feed(text + "\n"):
+                            for shop in payload.get("shops") or []:
+                                ingest(shop)
+                    elif hasattr(block, 'name'):
+                        if block.name == RECORD_TOOL_NAME:
+                            # 再生時はツールが実行されないため、呼び出し内容から登録する
+                            if runtime.replayer is not None:
+                                ingest(block.input)
+                            continue
+                        # ツール使用の表示
+                        print(f"\n{prefix}🔧 Tool: {block.name}")
+            elif hasattr(message, 'type') and message.type == 'result':
+                # ツール結果（簡略表示）
+                if hasattr(message, 'content'):
+                    result_preview = str(message.content)[:200]
+                    print(f"   {prefix}↳ {result_preview}...")
+
+            if store.reached:
+                print(f"\n{prefix}🎯 目標の {store.target} 店舗に到達したためセッションを終了します")
+                break
+
+    if not extractor.payloads:
+        for error in extractor.errors:
+            print(f"⚠️ {prefix}JSON パースエラー: {error}")
+
+    return total_added
+
+
+def create_record_server(store: RecordStore, ingest: Callable[[dict[str, Any]], bool]):
+    """
+    エージェントが店舗を 1 件ずつ登録するためのインプロセス MCP サーバーを作成
 
-    print("-" * 60)
-    print("✅ データ収集完了")
-    print()
+    ツール呼び出しごとに入力を検証し、ingest で store に追加する
+    """
+    @tool("record_shop", "確認したラーメン店を1件登録します", SHOP_SCHEMA)
+    async def record_shop(args: dict[str, Any]) -> dict[str, Any]:
+        if not validate_shop(args):
+            return {
+                "content": [{"type": "text", "text": "name（店名）は必須です"}],
+                "is_error": True,
+            }
+
+        if ingest(args):
+            message = f"登録しました（計 {len(store)} 店舗）"
+        else:
+            message = "登録済みの店舗です（空欄の項目を補完しました）"
+        if store.reached:
+            message += "。目標の店舗数に達したので収集を終了してください"
+        return {"content": [{"type": "text", "text": message}]}
+
+    return create_sdk_mcp_server(name=RECORD_SERVER_NAME, version="1.0.0", tools=[record_shop])
+
+
+def build_ramen_data(store: RecordStore) -> dict[str, Any]:
+    """
+    store に蓄積した店舗から保存用のデータを作成
+    """
+    if not store.records:
+        # データが見つからない場合は空のテンプレートを返す
+        return {
+            "collected_at": datetime.now().strftime(TIMESTAMP_FORMAT),
+            "total_count": 0,
+            "shops": [],
+            "error": "JSON データの抽出に失敗しました"
+        }
+
+    shops, stats = resolve_shops(store.records)
+    if stats.resolved < stats.records:
+        print(f"🔗 重複する店舗をまとめました: {stats.summary()}")
 
-    # JSON を抽出
-    ramen_data = extract_json_from_text(collected_text)
+    return {
+        "collected_at": datetime.now().strftime(TIMESTAMP_FORMAT),
+        "total_count": len(shops),
+        "shops": shops,
+    }
 
-    return ramen_data
 
+def resolve_shops(shops: list[dict[str, Any]]) -> tuple[list[dict[str, Any]], ResolutionStats]:
+    """
+    表記の異なる同じ店舗（支店名の有無、住所の書き方の違いなど）をまとめる
 
-def extract_json_from_text(text: str) -> dict[str, Any]:
+    最終確認日時の新しい店舗の値を優先し、specialties は和集合にする。
+    まとめた店舗には sources（情報源の URL または店名）と provenance（フィールドごとの情報源）が付く
     """
-    テキストから JSON データを抽出
+    return resolve_records(
+        shops,
+        name=_resolution_name,
+        address=lambda shop: shop.get('address'),
+        source=lambda shop: shop.get('url') or shop.get('name') or "",
+        recency=lambda shop: shop.get('last_verified_at') or "",
+        list_fields=("specialties",),
+    )
+
+
+# 名寄せで店名の末尾から除く支店名（「〇〇店」のほかにエリア名・出口名だけのもの）
+BRANCH_NAMES = {*AREAS, "東口", "西口", "南口", "北口"}
+
+# 「らーめん」「らぁ麺」「拉麺」などの表記ゆれ（ひらがなはカタカナに寄せた後）
+_RAMEN_SPELLINGS = re.compile(r"ラ[ーァア]?(?:メン|麺)|拉麺")
+_PARENTHESES = re.compile(r"\(.*?\)")
+
+
+def _resolution_name(shop: dict[str, Any]) -> str:
+    """
+    名寄せで比較する店名（読み仮名などの括弧書き・末尾の支店名を除き、ラーメンの表記をそろえる）
     """
-    import re
+    name = fold_kana(unicodedata.normalize("NFKC", str(shop.get('name') or '')).lower())
+    words = _PARENTHESES.sub(" ", name).split()
+    if len(words) > 1 and (words[-1].endswith("店") or words[-1] in BRANCH_NAMES):
+        words.pop()
+    return _RAMEN_SPELLINGS.sub("ラーメン", " ".join(words))
 
-    # ```json ... ``` パターンを探す
-    json_pattern = r'```json\s*([\s\S]*?)\s*```'
-    matches = re.findall(json_pattern, text)
 
-    if matches:
-        # 最後の JSON ブロックを使用（最終結果のはず）
-        try:
-            return json.loads(matches[-1])
-        except json.JSONDecodeError as e:
-            print(f"⚠️ JSON パースエラー: {e}")
+def validate_shop(shop: dict[str, Any]) -> bool:
+    """
+    店舗として最低限必要な情報（店名）があるかを判定
+    """
+    name = shop.get('name')
+    return isinstance(name, str) and bool(name.strip())
+
+
+def _shop_key(shop: dict[str, Any]) -> str:
+    """
+    重複判定用のキー（正規化した店名、店名がなければ正規化した URL）
+    """
+    name = "".join(unicodedata.normalize("NFKC", str(shop.get('name') or '')).split()).lower()
+    return name or canonical_url(shop.get('url'))
+
 
-    # フォールバック：{...} パターンを探す
-    brace_pattern = r'\{[\s\S]*"shops"[\s\S]*\}'
-    brace_matches = re.findall(brace_pattern, text)
+def canonical_url(url: Any) -> str:
+    """
+    比較用に URL を正規化（スキーム・www・末尾のスラッシュ・クエリを除去）
+    """
+    if not url:
+        return ""
+    parts = urlsplit(str(url).strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    return f"{host}{parts.path.rstrip('/')}" if host else str(url).strip().rstrip('/')
 
-    if brace_matches:
-        for match in reversed(brace_matches):
-            try:
-                return json.loads(match)
-            except json.JSONDecodeError:
-                continue
+
+def extract_json_from_text(text: str) -> dict[str, Any]:
+    """
+    テキストから JSON データを抽出
+    """
+    extractor = JsonStreamExtractor("shops")
+    extractor.feed(text)
+
+    # 最後の JSON を使用（最終結果のはず）
+    data = extractor.last()
+    if data is not None:
+        return data
+
+    for error in extractor.errors:
+        print(f"⚠️ JSON パースエラー: {error}")
 
     # データが見つからない場合は空のテンプレートを返す
     return {
-        "collected_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "collected_at": datetime.now().strftime(TIMESTAMP_FORMAT),
         "total_count": 0,
         "shops": [],
         "error": "JSON データの抽出に失敗しました"
     }
 
 
-def save_data(data: dict[str, Any], filename: str = "ramen_shops.json") -> Path:
+def open_log(filename: str = "ramen_shops.json") -> RecordLog:
+    """
+    JSON ファイルをスナップショットとする記録ログ
+    """
+    # 再確認で最終確認日時だけが変わった店舗は、レコード全体を書き直さない
+    return RecordLog(LOG_FILE, OUTPUT_DIR / filename, "shops", _shop_key, volatile=("last_verified_at",))
+
+
+def load_data(filename: str = "ramen_shops.json") -> dict[str, Any] | None:
+    """
+    保存済みの JSON ファイルを読み込む（記録ログがあれば適用する、どちらもない場合は None）
     """
-    データを JSON ファイルに保存
+    filepath = OUTPUT_DIR / filename
+    if LOG_FILE.exists():
+        return open_log(filename).load()
+    if not filepath.exists():
+        return None
+
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_data(data: dict[str, Any], filename: str = "ramen_shops.json", pretty: bool = True) -> Path:
+    """
+    データを JSON ファイルにアトミックに保存（pretty が False なら空白を省く）
+
+    レコードを 1 件ずつ一時ファイルに書き込んでから置き換え、
+    件数・バイト数・ハッシュのマニフェストも書き出す
     """
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     filepath = OUTPUT_DIR / filename
 
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    manifest = save_json(filepath, data, "shops", pretty=pretty, manifest_file=manifest_path(Path(__file__).parent, filename))
 
-    print(f"💾 データを保存しました: {filepath}")
+    print(f"💾 データを保存しました: {filepath}（{manifest['bytes'] / 1024:.0f}KB）")
     return filepath
 
 
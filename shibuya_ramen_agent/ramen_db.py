@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+ラーメン店データの SQLite データベース
+
+ramen_shops.json と同じ内容を ramen_shops.db に保存し、エリア・ジャンル・評価の
+インデックスと全文検索（FTS5 trigram）で店舗を検索する。
+
+使い方:
+    python ramen_db.py import                      # ramen_shops.json を取り込む
+    python ramen_db.py search 醤油 --area 渋谷 --min-rating 4
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+# 共通モジュールのパスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agent_common.record_db import RecordDatabase, RecordSchema
+
+DB_FILE = Path(__file__).parent / "ramen_shops.db"
+JSON_FILE = Path(__file__).parent.parent / "docs" / "shibuya_ramen_agent" / "ramen_shops.json"
+
+SHOP_SCHEMA = RecordSchema(
+    table="shops",
+    columns={
+        "name": "TEXT",
+        "address": "TEXT",
+        "area": "TEXT",
+        "genre": "TEXT",
+        "rating": "REAL",
+        "price_range": "TEXT",
+        "hours": "TEXT",
+        "closed_days": "TEXT",
+        "url": "TEXT",
+        "description": "TEXT",
+        "last_verified_at": "TEXT",
+    },
+    list_fields=("specialties",),
+    # エリア（とジャンル・評価）での絞り込みは複合インデックスだけで件数を数えられる
+    indexes=(("area", "genre", "rating"), "genre", "rating"),
+    # Web ページの検索（SEARCH_FIELDS）と同じフィールド
+    text_fields=("name", "address", "area", "genre", "description", "specialties"),
+    order=(
+        "name", "address", "area", "genre", "rating", "price_range", "specialties",
+        "hours", "closed_days", "url", "description", "last_verified_at",
+    ),
+)
+
+# search_shops の並べ替え（列名, 降順）
+SORT_KEYS = {
+    "rating": ("rating", True),
+    "name": ("name", False),
+    "area": ("area", False),
+}
+
+
+def open_db(path: str | Path = DB_FILE) -> RecordDatabase:
+    return RecordDatabase(path, SHOP_SCHEMA)
+
+
+def save_db(data: dict[str, Any], path: str | Path = DB_FILE) -> Path:
+    """
+    データをデータベースに保存（既存の内容は置き換える）
+    """
+    with open_db(path) as db:
+        count = db.replace_all(data)
+    print(f"🗄️  データベースに保存しました: {path}（{count} 店舗）")
+    return Path(path)
+
+
+def load_db(path: str | Path = DB_FILE) -> dict[str, Any] | None:
+    """
+    データベースを ramen_shops.json と同じ形式で読み込む（存在しない場合は None）
+    """
+    if not Path(path).exists():
+        return None
+    with open_db(path) as db:
+        return db.load()
+
+
+def search_shops(
+    db: RecordDatabase,
+    query: str = "",
+    area: str | None = None,
+    genre: str | None = None,
+    min_rating: float | None = None,
+    sort: str = "rating",
+    limit: int | None = 20,
+    offset: int = 0,
+) -> tuple[int, list[dict[str, Any]]]:
+    """
+    条件に合う店舗の件数と、sort 順の limit 件を返す
+    """
+    filters = {}
+    if area:
+        filters["area"] = area
+    if genre:
+        filters["genre"] = genre
+    ranges = {"rating": (min_rating, None)} if min_rating is not None else None
+    order_by, descending = SORT_KEYS[sort]
+    return db.search(query, filters, ranges, order_by=order_by, descending=descending, limit=limit, offset=offset)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ラーメン店データの SQLite データベース")
+    parser.add_argument('--db', default=str(DB_FILE), metavar='PATH', help=f'データベースファイル（デフォルト: {DB_FILE.name}）')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help='JSON データをデータベースに取り込む')
+    import_parser.add_argument('json_file', nargs='?', default=str(JSON_FILE), help=f'取り込む JSON（デフォルト: {JSON_FILE.name}）')
+
+    search_parser = subparsers.add_parser('search', help='店舗を検索する')
+    search_parser.add_argument('query', nargs='?', default='', help='検索語（空白区切りですべてを含む店舗）')
+    search_parser.add_argument('--area', help='エリア')
+    search_parser.add_argument('--genre', help='ジャンル')
+    search_parser.add_argument('--min-rating', type=float, help='評価の下限')
+    search_parser.add_argument('--sort', choices=list(SORT_KEYS), default='rating', help='並べ替え（デフォルト: rating）')
+    search_parser.add_argument('--limit', type=int, default=20, help='表示する件数（デフォルト: 20）')
+
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        with open(args.json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        save_db(data, args.db)
+        return 0
+
+    if not Path(args.db).exists():
+        print(f"❌ データベースが見つかりません: {args.db}")
+        print("   先に python ramen_db.py import を実行してください。")
+        return 1
+
+    with open_db(args.db) as db:
+        started = time.perf_counter()
+        total, shops = search_shops(
+            db, args.query, area=args.area, genre=args.genre,
+            min_rating=args.min_rating, sort=args.sort, limit=args.limit,
+        )
+        elapsed = time.perf_counter() - started
+
+    print(f"🔍 {total} 店舗が見つかりました（{elapsed * 1000:.2f}ms）")
+    for shop in shops:
+        rating = f"⭐ {shop['rating']}" if shop.get('rating') is not None else "⭐ -"
+        print(f"   🍜 {shop.get('name', '')}（{shop.get('area', '不明')} / {shop.get('genre', '不明')}）{rating}")
+        if shop.get('address'):
+            print(f"      📍 {shop['address']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+"""
+テスト共通の設定（共通モジュールとエージェントのディレクトリをパスに追加）
+"""
+
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(ROOT_DIR / "shibuya_ramen_agent"))
+sys.path.insert(0, str(ROOT_DIR / "ai_news_agent"))
@@ -0,0 +1,116 @@
+"""
+SessionBudget と AgentRuntime の予算付き実行のテスト
+"""
+
+import asyncio
+import pytest
+from claude_agent_sdk import AssistantMessage, ClaudeAgentOptions, ResultMessage, TextBlock
+
+from agent_common.budget import BudgetExhausted, SessionBudget
+from agent_common.runtime import AgentRuntime
+
+
+def result(num_turns: int, cost: float) -> ResultMessage:
+    return ResultMessage(
+        subtype="success", duration_ms=10, duration_api_ms=5, is_error=False,
+        num_turns=num_turns, session_id="session", total_cost_usd=cost,
+    )
+
+
+def test_concurrency_is_shared():
+    budget = SessionBudget(max_concurrency=2)
+    stats = {"running": 0, "max_running": 0}
+
+    async def session(i):
+        async with budget.session(f"s{i}", None):
+            stats["running"] += 1
+            stats["max_running"] = max(stats["max_running"], stats["running"])
+            await asyncio.sleep(0.01)
+            stats["running"] -= 1
+
+    async def main():
+        await asyncio.gather(*(session(i) for i in range(5)))
+
+    asyncio.run(main())
+
+    assert stats["max_running"] == 2
+    assert budget.sessions == 5
+
+
+def test_turns_are_reserved_and_returned():
+    budget = SessionBudget(max_turns=10)
+    granted = []
+
+    async def session(label, used):
+        async with budget.session(label, 6) as usage:
+            granted.append((label, usage["max_turns"]))
+            await asyncio.sleep(0.01)
+            usage["turns"] = used
+
+    async def main():
+        # 2 つ目のセッションは 1 つ目が確保した 6 ターンのうち未使用分の返却を待たず、残りの 4 ターンで始まる
+        await asyncio.gather(session("a", 2), session("b", 4))
+        await session("c", 3)
+
+    asyncio.run(main())
+
+    assert granted == [("a", 6), ("b", 4), ("c", 4)]
+    assert budget.turns_used == 9
+    assert budget.remaining_turns == 1
+
+
+def test_exhausted_budget_refuses_new_sessions():
+    async def main(budget):
+        async with budget.session("a", 5) as usage:
+            usage["turns"] = 5
+            usage["cost_usd"] = 1.0
+        async with budget.session("b", 5):
+            pass
+
+    with pytest.raises(BudgetExhausted):
+        asyncio.run(main(SessionBudget(max_turns=5)))
+    with pytest.raises(BudgetExhausted):
+        asyncio.run(main(SessionBudget(max_cost_usd=1.0)))
+
+
+def test_runtime_caps_options_and_records_usage():
+    budget = SessionBudget(max_turns=8, max_cost_usd=2.0)
+    runtime = AgentRuntime(budget=budget)
+    seen = []
+
+    async def start(options):
+        seen.append((options.max_turns, options.max_budget_usd))
+        yield AssistantMessage(content=[TextBlock(text="検索します")], model="claude-test")
+        yield result(num_turns=3, cost=0.5)
+
+    async def main():
+        options = ClaudeAgentOptions(max_turns=20)
+        return [message async for message in runtime.stream("渋谷", options, start)]
+
+    messages = asyncio.run(main())
+
+    assert len(messages) == 2
+    assert seen == [(8, 2.0)]
+    assert (runtime.turns, runtime.cost_usd) == (3, 0.5)
+    assert (budget.turns_used, budget.cost_usd) == (3, 0.5)
+
+
+def test_runtime_counts_turns_of_closed_session():
+    runtime = AgentRuntime(budget=SessionBudget())
+
+    async def start(options):
+        while True:
+            yield AssistantMessage(content=[TextBlock(text="...")], model="claude-test")
+
+    async def main():
+        messages = runtime.stream("渋谷", ClaudeAgentOptions(), start)
+        count = 0
+        async for _ in messages:
+            count += 1
+            if count == 3:
+                break
+        await messages.aclose()
+
+    asyncio.run(main())
+
+    assert runtime.turns == 3
@@ -0,0 +1,81 @@
+"""
+build_cache / atomic_write のテスト（入力のハッシュと出力ファイルの記録による生成の省略）
+"""
+
+import os
+
+from agent_common.atomic_write import write_atomic
+from agent_common.build_cache import BuildCache, changed_files, fingerprint, snapshot
+
+
+def make_inputs(tmp_path):
+    data = tmp_path / "data.json"
+    source = tmp_path / "generate_web.py"
+    data.write_text('{"shops": []}', encoding="utf-8")
+    source.write_text("print('生成')", encoding="utf-8")
+    return [data, source]
+
+
+def test_fingerprint_tracks_contents_and_options(tmp_path):
+    inputs = make_inputs(tmp_path)
+    key = fingerprint(inputs, {"external_data": False})
+
+    assert fingerprint(inputs, {"external_data": False}) == key
+    assert fingerprint(inputs, {"external_data": True}) != key
+
+    os.utime(inputs[0], ns=(0, 0))
+    assert fingerprint(inputs, {"external_data": False}) == key
+    inputs[0].write_text('{"shops": [1]}', encoding="utf-8")
+    assert fingerprint(inputs, {"external_data": False}) != key
+
+
+def test_changed_files(tmp_path):
+    (tmp_path / "a.html").write_text("a", encoding="utf-8")
+    (tmp_path / "b.json").write_text("b", encoding="utf-8")
+    before = snapshot(tmp_path)
+
+    (tmp_path / "a.html").write_text("aa", encoding="utf-8")
+    (tmp_path / "b.json").unlink()
+    (tmp_path / "c.json").write_text("c", encoding="utf-8")
+
+    assert changed_files(before, snapshot(tmp_path)) == (["a.html", "c.json"], ["b.json"])
+    assert snapshot(tmp_path / "missing") == {}
+
+
+def test_build_cache_is_fresh_until_outputs_change(tmp_path):
+    output_dir = tmp_path / "docs"
+    output_dir.mkdir()
+    index = output_dir / "index.html"
+    write_atomic(index, "<html></html>")
+    cache_file = tmp_path / ".build_cache.json"
+
+    BuildCache(cache_file).update(output_dir, "key-1")
+    cache = BuildCache(cache_file)
+
+    assert cache.is_fresh(output_dir, "key-1")
+    assert not cache.is_fresh(output_dir, "key-2")
+
+    index.write_text("<html>手で編集</html>", encoding="utf-8")
+    assert not cache.is_fresh(output_dir, "key-1")
+
+    index.unlink()
+    assert not cache.is_fresh(output_dir, "key-1")
+
+
+def test_broken_cache_file_is_ignored(tmp_path):
+    cache_file = tmp_path / ".build_cache.json"
+    cache_file.write_text("{壊れた", encoding="utf-8")
+
+    assert not BuildCache(cache_file).is_fresh(tmp_path, "key")
+
+
+def test_write_atomic_skips_unchanged_content(tmp_path):
+    path = tmp_path / "index.html"
+
+    assert write_atomic(path, "<html></html>")
+    os.utime(path, ns=(0, 0))
+    assert not write_atomic(path, "<html></html>")
+    assert path.stat().st_mtime_ns == 0
+    assert write_atomic(path, b"<html>new</html>")
+    assert path.read_text(encoding="utf-8") == "<html>new</html>"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["index.html"]
@@ -0,0 +1,89 @@
+"""
+build_sites のテスト（generate_web.py の検出、サイトごとの生成とポータルページ）
+"""
+
+import json
+import textwrap
+
+import build_sites
+
+GENERATOR_SOURCE = '''
+import json
+from pathlib import Path
+
+OUTPUT_DIR = Path(__file__).parent / "out"
+DATA_FILE = Path(__file__).parent / "data.json"
+LOG_FILE = Path(__file__).parent / "data.log.jsonl"
+MANIFEST_FILE = Path(__file__).parent / "data.manifest.json"
+COLLECTOR_FILE = Path(__file__).parent / "collector.py"
+GENERATOR_SOURCES = [Path(__file__)]
+SITE_META = {
+    "title": "テスト <サイト>",
+    "description": "説明",
+    "tags": ["検索機能"],
+    "records_key": "items",
+    "unit": "件",
+}
+
+
+def write_site(data, external_data=False, shards=1, precompress=False, api_url=None):
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    (OUTPUT_DIR / "index.html").write_text(json.dumps(data), encoding="utf-8")
+    with open(OUTPUT_DIR / "builds.txt", "a", encoding="utf-8") as f:
+        f.write("built\\n")
+    return OUTPUT_DIR / "index.html"
+'''
+
+OPTIONS = {"external_data": False, "data_shards": 1, "precompress": False, "api_url": None}
+
+
+def make_agent(root, name: str, items: list | None = None):
+    agent_dir = root / name
+    agent_dir.mkdir()
+    (agent_dir / "generate_web.py").write_text(textwrap.dedent(GENERATOR_SOURCE), encoding="utf-8")
+    if items is not None:
+        (agent_dir / "data.json").write_text(
+            json.dumps({"collected_at": "2026-04-01 09:00:00", "items": items}), encoding="utf-8",
+        )
+    return agent_dir
+
+
+def test_find_generators_requires_site_meta(tmp_path):
+    make_agent(tmp_path, "b_agent")
+    make_agent(tmp_path, "a_agent")
+    (tmp_path / "other").mkdir()
+    (tmp_path / "other" / "generate_web.py").write_text("print('対象外')", encoding="utf-8")
+
+    assert [path.parent.name for path in build_sites.find_generators(tmp_path)] == ["a_agent", "b_agent"]
+
+
+def test_build_site_uses_build_cache(tmp_path):
+    agent_dir = make_agent(tmp_path, "agent", items=[1, 2, 3])
+    path = str(agent_dir / "generate_web.py")
+
+    first = build_sites.build_site(path, OPTIONS)
+    second = build_sites.build_site(path, OPTIONS)
+    forced = build_sites.build_site(path, OPTIONS, force=True)
+
+    assert (first["name"], first["count"], first["collected_at"]) == ("agent", 3, "2026-04-01 09:00:00")
+    assert [first["skipped"], second["skipped"], forced["skipped"]] == [False, True, False]
+    assert (agent_dir / "out" / "builds.txt").read_text(encoding="utf-8").count("built") == 2
+
+
+def test_build_site_without_data(tmp_path):
+    agent_dir = make_agent(tmp_path, "agent")
+
+    assert "error" in build_sites.build_site(str(agent_dir / "generate_web.py"), OPTIONS)
+
+
+def test_portal_lists_sites_with_escaped_meta():
+    site = {
+        "name": "agent", "title": "テスト <サイト>", "description": "説明", "tags": ["検索機能"],
+        "unit": "件", "count": 3, "collected_at": "2026-04-01 09:00:00",
+    }
+
+    html = build_sites.generate_portal([site])
+
+    assert 'href="./agent/"' in html
+    assert "テスト &lt;サイト&gt;" in html
+    assert "3件" in html and "2026-04-01 更新" in html
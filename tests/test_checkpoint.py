@@ -0,0 +1,61 @@
+"""
+Checkpoint のテスト（中断した収集の再開）
+"""
+
+from agent_common.checkpoint import Checkpoint
+
+
+def test_resume_returns_records_and_done_units(tmp_path):
+    path = tmp_path / ".checkpoint.jsonl"
+    checkpoint = Checkpoint(path)
+    assert checkpoint.open() == ([], [])
+    checkpoint.record({"name": "店A"})
+    checkpoint.done("渋谷")
+    checkpoint.record({"name": "店B"})
+    checkpoint.close()
+
+    resumed = Checkpoint(path, resume=True)
+    assert resumed.open() == ([{"name": "店A"}, {"name": "店B"}], ["渋谷"])
+    resumed.record({"name": "店C"})
+    resumed.done("恵比寿")
+    resumed.close()
+
+    assert Checkpoint(path).load() == ([{"name": "店A"}, {"name": "店B"}, {"name": "店C"}], ["渋谷", "恵比寿"])
+
+
+def test_without_resume_starts_over(tmp_path):
+    path = tmp_path / ".checkpoint.jsonl"
+    checkpoint = Checkpoint(path)
+    checkpoint.open()
+    checkpoint.record({"name": "店A"})
+    checkpoint.close()
+
+    fresh = Checkpoint(path)
+    assert fresh.open() == ([], [])
+    fresh.close()
+    assert fresh.load() == ([], [])
+
+
+def test_torn_last_line_is_ignored_and_not_continued(tmp_path):
+    path = tmp_path / ".checkpoint.jsonl"
+    checkpoint = Checkpoint(path)
+    checkpoint.open()
+    checkpoint.record({"name": "店A"})
+    checkpoint.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"type": "record", "record": {"name": "店')
+
+    resumed = Checkpoint(path, resume=True)
+    assert resumed.open() == ([{"name": "店A"}], [])
+    resumed.record({"name": "店B"})
+    resumed.close()
+
+    assert Checkpoint(path).load() == ([{"name": "店A"}, {"name": "店B"}], [])
+
+
+def test_discard_removes_file(tmp_path):
+    path = tmp_path / ".checkpoint.jsonl"
+    checkpoint = Checkpoint(path)
+    checkpoint.open()
+    checkpoint.discard()
+    assert not path.exists()
@@ -0,0 +1,61 @@
+"""
+columnar のテスト（列指向エンコードとデコードの往復）
+
+ブラウザ側の COLUMNAR_JS は Node.js で実行する（Node.js がなければスキップ）
+"""
+
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from agent_common.columnar import COLUMNAR_JS, decode_columnar, encode_columnar, encode_records
+
+RECORDS = [
+    {"name": "麺屋武蔵", "area": "渋谷", "rating": 4.2, "specialties": ["つけ麺"]},
+    {"name": "一蘭", "area": "渋谷", "open": True},
+    {"name": "AFURI", "area": "恵比寿", "rating": None, "open": 1},
+    {"name": "九州じゃんがら"},
+]
+
+
+def test_dictionary_encoding():
+    payload = encode_columnar(RECORDS, dictionary_fields=["area", "open", "specialties", "missing"])
+
+    assert payload["length"] == 4
+    assert payload["columns"]["area"] == [0, 0, 1, None]
+    assert payload["dictionaries"]["area"] == ["渋谷", "恵比寿"]
+    # True と 1 は別の値として扱う
+    assert payload["dictionaries"]["open"] == [True, 1]
+    # 値がスカラーでないフィールドは辞書エンコードしない
+    assert "specialties" not in payload["dictionaries"]
+    assert "missing" not in payload["columns"]
+
+
+def test_round_trip_drops_only_null_fields():
+    decoded = decode_columnar(encode_columnar(RECORDS, dictionary_fields=["area", "open"]))
+
+    assert decoded == [{key: value for key, value in record.items() if value is not None} for record in RECORDS]
+    assert decode_columnar(encode_columnar([])) == []
+
+
+def test_encode_records_row_format():
+    assert encode_records(RECORDS, columnar=False) is RECORDS
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="Node.js がありません")
+def test_browser_decode_matches_python():
+    payload = encode_columnar(RECORDS, dictionary_fields=["area", "open"])
+    script = COLUMNAR_JS + f'''
+        const records = decodeRecords({json.dumps(payload, ensure_ascii=False)});
+        const rows = records.map(record => Object.fromEntries(
+            Object.keys(Object.getPrototypeOf(record)).filter(field => record[field] !== undefined).map(field => [field, record[field]])
+        ));
+        console.log(JSON.stringify([rows, decodeRecords([{{"name": "a"}}])]));
+    '''
+    output = subprocess.run(["node", "-e", script], capture_output=True, text=True, check=True).stdout
+    rows, passthrough = json.loads(output)
+
+    assert rows == decode_columnar(payload)
+    assert passthrough == [{"name": "a"}]
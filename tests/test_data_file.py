@@ -0,0 +1,91 @@
+"""
+data_file と atomic_write のテスト（アトミックな保存とマニフェスト）
+"""
+
+import hashlib
+import json
+import os
+
+import pytest
+
+from agent_common.atomic_write import atomic_writer, write_atomic
+from agent_common.data_file import content_hash, manifest_path, read_manifest, save_json
+
+DATA = {
+    "collected_at": "2026-01-20 12:00:00",
+    "total_count": 2,
+    "shops": [
+        {"name": "麺屋 \"一\"", "specialties": ["味玉", "替え玉"], "hours": {"月": "11:00-\n22:00"}},
+        {"name": "店B", "specialties": [], "rating": None},
+    ],
+    "areas": ["渋谷", "恵比寿"],
+}
+
+
+@pytest.mark.parametrize("data", [DATA, {**DATA, "shops": []}, {}])
+def test_pretty_output_matches_json_dump(tmp_path, data):
+    path = tmp_path / "ramen_shops.json"
+    save_json(path, data, "shops")
+    assert path.read_text(encoding="utf-8") == json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def test_compact_output_round_trips(tmp_path):
+    path = tmp_path / "ramen_shops.json"
+    save_json(path, DATA, "shops", pretty=False)
+    text = path.read_text(encoding="utf-8")
+    assert "\n" not in text
+    assert json.loads(text) == DATA
+
+
+def test_manifest(tmp_path):
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "agent").mkdir()
+    path = tmp_path / "docs" / "ramen_shops.json"
+    manifest_file = manifest_path(tmp_path / "agent", path)
+    manifest = save_json(path, DATA, "shops", manifest_file=manifest_file)
+
+    # マニフェストは公開するデータのディレクトリではなく、エージェントのディレクトリに置く
+    assert manifest_file == tmp_path / "agent" / "ramen_shops.manifest.json"
+    assert sorted(os.listdir(tmp_path / "docs")) == ["ramen_shops.json"]
+    assert read_manifest(path, manifest_file) == manifest
+    assert manifest["count"] == 2
+    assert manifest["bytes"] == path.stat().st_size
+    assert manifest["sha256"] == hashlib.sha256(path.read_bytes()).hexdigest()
+    assert manifest["meta"] == {"collected_at": "2026-01-20 12:00:00", "total_count": 2, "areas": ["渋谷", "恵比寿"]}
+    assert content_hash(path, manifest_file) == manifest["sha256"]
+    # 別のファイルのマニフェストは使わない
+    assert read_manifest(path.with_name("ai_news.json"), manifest_file) is None
+
+
+def test_manifest_is_stale_after_external_write(tmp_path):
+    path = tmp_path / "ramen_shops.json"
+    manifest_file = manifest_path(tmp_path, path)
+    save_json(path, DATA, "shops", manifest_file=manifest_file)
+    path.write_text(json.dumps({"shops": []}), encoding="utf-8")
+
+    assert read_manifest(path, manifest_file) is None
+    assert content_hash(path, manifest_file) == hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_interrupted_write_keeps_original(tmp_path):
+    path = tmp_path / "ramen_shops.json"
+    save_json(path, DATA, "shops")
+    original = path.read_bytes()
+
+    with pytest.raises(RuntimeError):
+        with atomic_writer(path) as f:
+            f.write(b'{"shops": [')
+            raise RuntimeError("中断")
+
+    assert path.read_bytes() == original
+    assert sorted(os.listdir(tmp_path)) == ["ramen_shops.json"]
+
+
+def test_write_atomic_skips_unchanged(tmp_path):
+    path = tmp_path / "index.html"
+    assert write_atomic(path, "<html></html>")
+    mtime = path.stat().st_mtime_ns
+    assert not write_atomic(path, "<html></html>")
+    assert path.stat().st_mtime_ns == mtime
+    assert write_atomic(path, "<html>更新</html>")
+    assert path.read_text(encoding="utf-8") == "<html>更新</html>"
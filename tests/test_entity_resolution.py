@@ -0,0 +1,121 @@
+"""
+entity_resolution のテスト（住所の分解・重複の検出・統合）
+"""
+
+from agent_common.entity_resolution import (
+    Address,
+    find_duplicates,
+    merge_records,
+    normalize_text,
+    parse_address,
+    resolve_records,
+    similar_names,
+)
+
+
+def test_parse_address_notations():
+    expected = Address("道玄坂", (1, 14, 9))
+    assert parse_address("東京都渋谷区道玄坂1-14-9") == expected
+    assert parse_address("〒150-0043 東京都渋谷区道玄坂一丁目14番9号") == expected
+    assert parse_address("渋谷区道玄坂１－１４－９") == expected
+    assert parse_address("道玄坂1丁目14-9") == expected
+
+
+def test_parse_address_keeps_building_out_of_numbers():
+    address = parse_address("東京都渋谷区道玄坂1-14-9号 ソシアル道玄坂 2F")
+    assert address.numbers == (1, 14, 9)
+    assert address.rest == "ソシアル道玄坂 2F"
+    assert address.block == "道玄坂1-14"
+
+
+def test_parse_address_without_numbers():
+    assert parse_address("東京都渋谷区") is None
+    assert parse_address(None) is None
+    assert parse_address("渋谷区神南1").block is None
+
+
+def test_similar_names():
+    # 名前は正規化してから比較する（ひらがなはカタカナに、空白は除く）
+    assert normalize_text("らーめん 山田") == "ラーメン山田"
+    assert similar_names(normalize_text("らーめん山田"), normalize_text("ラーメン山田"))
+    assert similar_names(normalize_text("麺屋武蔵 渋谷店"), normalize_text("麺屋武蔵"))
+    assert not similar_names(normalize_text("麺屋武蔵"), normalize_text("一蘭"))
+
+
+def shop(name: str, address: str | None, source: str = "a", **fields) -> dict:
+    return {"name": name, "address": address, "source": source, **fields}
+
+
+def groups(shops: list[dict]) -> list[list[int]]:
+    return find_duplicates(shops, name=lambda s: s["name"], address=lambda s: s["address"])
+
+
+def test_find_duplicates_across_notations():
+    shops = [
+        shop("麺屋 武蔵", "東京都渋谷区道玄坂1-14-9"),
+        shop("一蘭 渋谷店", "東京都渋谷区神南1-22-7"),
+        shop("麺屋武蔵", "渋谷区道玄坂一丁目14番9号 2F"),
+        shop("麺屋武蔵", "渋谷区道玄坂1-14"),
+    ]
+    assert groups(shops) == [[0, 2, 3], [1]]
+
+
+def test_different_names_at_same_address_stay_apart():
+    shops = [shop("麺屋武蔵", "渋谷区道玄坂1-14-9"), shop("一蘭", "渋谷区道玄坂1-14-9")]
+    assert groups(shops) == [[0], [1]]
+
+
+def test_same_name_at_different_address_stays_apart():
+    shops = [shop("一蘭", "渋谷区道玄坂1-14-9"), shop("一蘭", "渋谷区神南1-22-7")]
+    assert groups(shops) == [[0], [1]]
+
+
+def test_record_without_address_joins_unique_name_match():
+    shops = [shop("麺屋武蔵", "渋谷区道玄坂1-14-9"), shop("麺屋武蔵", None), shop("一蘭", None)]
+    assert groups(shops) == [[0, 1], [2]]
+
+
+def test_ambiguous_name_without_address_is_not_merged():
+    shops = [shop("一蘭", "渋谷区道玄坂1-14-9"), shop("一蘭", "渋谷区神南1-22-7"), shop("一蘭", None)]
+    assert groups(shops) == [[0], [1], [2]]
+
+
+def test_merge_records_prefers_recent_values_and_records_provenance():
+    old = shop("麺屋武蔵", "渋谷区道玄坂1-14-9", source="tabelog", rating=3.5, phone="03-0000-0000",
+               specialties=["つけ麺"], updated="2026-01-01")
+    new = shop("麺屋 武蔵", "渋谷区道玄坂1-14-9", source="google", rating=3.8, phone="",
+               specialties=["味玉つけ麺", "つけ麺"], updated="2026-02-01")
+
+    merged = merge_records([old, new], source=lambda s: s["source"], recency=lambda s: s["updated"],
+                           list_fields=("specialties",))
+
+    assert merged["rating"] == 3.8
+    assert merged["phone"] == "03-0000-0000"
+    assert merged["specialties"] == ["味玉つけ麺", "つけ麺"]
+    assert merged["sources"] == ["google", "tabelog"]
+    assert merged["provenance"]["rating"] == "google"
+    assert merged["provenance"]["phone"] == "tabelog"
+
+    # 統合済みのレコードを再び統合しても、以前の情報源を引き継ぐ
+    third = shop("麺屋武蔵", None, source="blog", updated="2025-12-01", hours="11:00-22:00")
+    remerged = merge_records([merged, third], source=lambda s: s["source"], recency=lambda s: s["updated"])
+    assert remerged["sources"] == ["google", "tabelog", "blog"]
+    assert remerged["provenance"]["phone"] == "tabelog"
+    assert remerged["provenance"]["hours"] == "blog"
+
+
+def test_resolve_records_keeps_unique_records_untouched():
+    shops = [
+        shop("麺屋武蔵", "渋谷区道玄坂1-14-9", source="a", updated="1"),
+        shop("一蘭", "渋谷区神南1-22-7", source="a", updated="1"),
+        shop("麺屋武蔵", "渋谷区道玄坂1-14-9", source="b", updated="2"),
+    ]
+    resolved, stats = resolve_records(
+        shops, name=lambda s: s["name"], address=lambda s: s["address"],
+        source=lambda s: s["source"], recency=lambda s: s["updated"],
+    )
+
+    assert len(resolved) == 2
+    assert resolved[0]["sources"] == ["b", "a"]
+    assert resolved[1] is shops[1]
+    assert (stats.records, stats.resolved) == (3, 2)
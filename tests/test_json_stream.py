@@ -0,0 +1,53 @@
+"""
+JsonStreamExtractor のテスト
+"""
+
+import json
+
+from agent_common.json_stream import JsonStreamExtractor
+
+PAYLOAD = {"shops": [{"name": "麺屋 {仮}", "specialties": ["味玉", "替え玉"]}]}
+PAYLOAD_JSON = json.dumps(PAYLOAD, ensure_ascii=False)
+
+
+def extract(chunks: list[str], required_key: str | None = "shops") -> list[dict]:
+    extractor = JsonStreamExtractor(required_key)
+    found = []
+    for chunk in chunks:
+        found.extend(extractor.feed(chunk))
+    return found
+
+
+def test_unfenced_json_in_prose():
+    assert extract([f"収集結果です。\n{PAYLOAD_JSON}\n以上です。\n"]) == [PAYLOAD]
+
+
+def test_fenced_json():
+    assert extract([f"```json\n{PAYLOAD_JSON}\n```\n"]) == [PAYLOAD]
+
+
+def test_json_split_across_chunks():
+    for split in range(1, len(PAYLOAD_JSON)):
+        chunks = ["途中経過 ", PAYLOAD_JSON[:split], PAYLOAD_JSON[split:] + "\n"]
+        assert extract(chunks) == [PAYLOAD], split
+
+
+def test_stray_brace_before_json():
+    """
+    文章中の対応しない { の後ろに出力された JSON を取りこぼさない
+    """
+    assert extract([f"テンプレートは {{name の形式です。\n{PAYLOAD_JSON}\n"]) == [PAYLOAD]
+
+
+def test_stray_brace_at_end_of_chunk():
+    assert extract(["補足 {\n", PAYLOAD_JSON + "\n", "続き\n"]) == [PAYLOAD]
+    assert extract(["補足 {", "  ", f"説明 {PAYLOAD_JSON}\n"]) == [PAYLOAD]
+
+
+def test_stray_brace_closed_later():
+    assert extract([f"a {{ b {PAYLOAD_JSON} c }} d\n"]) == [PAYLOAD]
+
+
+def test_required_key_filters_payloads():
+    assert extract(['{"other": 1}\n', PAYLOAD_JSON + "\n"]) == [PAYLOAD]
+    assert extract(['{"other": 1}\n'], required_key=None) == [{"other": 1}]
@@ -0,0 +1,94 @@
+"""
+news_collector のテスト（query() はカテゴリごとに決まった出力を返す偽の関数に置き換える）
+"""
+
+import asyncio
+import json
+
+from claude_agent_sdk import AssistantMessage, TextBlock
+
+import news_collector
+
+
+def article_text(*articles: dict) -> str:
+    return "```json\n" + json.dumps({"articles": list(articles)}, ensure_ascii=False) + "\n```"
+
+
+def fake_query(monkeypatch, outputs: dict[str, list[str]], delay: dict[str, float] | None = None) -> dict:
+    """
+    query() を、プロンプト中のカテゴリに対応するテキストを 1 ブロックずつ出力する偽の関数に置き換え、
+    同時実行数を記録する（delay のカテゴリは出力し終えた後に待ち続ける）
+    """
+    stats = {"running": 0, "max_running": 0, "started": []}
+
+    async def query(prompt, options):
+        categories = next(categories for categories in outputs if f"「{categories}」" in prompt)
+        stats["running"] += 1
+        stats["max_running"] = max(stats["max_running"], stats["running"])
+        stats["started"].append(categories)
+        try:
+            for text in outputs[categories]:
+                await asyncio.sleep(0.01)
+                yield AssistantMessage(content=[TextBlock(text=text)], model="claude-test")
+            await asyncio.sleep((delay or {}).get(categories, 0))
+        finally:
+            stats["running"] -= 1
+
+    monkeypatch.setattr(news_collector, "query", query)
+    return stats
+
+
+def outputs_for(*groups: str) -> dict[str, list[str]]:
+    return {
+        group: [article_text(
+            {"title": f"{group} の記事", "url": f"https://example.com/{group}"},
+            {"title": "共通の記事", "url": "https://example.com/shared/"},
+        )]
+        for group in groups
+    }
+
+
+def test_parallel_collection_is_bounded_and_merges_by_url(monkeypatch):
+    stats = fake_query(monkeypatch, outputs_for("LLM", "Robotics, Research", "Industry"))
+
+    data = asyncio.run(news_collector.collect_news_data(
+        parallel=True, categories=["LLM", ["Robotics", "Research"], "Industry"], max_concurrency=2,
+    ))
+
+    assert stats["max_running"] == 2
+    assert sorted(stats["started"]) == ["Industry", "LLM", "Robotics, Research"]
+    # 末尾の / だけが違う URL は同じ記事とみなす
+    assert len(data["articles"]) == 4
+    assert data["total_count"] == 4
+
+
+def test_timed_out_session_keeps_partial_output(monkeypatch):
+    fake_query(monkeypatch, outputs_for("LLM", "Research"), delay={"LLM": 10})
+
+    data = asyncio.run(news_collector.collect_news_data(
+        parallel=True, categories=["LLM", "Research"], category_timeout=0.5,
+    ))
+
+    assert sorted(article["title"] for article in data["articles"]) == ["LLM の記事", "Research の記事", "共通の記事"]
+
+
+def test_record_tool_registers_articles(monkeypatch):
+    results = []
+    monkeypatch.setattr(news_collector, "create_sdk_mcp_server", lambda name, version, tools: tools)
+
+    async def query(prompt, options):
+        (record_article,) = options.mcp_servers[news_collector.RECORD_SERVER_NAME]
+        for args in [
+            {"title": "新しいモデル", "url": "https://example.com/model"},
+            {"title": " ", "url": "https://example.com/blank"},
+            {"title": "新しいモデル", "url": "https://example.com/model/", "summary": "概要"},
+        ]:
+            results.append(await record_article.handler(args))
+            yield AssistantMessage(content=[TextBlock(text="登録しました")], model="claude-test")
+
+    monkeypatch.setattr(news_collector, "query", query)
+
+    data = asyncio.run(news_collector.collect_news_data())
+
+    assert data["articles"] == [{"title": "新しいモデル", "url": "https://example.com/model", "summary": "概要"}]
+    assert [result.get("is_error", False) for result in results] == [False, True, False]
@@ -0,0 +1,76 @@
+"""
+orchestrator のテスト（偽のコレクターを同時に実行し、失敗をエージェントごとに分ける）
+"""
+
+import asyncio
+import textwrap
+
+import orchestrator
+
+COLLECTOR_SOURCE = '''
+import asyncio
+import json
+from pathlib import Path
+
+from agent_common.record_log import RecordLog
+
+LOG_FILE = Path(__file__).parent / "data.log.jsonl"
+calls = []
+
+
+async def collect(max_concurrency, target_count, runtime, checkpoint, fail=False, items=()):
+    await asyncio.sleep(0.01)
+    if fail:
+        raise RuntimeError("収集に失敗しました")
+    # 他のエージェントと同じ予算を共有している
+    assert runtime.budget.max_concurrency == max_concurrency
+    assert runtime.tool_cache is not None and runtime.tool_cache.path is None
+    return {"items": list(items)}
+
+
+def save_data(data):
+    path = Path(__file__).parent / "data.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+
+def open_log():
+    return RecordLog(LOG_FILE, Path(__file__).parent / "data.json", "items", str)
+'''
+
+
+def make_collector(tmp_path, name: str, **options) -> orchestrator.Collector:
+    agent_dir = tmp_path / name
+    agent_dir.mkdir()
+    path = agent_dir / "collector.py"
+    path.write_text(textwrap.dedent(COLLECTOR_SOURCE), encoding="utf-8")
+    return orchestrator.Collector(name=name, path=path, collect="collect", records_key="items", options=options)
+
+
+def test_failure_is_isolated_per_agent(tmp_path, monkeypatch):
+    collectors = [
+        make_collector(tmp_path, "ok_agent", items=[1, 2]),
+        make_collector(tmp_path, "empty_agent"),
+        make_collector(tmp_path, "broken_agent", fail=True),
+    ]
+    monkeypatch.setattr(orchestrator, "COLLECTORS", collectors)
+    (tmp_path / "ok_agent" / "data.log.jsonl").write_text("", encoding="utf-8")
+
+    assert asyncio.run(orchestrator.run_all(max_concurrency=2)) == 1
+
+    assert (tmp_path / "ok_agent" / "data.json").exists()
+    assert not (tmp_path / "empty_agent" / "data.json").exists()
+    assert not (tmp_path / "broken_agent" / "data.json").exists()
+    # 保存できたエージェントのチェックポイントと古い記録ログは削除する
+    assert not (tmp_path / "ok_agent" / orchestrator.CHECKPOINT_NAME).exists()
+    assert not (tmp_path / "ok_agent" / "data.log.jsonl").exists()
+    # ツールキャッシュは保存しない
+    assert not any(tmp_path.rglob(orchestrator.TOOL_CACHE_NAME))
+
+
+def test_selected_agents_only(tmp_path, monkeypatch):
+    collectors = [make_collector(tmp_path, "ok_agent", items=[1]), make_collector(tmp_path, "broken_agent", fail=True)]
+    monkeypatch.setattr(orchestrator, "COLLECTORS", collectors)
+
+    assert asyncio.run(orchestrator.run_all(names=["ok_agent"])) == 0
+    assert asyncio.run(orchestrator.run_all(names=["unknown_agent"])) == 1
@@ -0,0 +1,63 @@
+"""
+precompress のテスト（圧縮済みファイルの作成・再利用と不要になったファイルの削除）
+"""
+
+import gzip
+import os
+
+from agent_common.precompress import available_encodings, compress_file, compressed_path, precompress_directory, remove_orphans
+
+
+def test_gzip_round_trip_and_skip_when_fresh(tmp_path):
+    source = tmp_path / "index.html"
+    source.write_text("<html>" + "ラーメン" * 1000 + "</html>", encoding="utf-8")
+
+    result = compress_file(source, "gzip")
+    target = compressed_path(source, "gzip")
+
+    assert target.name == "index.html.gz"
+    assert gzip.decompress(target.read_bytes()) == source.read_bytes()
+    assert not result.skipped and result.ratio < 0.1
+    assert compress_file(source, "gzip").skipped
+
+    # 元ファイルの方が新しくなったら圧縮し直す
+    os.utime(target, ns=(0, 0))
+    assert not compress_file(source, "gzip").skipped
+
+
+def test_gzip_output_is_deterministic(tmp_path):
+    source = tmp_path / "data.json"
+    source.write_text('{"shops": []}', encoding="utf-8")
+    compress_file(source, "gzip")
+    first = compressed_path(source, "gzip").read_bytes()
+
+    os.utime(compressed_path(source, "gzip"), ns=(0, 0))
+    compress_file(source, "gzip")
+
+    assert compressed_path(source, "gzip").read_bytes() == first
+
+
+def test_precompress_directory_only_site_artifacts(tmp_path):
+    (tmp_path / "index.html").write_text("<html></html>", encoding="utf-8")
+    (tmp_path / "shops.json").write_text("[]", encoding="utf-8")
+    (tmp_path / "photo.png").write_bytes(b"\x89PNG")
+
+    results = precompress_directory(tmp_path)
+
+    assert sorted((result.source.name, result.encoding) for result in results) == sorted(
+        (name, encoding) for name in ["index.html", "shops.json"] for encoding in available_encodings()
+    )
+    assert not compressed_path(tmp_path / "photo.png", "gzip").exists()
+
+
+def test_remove_orphans_only_touches_generated_files(tmp_path):
+    (tmp_path / "index.html").write_text("<html></html>", encoding="utf-8")
+    for name in ["index.html.gz", "shops-0.abc.json.gz", "shops-0.abc.json.br", "backup.tar.gz", "archive.gz", "font.woff2.br"]:
+        (tmp_path / name).write_bytes(b"")
+
+    removed = remove_orphans(tmp_path)
+
+    assert sorted(path.name for path in removed) == ["shops-0.abc.json.br", "shops-0.abc.json.gz"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "archive.gz", "backup.tar.gz", "font.woff2.br", "index.html", "index.html.gz",
+    ]
@@ -0,0 +1,53 @@
+"""
+StageProfiler のテスト（段階ごとの計測と .pstats の書き出し）
+"""
+
+import pstats
+
+from agent_common.profiling import StageProfiler
+
+
+def busy(n: int) -> list[str]:
+    return [str(i) * 10 for i in range(n)]
+
+
+def test_stages_write_pstats_and_summary(tmp_path):
+    profiler = StageProfiler(tmp_path / "profile")
+
+    with profiler.stage("collect", "データ収集"):
+        busy(20000)
+    with profiler.stage("generate_web", "Web 生成"):
+        busy(1000)
+
+    assert [stage.name for stage in profiler.stages] == ["collect", "generate_web"]
+    collect = profiler.stages[0]
+    assert collect.path == tmp_path / "profile" / "collect.pstats"
+    assert any(function == "busy" for _, _, function in pstats.Stats(str(collect.path)).stats)
+    assert collect.peak_memory > 0 and collect.wall >= 0 and len(collect.top) <= 3
+
+    lines = profiler.summary()
+    assert lines[1].startswith("データ収集") and lines[2].startswith("Web 生成")
+    assert lines[3].startswith("合計")
+
+
+def test_stage_records_even_when_it_raises(tmp_path):
+    profiler = StageProfiler(tmp_path)
+
+    try:
+        with profiler.stage("collect", "データ収集"):
+            raise RuntimeError("失敗")
+    except RuntimeError:
+        pass
+
+    assert (tmp_path / "collect.pstats").exists()
+    assert len(profiler.stages) == 1
+
+
+def test_disabled_profiler_does_nothing(tmp_path):
+    profiler = StageProfiler(None)
+
+    with profiler.stage("collect", "データ収集"):
+        busy(10)
+
+    assert not profiler.enabled
+    assert profiler.stages == [] and profiler.summary() == []
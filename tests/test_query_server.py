@@ -0,0 +1,125 @@
+"""
+QueryServer のテスト（検索・並べ替え・ETag と 304・データや記録ログの更新時のインデックスの作り直し）
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from agent_common.query_server import Dataset, QueryServer, RequestError, sort_order
+
+SHOPS = [
+    {"name": "麺屋武蔵", "area": "渋谷", "rating": 3.8},
+    {"name": "一蘭", "area": "渋谷", "rating": 3.5},
+    {"name": "AFURI", "area": "恵比寿", "rating": 3.9},
+]
+
+
+@pytest.fixture
+def server(tmp_path):
+    source = tmp_path / "ramen_shops.json"
+    log = tmp_path / "ramen_shops.log.jsonl"
+    source.write_text(json.dumps({"shops": SHOPS}, ensure_ascii=False), encoding="utf-8")
+
+    def load() -> dict:
+        data = json.loads(source.read_text(encoding="utf-8"))
+        if log.exists():
+            data["shops"] += [json.loads(line) for line in log.read_text(encoding="utf-8").splitlines()]
+        return data
+
+    dataset = Dataset(
+        name="shops",
+        source=source,
+        load=load,
+        search_fields=["name", "area"],
+        facet_fields=["area"],
+        sorts={"rating": [(lambda shop: shop.get("rating") or 0, True)], "name": [(lambda shop: shop.get("name") or "", False)]},
+        watch=[log],
+    )
+    return QueryServer([dataset], log=False), source, log
+
+
+def get(server: QueryServer, target: str, **headers: str) -> tuple[int, dict[str, str], dict | None]:
+    status, response_headers, body = asyncio.run(server.respond("GET", target, headers))
+    return status, response_headers, json.loads(body) if body else None
+
+
+def test_query(server):
+    server, _, _ = server
+    status, _, body = get(server, "/api/shops?area=渋谷")
+    assert status == 200
+    assert body["total"] == 2
+    assert [shop["name"] for shop in body["records"]] == ["麺屋武蔵", "一蘭"]
+    # 絞り込み中のファセットは、そのファセット以外の条件で数える
+    assert body["facets"]["area"] == {"渋谷": 2, "恵比寿": 1}
+
+    _, _, body = get(server, "/api/shops?q=ａｆｕｒｉ&sort=name")
+    assert [shop["name"] for shop in body["records"]] == ["AFURI"]
+
+
+def test_etag_and_not_modified(server):
+    server, _, _ = server
+    status, headers, _ = get(server, "/api/shops?q=麺")
+    assert status == 200 and headers["X-Cache"] == "MISS"
+
+    status, again, _ = get(server, "/api/shops?q=麺")
+    assert again["ETag"] == headers["ETag"] and again["X-Cache"] == "HIT"
+
+    status, _, body = get(server, "/api/shops?q=麺", **{"if-none-match": f'W/{headers["ETag"]}'})
+    assert status == 304 and body is None
+
+    _, other, _ = get(server, "/api/shops?q=一蘭")
+    assert other["ETag"] != headers["ETag"]
+
+
+def test_reload_when_source_changes(server):
+    server, source, _ = server
+    _, headers, body = get(server, "/api/shops")
+    assert body["total"] == 3
+
+    shops = SHOPS + [{"name": "テスト新店", "area": "渋谷"}]
+    source.write_text(json.dumps({"shops": shops}, ensure_ascii=False), encoding="utf-8")
+    status, changed, body = get(server, "/api/shops", **{"if-none-match": headers["ETag"]})
+    assert status == 200
+    assert changed["ETag"] != headers["ETag"]
+    assert body["total"] == 4
+
+
+def test_reload_when_watched_file_changes(server):
+    server, _, log = server
+    _, headers, body = get(server, "/api/shops")
+    assert body["total"] == 3
+
+    log.write_text(json.dumps({"name": "テスト新店", "area": "渋谷"}, ensure_ascii=False) + "\n", encoding="utf-8")
+    status, changed, body = get(server, "/api/shops", **{"if-none-match": headers["ETag"]})
+    assert status == 200
+    assert changed["ETag"] != headers["ETag"]
+    assert body["total"] == 4
+
+    log.unlink()
+    _, _, body = get(server, "/api/shops")
+    assert body["total"] == 3
+
+
+def test_sort_order_with_mixed_types():
+    # ページの比較関数と同じく、数値のキーは数値に、文字列のキーは文字列にそろえて比べる
+    records = [
+        {"name": 7, "rating": "4.5"},
+        {"name": "一蘭", "rating": 3.8},
+        {"name": None, "rating": "不明"},
+        {"name": "AFURI", "rating": None},
+        {"name": "麺屋武蔵", "rating": 4},
+    ]
+    rating = [(lambda shop: shop.get("rating") or 0, True)]
+    name = [(lambda shop: shop.get("name") or "", False)]
+    assert sort_order(records, rating) == [0, 4, 1, 2, 3]
+    assert sort_order(records, name) == [2, 0, 3, 1, 4]
+
+
+def test_invalid_requests(server):
+    server, _, _ = server
+    for target, status in [("/api/news", 404), ("/api/shops?sort=price", 400), ("/api/shops?limit=0", 400), ("/api/shops?page=2", 400)]:
+        with pytest.raises(RequestError) as error:
+            get(server, target)
+        assert error.value.status == status, target
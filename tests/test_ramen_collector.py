@@ -0,0 +1,133 @@
+"""
+ramen_collector のテスト（query() はエリアごとに決まった出力を返す偽の関数に置き換える）
+"""
+
+import asyncio
+import json
+
+from claude_agent_sdk import AssistantMessage, TextBlock
+
+import ramen_collector
+
+
+def shop_text(*shops: dict) -> str:
+    return "```json\n" + json.dumps({"shops": list(shops)}, ensure_ascii=False) + "\n```"
+
+
+def fake_query(monkeypatch, outputs: dict[str, list[str]], fail: tuple[str, ...] = ()) -> dict:
+    """
+    query() を、プロンプト中のエリアに対応するテキストを 1 ブロックずつ出力する偽の関数に置き換え、
+    同時実行数と終了したセッションを記録する
+    """
+    stats = {"running": 0, "max_running": 0, "closed": []}
+
+    async def query(prompt, options):
+        area = next(area for area in outputs if f"「{area}」" in prompt)
+        stats["running"] += 1
+        stats["max_running"] = max(stats["max_running"], stats["running"])
+        try:
+            for text in outputs[area]:
+                await asyncio.sleep(0.01)
+                if area in fail:
+                    raise RuntimeError("セッションが失敗しました")
+                yield AssistantMessage(content=[TextBlock(text=text)], model="claude-test")
+        finally:
+            stats["running"] -= 1
+            stats["closed"].append(area)
+
+    monkeypatch.setattr(ramen_collector, "query", query)
+    return stats
+
+
+def test_sharded_collection_runs_areas_in_parallel_and_merges(monkeypatch):
+    stats = fake_query(monkeypatch, {
+        "渋谷": [shop_text({"name": "麺屋武蔵", "area": "渋谷"}, {"name": "一蘭", "area": "渋谷"})],
+        "恵比寿": [shop_text({"name": "AFURI", "area": "恵比寿"}, {"name": "麺屋 武蔵", "area": "恵比寿"})],
+        "原宿": [shop_text({"name": "九州じゃんがら", "area": "原宿"})],
+    })
+
+    data = asyncio.run(ramen_collector.collect_ramen_data(sharded=True, areas=["渋谷", "恵比寿", "原宿"], max_concurrency=2))
+
+    assert stats["max_running"] == 2
+    # 店名（空白を除く）が同じ店舗は先に届いた 1 件だけ残す
+    assert [shop["name"] for shop in data["shops"]] == ["麺屋武蔵", "一蘭", "AFURI", "九州じゃんがら"]
+    assert data["total_count"] == 4
+
+
+def test_failed_area_does_not_stop_others(monkeypatch):
+    fake_query(monkeypatch, {"渋谷": [shop_text({"name": "一蘭", "area": "渋谷"})], "恵比寿": ["検索します"]}, fail=("恵比寿",))
+
+    data = asyncio.run(ramen_collector.collect_ramen_data(sharded=True, areas=["渋谷", "恵比寿"]))
+
+    assert [shop["name"] for shop in data["shops"]] == ["一蘭"]
+
+
+def test_target_count_ends_session_early(monkeypatch):
+    stats = fake_query(monkeypatch, {
+        "渋谷": [shop_text({"name": name}) for name in ["麺屋武蔵", "一蘭", "AFURI", "九州じゃんがら"]],
+    })
+
+    data = asyncio.run(ramen_collector.collect_ramen_data(sharded=True, areas=["渋谷"], target_count=2))
+
+    assert [shop["name"] for shop in data["shops"]] == ["麺屋武蔵", "一蘭"]
+    assert stats["closed"] == ["渋谷"]
+    assert stats["running"] == 0
+
+
+def test_target_count_skips_waiting_areas(monkeypatch):
+    stats = fake_query(monkeypatch, {
+        "渋谷": [shop_text({"name": "麺屋武蔵"}, {"name": "一蘭"})],
+        "恵比寿": [shop_text({"name": "AFURI"})],
+    })
+
+    data = asyncio.run(ramen_collector.collect_ramen_data(
+        sharded=True, areas=["渋谷", "恵比寿"], max_concurrency=1, target_count=2,
+    ))
+
+    assert data["total_count"] == 2
+    assert stats["closed"] == ["渋谷"]
+
+
+def fake_record_tool(monkeypatch, calls: list[dict]) -> list[dict]:
+    """
+    query() を、record_shop ツールを calls の入力で順に呼び出す偽の関数に置き換え、ツールの結果を返す
+    """
+    results = []
+    # MCP サーバーの代わりにツール定義をそのまま渡す
+    monkeypatch.setattr(ramen_collector, "create_sdk_mcp_server", lambda name, version, tools: tools)
+
+    async def query(prompt, options):
+        (record_shop,) = options.mcp_servers[ramen_collector.RECORD_SERVER_NAME]
+        assert ramen_collector.RECORD_TOOL_NAME in options.allowed_tools
+        for args in calls:
+            results.append(await record_shop.handler(args))
+            yield AssistantMessage(content=[TextBlock(text="登録しました")], model="claude-test")
+
+    monkeypatch.setattr(ramen_collector, "query", query)
+    return results
+
+
+def test_record_tool_registers_shops(monkeypatch):
+    results = fake_record_tool(monkeypatch, [
+        {"name": "一蘭", "area": "渋谷", "hours": None},
+        {"name": "", "area": "渋谷"},
+        {"name": "一蘭", "hours": "24時間"},
+    ])
+
+    data = asyncio.run(ramen_collector.collect_ramen_data())
+
+    (shop,) = data["shops"]
+    assert shop.pop("last_verified_at")
+    assert shop == {"name": "一蘭", "area": "渋谷", "hours": "24時間"}
+    # 不正な入力はエージェントが修正できるようエラーとして返す
+    assert [result.get("is_error", False) for result in results] == [False, True, False]
+
+
+def test_record_tool_reports_target(monkeypatch):
+    results = fake_record_tool(monkeypatch, [{"name": "一蘭"}, {"name": "AFURI"}, {"name": "九州じゃんがら"}])
+
+    data = asyncio.run(ramen_collector.collect_ramen_data(target_count=2))
+
+    assert data["total_count"] == 2
+    assert len(results) == 2
+    assert "目標の店舗数に達した" in results[-1]["content"][0]["text"]
@@ -0,0 +1,78 @@
+"""
+RecordDatabase のテスト（JSON との往復、全文検索と単純な部分一致の一致、絞り込み・並べ替え）
+"""
+
+from agent_common.record_db import bigram_text, search_text
+from agent_common.search_index import normalize_text
+from ramen_db import SHOP_SCHEMA, open_db, search_shops
+
+DATA = {
+    "collected_at": "2026-01-01T00:00:00",
+    "shops": [
+        {"name": "麺屋武蔵 渋谷店", "area": "渋谷", "genre": "つけ麺", "rating": 4.2, "specialties": ["濃厚つけ麺", "味玉"]},
+        {"name": "一蘭 渋谷店", "area": "渋谷", "genre": "豚骨", "rating": 3.9, "specialties": ["天然とんこつラーメン"]},
+        {"name": "AFURI 恵比寿", "area": "恵比寿", "genre": "塩", "rating": 4.5, "specialties": ["柚子塩らーめん"]},
+        {"name": "Ramen Nagi", "area": "新宿", "genre": "煮干し", "specialties": ["Niboshi"], "description": None},
+        {"name": "ﾗｰﾒﾝ 山田", "area": "代々木", "genre": "醤油", "rating": 3.5, "specialties": []},
+        {"name": "醤油らーめん 100%", "area": "渋谷", "genre": "醤油", "rating": 4.0, "note": {"memo": "追加のフィールド"}},
+    ],
+}
+
+QUERIES = [
+    "", "渋谷", "渋", "つけ麺", "ラーメン", "ﾗｰﾒﾝ", "らーめん", "afuri", "AFU", "fur",
+    "ramen nagi", "醤油", "醤", "味玉", "100%", "%", "存在しない", "渋谷 醤油",
+]
+
+
+def naive_search(query: str) -> list[str]:
+    terms = normalize_text(query).split()
+    return [
+        shop["name"] for shop in DATA["shops"]
+        if all(term in search_text(shop, SHOP_SCHEMA.text_fields) for term in terms)
+    ]
+
+
+def test_load_returns_same_data(tmp_path):
+    with open_db(tmp_path / "shops.db") as db:
+        assert db.replace_all(DATA) == len(DATA["shops"])
+        assert db.load() == DATA
+
+
+def test_replace_all_replaces_previous_records(tmp_path):
+    with open_db(tmp_path / "shops.db") as db:
+        db.replace_all(DATA)
+        data = {"collected_at": "2026-02-01T00:00:00", "shops": DATA["shops"][:2]}
+        db.replace_all(data)
+        assert db.load() == data
+        assert db.count() == 2
+
+
+def test_text_search_matches_naive_search(tmp_path):
+    with open_db(tmp_path / "shops.db") as db:
+        db.replace_all(DATA)
+        for query in QUERIES:
+            total, shops = db.search(query, limit=None)
+            assert [shop["name"] for shop in shops] == naive_search(query), query
+            assert total == len(shops), query
+
+
+def test_filters_ranges_and_order(tmp_path):
+    with open_db(tmp_path / "shops.db") as db:
+        db.replace_all(DATA)
+        total, shops = search_shops(db, area="渋谷", min_rating=4.0)
+        assert total == 2
+        assert [shop["name"] for shop in shops] == ["麺屋武蔵 渋谷店", "醤油らーめん 100%"]
+
+        # 評価のない店舗は最後。リストのフィールドの絞り込みは値のいずれかに一致する店舗
+        _, shops = search_shops(db, sort="rating", limit=None)
+        assert shops[-1]["name"] == "Ramen Nagi"
+        total, _ = db.search(filters={"specialties": ["味玉", "Niboshi"]})
+        assert total == 2
+
+        total, shops = search_shops(db, sort="name", limit=2, offset=1)
+        assert total == len(DATA["shops"])
+        assert [shop["name"] for shop in shops] == sorted(shop["name"] for shop in DATA["shops"])[1:3]
+
+
+def test_bigram_text_includes_trailing_character():
+    assert bigram_text("醤油 ab") == "醤油 油 ab b"
@@ -0,0 +1,89 @@
+"""
+RecordLog のテスト（ログの適用・畳み込み・中断した実行）
+"""
+
+import json
+
+from agent_common.record_log import RecordLog, log_path
+
+
+def make_log(tmp_path, shops: list[dict] | None = None) -> RecordLog:
+    snapshot = tmp_path / "ramen_shops.json"
+    if shops is not None:
+        snapshot.write_text(
+            json.dumps({"collected_at": "2026-01-01", "total_count": len(shops), "shops": shops}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+    return RecordLog(
+        log_path(tmp_path, snapshot), snapshot, "shops",
+        key=lambda shop: shop.get("name", ""), volatile=("last_verified_at",),
+    )
+
+
+def document(shops: list[dict], collected_at: str = "2026-01-02") -> dict:
+    return {"collected_at": collected_at, "total_count": len(shops), "shops": shops}
+
+
+def test_log_path():
+    assert log_path("/data", "ramen_shops.json").as_posix() == "/data/ramen_shops.log.jsonl"
+
+
+def test_load_without_files(tmp_path):
+    assert make_log(tmp_path).load() is None
+
+
+def test_append_and_replay(tmp_path):
+    log = make_log(tmp_path, [{"name": "店A", "rating": 3.5}, {"name": "店B"}])
+    data, counts = log.append(document([{"name": "店B", "rating": 4.0}, {"name": "店C"}]))
+
+    assert counts == {"added": 1, "updated": 1, "deleted": 1, "touched": 0}
+    # 既存のレコードは元の位置を保ち、新しいレコードは末尾に追加する
+    assert data == document([{"name": "店B", "rating": 4.0}, {"name": "店C"}])
+    assert log.load() == data
+
+
+def test_unchanged_and_volatile_only_records(tmp_path):
+    log = make_log(tmp_path, [
+        {"name": "店A", "rating": 3.5, "last_verified_at": "2026-01-01"},
+        {"name": "店B", "last_verified_at": "2026-01-01"},
+    ])
+    data, counts = log.append(document([
+        {"name": "店A", "rating": 3.5, "last_verified_at": "2026-01-02"},
+        {"name": "店B", "last_verified_at": "2026-01-01"},
+    ]))
+
+    assert counts == {"added": 0, "updated": 0, "deleted": 0, "touched": 1}
+    entries = [json.loads(line) for line in log.path.read_text(encoding="utf-8").splitlines()]
+    assert [entry["type"] for entry in entries] == ["touch", "commit"]
+    assert entries[0]["fields"] == {"last_verified_at": "2026-01-02"}
+    assert log.load()["shops"][0] == {"name": "店A", "rating": 3.5, "last_verified_at": "2026-01-02"}
+    assert log.load() == data
+
+
+def test_uncommitted_run_is_ignored(tmp_path):
+    log = make_log(tmp_path, [{"name": "店A"}])
+    expected, _ = log.append(document([{"name": "店A"}, {"name": "店B"}]))
+    # 書き込み途中で中断した実行（commit の行がなく、最終行も途中まで）
+    with open(log.path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"type": "put", "run": "torn", "key": "店C", "record": {"name": "店C"}}) + "\n")
+        f.write('{"type": "delete", "run": "torn", "key": "店')
+
+    assert log.load() == expected
+
+    data, counts = log.append(document([{"name": "店A"}, {"name": "店B"}, {"name": "店D"}]))
+    assert counts["added"] == 1
+    assert [shop["name"] for shop in log.load()["shops"]] == ["店A", "店B", "店D"]
+    assert log.load() == data
+
+
+def test_compact_writes_snapshot_and_removes_log(tmp_path):
+    log = make_log(tmp_path, [{"name": "店A"}])
+    data, _ = log.append(document([{"name": "店A"}, {"name": "店B"}]))
+
+    def save(value: dict) -> None:
+        log.snapshot.write_text(json.dumps(value, ensure_ascii=False), encoding="utf-8")
+
+    assert log.compact(save) == data
+    assert not log.exists()
+    assert json.loads(log.snapshot.read_text(encoding="utf-8")) == data
+    assert log.load() == data
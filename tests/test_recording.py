@@ -0,0 +1,91 @@
+"""
+recording のテスト（セッションの記録と再生）
+"""
+
+import asyncio
+import json
+
+import pytest
+from claude_agent_sdk import AssistantMessage, ResultMessage, TextBlock, ToolUseBlock
+
+import ramen_collector
+from agent_common.recording import SessionRecorder, SessionReplayer
+from agent_common.runtime import AgentRuntime
+
+
+def assistant(*blocks) -> AssistantMessage:
+    return AssistantMessage(content=list(blocks), model="claude-test")
+
+
+MESSAGES = [
+    assistant(TextBlock(text="検索します")),
+    assistant(ToolUseBlock(id="tool-1", name="WebSearch", input={"query": "渋谷 ラーメン"})),
+    ResultMessage(
+        subtype="success", duration_ms=1200, duration_api_ms=900, is_error=False,
+        num_turns=2, session_id="session-1", total_cost_usd=0.01,
+    ),
+]
+
+
+async def stream(messages):
+    for message in messages:
+        yield message
+
+
+async def collect(messages) -> list:
+    return [message async for message in messages]
+
+
+def record(path, sessions: dict[str, list]) -> list:
+    recorder = SessionRecorder(path)
+    passed = []
+    for session, messages in sessions.items():
+        passed.extend(asyncio.run(collect(recorder.record(session, stream(messages)))))
+    recorder.close()
+    return passed
+
+
+@pytest.mark.parametrize("name", ["run.jsonl", "run.jsonl.gz"])
+def test_round_trip_restores_sdk_messages(tmp_path, name):
+    path = tmp_path / name
+    # 記録中もメッセージはそのまま流れる
+    assert record(path, {"渋谷": MESSAGES, "恵比寿": MESSAGES[:1]}) == MESSAGES + MESSAGES[:1]
+
+    replayer = SessionReplayer(path)
+    assert asyncio.run(collect(replayer.replay("渋谷"))) == MESSAGES
+    assert asyncio.run(collect(replayer.replay("恵比寿"))) == MESSAGES[:1]
+
+
+def test_replay_unknown_session(tmp_path):
+    path = tmp_path / "run.jsonl"
+    record(path, {"渋谷": MESSAGES})
+    with pytest.raises(KeyError):
+        asyncio.run(collect(SessionReplayer(path).replay("原宿")))
+
+
+def test_collector_replays_without_network(tmp_path, monkeypatch):
+    def fail(**kwargs):
+        raise AssertionError("再生時に query() を呼び出しました")
+
+    monkeypatch.setattr(ramen_collector, "query", fail)
+    path = tmp_path / "run.jsonl"
+    shops = {"shops": [{"name": "麺屋武蔵", "area": "渋谷"}]}
+    record(path, {"渋谷": [assistant(TextBlock(text="```json\n" + json.dumps(shops, ensure_ascii=False) + "\n```"))]})
+
+    runtime = AgentRuntime(replayer=SessionReplayer(path))
+    data = asyncio.run(ramen_collector.collect_ramen_data(sharded=True, areas=["渋谷"], runtime=runtime))
+
+    assert [shop["name"] for shop in data["shops"]] == ["麺屋武蔵"]
+
+
+def test_replay_registers_record_tool_calls(tmp_path, monkeypatch):
+    monkeypatch.setattr(ramen_collector, "query", lambda **kwargs: pytest.fail("再生時に query() を呼び出しました"))
+    path = tmp_path / "run.jsonl"
+    record(path, {"main": [
+        assistant(ToolUseBlock(id="tool-1", name=ramen_collector.RECORD_TOOL_NAME, input={"name": "AFURI", "area": "恵比寿"})),
+    ]})
+
+    runtime = AgentRuntime(replayer=SessionReplayer(path))
+    data = asyncio.run(ramen_collector.collect_ramen_data(runtime=runtime))
+
+    assert [(shop["name"], shop["area"]) for shop in data["shops"]] == [("AFURI", "恵比寿")]
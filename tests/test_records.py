@@ -0,0 +1,51 @@
+"""
+RecordStore のテスト
+"""
+
+from agent_common.records import RecordStore
+
+
+def make_store(target: int | None = None) -> RecordStore:
+    return RecordStore(
+        key=lambda record: str(record.get("name") or "").lower(),
+        validate=lambda record: bool(record.get("name")),
+        target=target,
+    )
+
+
+def test_duplicate_fills_blank_fields_only():
+    store = make_store()
+
+    assert store.add({"name": "一蘭", "area": "渋谷", "hours": ""})
+    assert not store.add({"name": "一蘭", "area": "原宿", "hours": "24時間"})
+
+    assert store.records == [{"name": "一蘭", "area": "渋谷", "hours": "24時間"}]
+
+
+def test_invalid_records_are_rejected():
+    store = make_store()
+
+    assert not store.add({"area": "渋谷"})
+    assert not store.add("一蘭")
+    assert len(store) == 0
+
+
+def test_added_record_is_copied():
+    store = make_store()
+    record = {"name": "AFURI"}
+
+    store.add(record)
+    store.add({"name": "afuri", "area": "恵比寿"})
+
+    assert record == {"name": "AFURI"}
+
+
+def test_reached_target():
+    store = make_store(target=2)
+
+    store.add({"name": "一蘭"})
+    store.add({"name": "一蘭"})
+    assert not store.reached
+    store.add({"name": "AFURI"})
+    assert store.reached
+    assert not make_store().reached
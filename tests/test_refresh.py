@@ -0,0 +1,76 @@
+"""
+ramen_collector の増分更新（TTL による再確認）のテスト
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from claude_agent_sdk import AssistantMessage, TextBlock
+
+import ramen_collector
+
+NOW = datetime(2026, 3, 31, 12, 0, 0)
+
+EXISTING = {
+    "collected_at": "2026-03-01 09:00:00",
+    "shops": [
+        {"name": "一蘭", "hours": "24時間", "last_verified_at": "2026-03-30 09:00:00"},
+        {"name": "AFURI", "hours": "11:00-23:00", "last_verified_at": "2026-01-01 09:00:00"},
+        {"name": "九州じゃんがら", "hours": None},
+        {"name": "", "url": "https://example.com/"},
+    ],
+}
+
+
+def names(shops: list[dict]) -> list[str]:
+    return [shop["name"] for shop in shops]
+
+
+def test_plan_refresh_splits_by_ttl():
+    fresh, stale = ramen_collector.plan_refresh(EXISTING, ttl_days=7, now=NOW)
+
+    assert names(fresh) == ["一蘭"]
+    # last_verified_at がない店舗はデータ全体の collected_at で判定する
+    assert names(stale) == ["AFURI", "九州じゃんがら"]
+
+
+def test_plan_refresh_uses_collected_at_fallback():
+    fresh, stale = ramen_collector.plan_refresh(EXISTING, ttl_days=60, now=NOW)
+
+    assert names(fresh) == ["一蘭", "九州じゃんがら"]
+    assert names(stale) == ["AFURI"]
+
+
+def test_refresh_rechecks_only_stale_shops(monkeypatch):
+    prompts = []
+
+    async def query(prompt, options):
+        prompts.append(prompt)
+        yield AssistantMessage(
+            content=[TextBlock(text='```json\n{"shops": [{"name": "ＡＦＵＲＩ", "hours": "10:00-23:00"}, {"name": "新店"}]}\n```')],
+            model="claude-test",
+        )
+
+    monkeypatch.setattr(ramen_collector, "query", query)
+    recent = (datetime.now() - timedelta(days=1)).strftime(ramen_collector.TIMESTAMP_FORMAT)
+    existing = {**EXISTING, "collected_at": "2026-01-01 09:00:00", "shops": [
+        {**EXISTING["shops"][0], "last_verified_at": recent}, *EXISTING["shops"][1:],
+    ]}
+
+    data = asyncio.run(ramen_collector.collect_ramen_data(existing=existing, ttl_days=7))
+
+    (prompt,) = prompts
+    assert "- AFURI" in prompt and "- 一蘭" not in prompt
+    shops = {shop["name"]: shop for shop in data["shops"]}
+    # 全角の店名も同じ店舗とみなし、再確認した内容で更新する
+    assert names(data["shops"]) == ["一蘭", "ＡＦＵＲＩ", "新店", "九州じゃんがら"]
+    assert shops["ＡＦＵＲＩ"]["hours"] == "10:00-23:00"
+    # 再確認されなかった店舗は以前の情報のまま残す
+    assert "last_verified_at" not in shops["九州じゃんがら"]
+    assert shops["一蘭"]["last_verified_at"] == recent
+
+
+def test_canonical_url():
+    assert ramen_collector.canonical_url("https://www.Example.com/shop/?ref=1") == "example.com/shop"
+    assert ramen_collector.canonical_url("example.com/shop/") == "example.com/shop"
+    assert ramen_collector.canonical_url(None) == ""
@@ -0,0 +1,48 @@
+"""
+search_index のテスト（転置インデックスの検索と単純な部分一致の検索の結果が一致すること）
+
+ブラウザ側の SEARCH_INDEX_JS を Node.js で実行する（Node.js がなければスキップ）
+"""
+
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from agent_common.search_index import SEARCH_INDEX_JS, build_search_index, normalize_text, record_text
+
+FIELDS = ["name", "area", "specialties"]
+
+RECORDS = [
+    {"name": "麺屋武蔵 渋谷店", "area": "渋谷", "specialties": ["濃厚つけ麺", "味玉"]},
+    {"name": "一蘭 渋谷店", "area": "渋谷", "specialties": ["天然とんこつラーメン"]},
+    {"name": "AFURI 恵比寿", "area": "恵比寿", "specialties": ["柚子塩らーめん"]},
+    {"name": "Ramen Nagi", "area": "新宿", "specialties": ["煮干しラーメン", "Niboshi"]},
+    {"name": "ﾗｰﾒﾝ 山田", "area": "代々木", "specialties": []},
+    {"name": "らあめん花月嵐", "area": "渋谷", "specialties": None},
+]
+
+QUERIES = [
+    "", "渋谷", "渋", "つけ麺", "ラーメン", "ﾗｰﾒﾝ", "らーめん", "afuri", "AFU", "fur", "ri 恵",
+    "nagi", "ramen nagi", "boshi", "麺屋 武蔵", "味玉", "存在しない", "x",
+]
+
+
+def naive_search(query: str) -> list[int]:
+    q = normalize_text(query)
+    return [i for i, record in enumerate(RECORDS) if q in normalize_text(record_text(record, FIELDS))]
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="Node.js がありません")
+def test_index_search_matches_naive_search():
+    index = build_search_index(RECORDS, FIELDS)
+    script = SEARCH_INDEX_JS + f'''
+        const search = createSearchIndex({json.dumps(index, ensure_ascii=False)}, {json.dumps(RECORDS, ensure_ascii=False)}).search;
+        const queries = {json.dumps(QUERIES, ensure_ascii=False)};
+        console.log(JSON.stringify(queries.map(query => search(query))));
+    '''
+    output = subprocess.run(["node", "-e", script], capture_output=True, text=True, check=True).stdout
+
+    for query, ids in zip(QUERIES, json.loads(output)):
+        assert ids == naive_search(query), query
@@ -0,0 +1,66 @@
+"""
+site_data のテスト（シャードへの振り分け、ハッシュ付きファイルの書き出しと古いファイルの削除）
+"""
+
+import json
+
+from agent_common.module_loader import load_module
+from agent_common.site_data import HASHED_NAME_PATTERN, remove_stale_files, shard_records, write_hashed_json
+from conftest import ROOT_DIR
+
+SHOPS = [{"name": f"店舗{i}", "area": "渋谷"} for i in range(40)]
+
+
+def shop_key(shop: dict) -> str:
+    return shop["name"]
+
+
+def test_shards_are_stable_and_keep_order():
+    parts = shard_records(SHOPS, shop_key, 4)
+
+    assert len(parts) == 4
+    assert sorted(shop["name"] for part in parts for shop in part) == sorted(shop["name"] for shop in SHOPS)
+    for part in parts:
+        assert part == sorted(part, key=SHOPS.index)
+    # レコードが増減しても既存のレコードのシャードは変わらない
+    assert shard_records(SHOPS[:10], shop_key, 4) == [[shop for shop in part if shop in SHOPS[:10]] for part in parts]
+    assert shard_records(SHOPS, shop_key, 0) == [SHOPS]
+
+
+def test_edit_changes_only_its_shard(tmp_path):
+    before = [write_hashed_json(tmp_path, f"shops-{i}", part) for i, part in enumerate(shard_records(SHOPS, shop_key, 4))]
+    edited = [dict(shop, area="恵比寿") if shop["name"] == "店舗7" else shop for shop in SHOPS]
+    after = [write_hashed_json(tmp_path, f"shops-{i}", part) for i, part in enumerate(shard_records(edited, shop_key, 4))]
+
+    assert sum(a != b for a, b in zip(before, after)) == 1
+    assert all(HASHED_NAME_PATTERN.match(name) for name in after)
+    assert json.loads((tmp_path / after[0]).read_text(encoding="utf-8")) == shard_records(edited, shop_key, 4)[0]
+
+
+def test_remove_stale_files_keeps_referenced_and_unrelated(tmp_path):
+    old = write_hashed_json(tmp_path, "shops-0", [1])
+    new = write_hashed_json(tmp_path, "shops-0", [2])
+    other = write_hashed_json(tmp_path, "other", [3])
+    (tmp_path / "ramen_shops.json").write_text("{}", encoding="utf-8")
+
+    removed = remove_stale_files(tmp_path, lambda stem: stem.startswith("shops-"), {new})
+
+    assert removed == [old]
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted([new, other, "ramen_shops.json"])
+
+
+def test_write_site_external_data(tmp_path):
+    generate_web = load_module(ROOT_DIR / "shibuya_ramen_agent" / "generate_web.py")
+    data = {"collected_at": "2026-01-01 00:00:00", "shops": SHOPS}
+
+    html = generate_web.write_site(data, tmp_path, external_data=True, shards=3).read_text(encoding="utf-8")
+    files = sorted(path.name for path in tmp_path.glob("*.json"))
+
+    assert len(files) == 4
+    assert all(name in html for name in files)
+    assert "店舗7" not in html
+
+    # 埋め込みに戻すとデータファイルは削除される
+    html = generate_web.write_site(data, tmp_path).read_text(encoding="utf-8")
+    assert list(tmp_path.glob("*.json")) == []
+    assert "店舗7" in html
@@ -0,0 +1,37 @@
+"""
+benchmarks/synthetic.py のテスト（合成データが再現可能で、実データと同じ形式であること）
+"""
+
+from datetime import datetime
+
+import news_collector
+import ramen_collector
+from agent_common.module_loader import load_module
+from agent_common.records import RecordStore
+from conftest import ROOT_DIR
+
+synthetic = load_module(ROOT_DIR / "benchmarks" / "synthetic.py")
+
+
+def test_same_seed_same_data():
+    assert synthetic.make_data("shops", 50, seed=1) == synthetic.make_data("shops", 50, seed=1)
+    assert synthetic.make_data("articles", 50, seed=1) == synthetic.make_data("articles", 50, seed=1)
+    assert synthetic.make_shops(50, seed=1) != synthetic.make_shops(50, seed=2)
+
+
+def test_shops_are_valid_and_distinct():
+    data = synthetic.make_data("shops", 200)
+    store = RecordStore(key=ramen_collector._shop_key, validate=ramen_collector.validate_shop)
+
+    assert data["total_count"] == len(data["shops"]) == 200
+    assert sum(store.add(shop) for shop in data["shops"]) == 200
+    fresh, stale = ramen_collector.plan_refresh(data, ttl_days=30, now=datetime(2026, 4, 1))
+    assert len(fresh) + len(stale) == 200
+
+
+def test_articles_are_valid_and_distinct():
+    data = synthetic.make_data("articles", 200)
+    store = RecordStore(key=news_collector._article_key, validate=news_collector.validate_article)
+
+    assert sum(store.add(article) for article in data["articles"]) == 200
+    assert {article["importance"] for article in data["articles"]} <= {"high", "medium", "low"}
@@ -0,0 +1,111 @@
+"""
+SessionTracer のテスト（イベントの記録と集計）
+"""
+
+import asyncio
+
+from claude_agent_sdk import AssistantMessage, ResultMessage, TextBlock, ToolResultBlock, ToolUseBlock, UserMessage
+
+from agent_common.runtime import AgentRuntime
+from agent_common.tool_cache import ToolCallCache
+from agent_common.tracing import SessionTracer, load_trace, summarize_events
+
+MESSAGES = [
+    AssistantMessage(content=[
+        TextBlock(text="検索します"),
+        ToolUseBlock(id="tool-1", name="WebSearch", input={"query": "渋谷 ラーメン"}),
+        ToolUseBlock(id="tool-2", name="WebSearch", input={"query": "渋谷　ラーメン"}),
+        ToolUseBlock(id="tool-3", name="WebFetch", input={"url": "https://example.com/closed"}),
+    ], model="claude-test"),
+    UserMessage(content=[
+        ToolResultBlock(tool_use_id="tool-1", content="検索結果"),
+        ToolResultBlock(tool_use_id="tool-2", content="キャッシュ済みの結果です", is_error=True),
+        ToolResultBlock(tool_use_id="tool-3", content="404", is_error=True),
+    ]),
+    ResultMessage(
+        subtype="success", duration_ms=1200, duration_api_ms=900, is_error=False,
+        num_turns=2, session_id="session-1", total_cost_usd=0.01,
+    ),
+]
+
+
+async def stream(messages):
+    for message in messages:
+        yield message
+
+
+def run(runtime: AgentRuntime, session: str = "渋谷") -> list:
+    async def main():
+        messages = runtime.stream(session, None, lambda options: stream(MESSAGES))
+        passed = []
+        async for message in messages:
+            passed.append(message)
+            if hasattr(message, 'model'):
+                runtime.record_added(session, "一蘭")
+        return passed
+
+    return asyncio.run(main())
+
+
+def test_trace_events_and_cache_hits(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    cache = ToolCallCache()
+    # tool-2 はツールキャッシュが結果を返した（SDK 上は拒否として返る）呼び出し
+    cache.served.add("tool-2")
+    runtime = AgentRuntime(tool_cache=cache, tracer=SessionTracer(path))
+
+    assert run(runtime) == MESSAGES
+    runtime.close()
+
+    events = load_trace(path)
+    assert [event["event"] for event in events] == [
+        "session_start", "tool_call", "tool_call", "tool_call", "turn", "record",
+        "tool_result", "tool_result", "tool_result", "result", "session_end",
+    ]
+    results = {event["id"]: event for event in events if event["event"] == "tool_result"}
+    assert (results["tool-1"]["is_error"], results["tool-1"]["cached"]) == (False, False)
+    assert (results["tool-2"]["is_error"], results["tool-2"]["cached"]) == (False, True)
+    assert (results["tool-3"]["is_error"], results["tool-3"]["cached"]) == (True, False)
+    assert events[-1]["turns"] == 1
+
+
+def test_summary_counts_cache_hits_separately(tmp_path):
+    cache = ToolCallCache()
+    cache.served.add("tool-2")
+    runtime = AgentRuntime(tool_cache=cache, tracer=SessionTracer(tmp_path / "trace.jsonl"))
+    run(runtime)
+    runtime.close()
+
+    lines = summarize_events(runtime.tracer.events)
+    web_search = next(line for line in lines if line.startswith("WebSearch"))
+    web_fetch = next(line for line in lines if line.startswith("WebFetch"))
+
+    # 回数・キャッシュ・エラーは行末の 3 列（回数は 2 列目）
+    assert web_search.split()[1] == "2" and web_search.split()[-2:] == ["1", "0"]
+    assert web_fetch.split()[-2:] == ["0", "1"]
+    assert lines[-1].startswith("合計: 1 ターン / 1 件")
+
+
+def test_trace_closes_stream_when_stopped_early(tmp_path):
+    closed = []
+
+    async def messages():
+        try:
+            for message in MESSAGES:
+                yield message
+        finally:
+            closed.append(True)
+
+    tracer = SessionTracer(tmp_path / "trace.jsonl")
+
+    async def main():
+        traced = tracer.trace("渋谷", messages())
+        async for _ in traced:
+            break
+        await traced.aclose()
+
+    asyncio.run(main())
+    tracer.close()
+
+    assert closed == [True]
+    assert tracer.events[-1]["event"] == "session_end"
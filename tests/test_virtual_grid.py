@@ -0,0 +1,96 @@
+"""
+virtual_grid のテスト（ウィンドウ表示で描画するカードの範囲とスペーサーの高さ）
+
+ブラウザ側の VIRTUAL_GRID_JS を、DOM を最小限に模した Node.js 上で実行する（Node.js がなければスキップ）
+"""
+
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from agent_common.virtual_grid import VIRTUAL_GRID_JS, WINDOWED_MIN_RECORDS, use_windowed
+
+# 3 列・行の高さ 100px・行間なし・画面の高さ 500px のグリッドを模す
+FAKE_DOM_JS = r'''
+const frames = [];
+globalThis.requestAnimationFrame = callback => frames.push(callback);
+globalThis.window = { innerHeight: 500, addEventListener() {} };
+globalThis.getComputedStyle = () => ({ gridTemplateColumns: '300px 300px 300px', rowGap: '0px' });
+
+const container = {
+    scrollTop: 0,
+    innerHTML: '',
+    getBoundingClientRect() { return { top: -this.scrollTop }; },
+    querySelectorAll() {
+        const count = (this.innerHTML.match(/class="card"/g) || []).length;
+        return Array.from({ length: count }, (_, i) => ({
+            getBoundingClientRect: () => ({ top: Math.floor(i / 3) * 100, bottom: Math.floor(i / 3) * 100 + 100 }),
+        }));
+    },
+};
+
+function flush() {
+    while (frames.length) frames.shift()();
+}
+
+function snapshot() {
+    const ids = [...container.innerHTML.matchAll(/data-id="(\d+)"/g)].map(m => Number(m[1]));
+    const spacers = [...container.innerHTML.matchAll(/height: (\d+)px/g)].map(m => Number(m[1]));
+    return { first: ids[0], count: ids.length, spacers };
+}
+'''
+
+
+def run_grid(script: str) -> list[dict]:
+    source = FAKE_DOM_JS + VIRTUAL_GRID_JS + r'''
+        let renders = 0;
+        const items = Array.from({ length: 1000 }, (_, i) => ({ id: i }));
+        const results = [];
+        function renderCard(item) {
+            renders++;
+            return `<div class="card" data-id="${item.id}"></div>`;
+        }
+    ''' + script + "\nconsole.log(JSON.stringify(results));"
+    return json.loads(subprocess.run(["node", "-e", source], capture_output=True, text=True, check=True).stdout)
+
+
+def test_use_windowed():
+    assert not use_windowed(WINDOWED_MIN_RECORDS - 1, None)
+    assert use_windowed(WINDOWED_MIN_RECORDS, None)
+    assert use_windowed(1, True)
+    assert not use_windowed(10000, False)
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="Node.js がありません")
+def test_windowed_grid_renders_visible_rows_only():
+    results = run_grid(r'''
+        const grid = createVirtualGrid(container, renderCard, { enabled: true, bufferRows: 3 });
+        grid.render(items);
+        flush();
+        results.push(snapshot());
+
+        container.scrollTop = 5000;
+        grid.render(items);
+        results.push(snapshot());
+        results.push({ renders });
+    ''')
+
+    # 334 行のうち、画面の 5 行と下の余裕 3 行だけを描画する
+    assert results[0] == {"first": 0, "count": 24, "spacers": [(334 - 8) * 100]}
+    # 50 行目から表示している場合は上下の余裕 3 行ずつを含めて描画する
+    assert results[1] == {"first": 47 * 3, "count": 11 * 3, "spacers": [47 * 100, (334 - 58) * 100]}
+    # 一度描画したカードの HTML は再利用する
+    assert results[2]["renders"] == 24 + 33
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="Node.js がありません")
+def test_disabled_grid_renders_every_card():
+    results = run_grid(r'''
+        const grid = createVirtualGrid(container, renderCard, { enabled: false, bufferRows: 3 });
+        grid.render(items.slice(0, 250));
+        results.push(snapshot());
+    ''')
+
+    assert results == [{"first": 0, "count": 250, "spacers": []}]